@@ -0,0 +1 @@
+# Benchmarks package for RTSP Video Player
@@ -0,0 +1,142 @@
+"""
+Headless engine benchmark: decode throughput per conversion and threading mode.
+
+Run from project root:
+    python -m benchmarks.bench_engine [--size 1280x720] [--frames 300] [--codec libx264]
+    python -m benchmarks.bench_engine clip.mp4 other.mkv [--json]
+
+Without files, a synthetic clip is encoded with PyAV first, so no network or
+camera is needed. Each mode runs in a fresh process, so peak RSS is per
+mode. Reports frames/s, CPU milliseconds per frame and peak RSS.
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import av
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.decode_engine import DecodeEngine
+from core.frame_convert import FrameConverter
+from core.pipeline import PipelineConfig
+from core.stats import peak_rss_bytes
+
+# Conversion modes: FFmpeg pixel format (None: decode only) and whether the
+# output is fitted to --fit
+CONVERSIONS = {
+    "decode-only": (None, False),
+    "rgb24": ("rgb24", False),
+    "bgra": ("bgra", False),
+    "rgb24-fit": ("rgb24", True),
+}
+THREADING = ("serial", "pipeline")
+
+
+def make_synthetic_clip(path, width: int, height: int, frames: int,
+                        fps: int = 30, codec: str = "libx264") -> Path:
+    """Encodes a clip with a moving gradient and block, so P-frames carry real motion."""
+    if codec not in av.codecs_available:
+        codec = "mpeg4"
+    container = av.open(str(path), "w")
+    stream = container.add_stream(codec, rate=fps)
+    stream.width = width
+    stream.height = height
+    stream.pix_fmt = "yuv420p"
+    stream.codec_context.gop_size = fps
+    if codec == "libx264":
+        stream.codec_context.options = {"preset": "veryfast"}
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    block = max(16, height // 6)
+    for i in range(frames):
+        arr = np.empty((height, width, 3), dtype=np.uint8)
+        arr[..., 0] = (x + i * 4) % 256
+        arr[..., 1] = (y + i * 2) % 256
+        arr[..., 2] = 128
+        left = (i * 8) % (width - block)
+        arr[height // 3:height // 3 + block, left:left + block] = 255
+        for packet in stream.encode(av.VideoFrame.from_ndarray(arr, format="rgb24")):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+    return Path(path)
+
+
+def run_mode(path: str, conversion: str, threading_mode: str, fit: tuple) -> dict:
+    """Decodes path once in this process and returns its measurements."""
+    pix_fmt, fitted = CONVERSIONS[conversion]
+    converter = FrameConverter(pix_fmt=pix_fmt or "rgb24", pool_slots=8)
+    if fitted:
+        converter.output_size = fit
+    engine = DecodeEngine(
+        reconnect_policy=None,
+        pipeline=PipelineConfig() if threading_mode == "pipeline" else None,
+        converter=converter,
+        convert=converter.convert if pix_fmt else (lambda frame: frame),
+    )
+    wall, cpu = time.perf_counter(), time.process_time()
+    count = sum(1 for _ in engine.frames(path))
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    peak = peak_rss_bytes()
+    return {
+        "source": Path(path).name,
+        "conversion": conversion,
+        "threading": threading_mode,
+        "frames": count,
+        "fps": count / wall if wall else 0.0,
+        "cpu_ms_per_frame": cpu * 1000.0 / count if count else None,
+        "peak_rss_mb": None if peak is None else peak / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="local media files (default: synthetic clip)")
+    parser.add_argument("--size", default="1280x720", metavar="WxH", help="synthetic clip size")
+    parser.add_argument("--frames", type=int, default=300, help="synthetic clip length")
+    parser.add_argument("--codec", default="libx264", help="synthetic clip codec")
+    parser.add_argument("--fit", default="640x360", metavar="WxH", help="box for rgb24-fit")
+    parser.add_argument("--conversion", choices=list(CONVERSIONS), action="append",
+                        help="only these conversion modes (repeatable)")
+    parser.add_argument("--threading", choices=THREADING, action="append",
+                        help="only these threading modes (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per run")
+    args = parser.parse_args()
+
+    fit = tuple(int(v) for v in args.fit.split("x"))
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files
+        if not files:
+            width, height = (int(v) for v in args.size.split("x"))
+            clip = make_synthetic_clip(Path(tmp) / "synthetic.mp4", width, height,
+                                       args.frames, codec=args.codec)
+            files = [str(clip)]
+
+        context = multiprocessing.get_context("spawn")
+        if not args.json:
+            print(f"{'source':<20} {'conversion':<12} {'threading':<9} {'frames':>6} "
+                  f"{'fps':>8} {'cpu ms/f':>9} {'peak MB':>8}")
+        for path in files:
+            for conversion in args.conversion or CONVERSIONS:
+                for threading_mode in args.threading or THREADING:
+                    # A fresh process per run keeps peak RSS comparable
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        result = pool.submit(run_mode, path, conversion, threading_mode, fit).result()
+                    if args.json:
+                        print(json.dumps(result))
+                        continue
+                    peak = result["peak_rss_mb"]
+                    print(f"{result['source'][:20]:<20} {conversion:<12} {threading_mode:<9} "
+                          f"{result['frames']:>6} {result['fps']:>8.1f} "
+                          f"{result['cpu_ms_per_frame']:>9.2f} {'n/a' if peak is None else f'{peak:.0f}':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark: legacy PIL conversion vs. pooled QImageConverter.
+
+Run from project root:
+    python -m benchmarks.bench_frame_convert [--width 1920] [--height 1080] [--frames 200]
+    python -m benchmarks.bench_frame_convert --width 3840 --height 2160 --tile 640x360
+    python -m benchmarks.bench_frame_convert --width 3840 --height 2160 --tile 960x540 --zoom 4
+
+With --tile, also compares the old "convert full frame, let the UI scale it"
+path against scaling to the tile size and RGB32 inside swscale. --zoom adds
+a digital zoom into the centre of the frame: converting the full frame and
+cutting the region out of the QImage vs. cropping before conversion.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import av
+import numpy as np
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.qimage_convert import QImageConverter
+
+
+def make_frames(width: int, height: int, count: int = 8) -> list:
+    """Builds a few synthetic yuv420p frames (decoder output format)."""
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(count):
+        arr = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        frames.append(av.VideoFrame.from_ndarray(arr, format="rgb24").reformat(format="yuv420p"))
+    return frames
+
+
+def legacy_to_qimage(frame) -> QImage:
+    """The original AVEngine path: PyAV -> PIL -> bytes -> QImage."""
+    img = frame.to_image()
+    data = img.tobytes("raw", "RGB")
+    return QImage(data, img.width, img.height, QImage.Format_RGB888)
+
+
+def legacy_tile(frame, tile_w: int, tile_h: int) -> QImage:
+    """Full-size conversion followed by the UI-side smooth rescale."""
+    return legacy_to_qimage(frame).scaled(tile_w, tile_h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def run(convert, frames: list, iterations: int) -> float:
+    """Returns mean milliseconds per frame."""
+    convert(frames[0])  # warm-up (swscale context, pool allocation)
+    start = time.perf_counter()
+    for i in range(iterations):
+        convert(frames[i % len(frames)])
+    return (time.perf_counter() - start) * 1000.0 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--tile", default=None, metavar="WxH",
+                        help="also benchmark conversion for a display of this size")
+    parser.add_argument("--zoom", type=float, default=None,
+                        help="also benchmark a centred digital zoom of this factor (needs --tile)")
+    args = parser.parse_args()
+
+    frames = make_frames(args.width, args.height)
+    converter = QImageConverter()
+
+    legacy_ms = run(legacy_to_qimage, frames, args.frames)
+    pooled_ms = run(converter.to_qimage, frames, args.frames)
+
+    print(f"{args.width}x{args.height}, {args.frames} frames")
+    print(f"  legacy (PIL)    : {legacy_ms:7.2f} ms/frame")
+    print(f"  pooled (swscale): {pooled_ms:7.2f} ms/frame  ({legacy_ms / pooled_ms:.1f}x)")
+
+    if args.tile:
+        tile_w, tile_h = (int(v) for v in args.tile.split("x"))
+        fitted = QImageConverter(output_format=QImage.Format_RGB32)
+        fitted.output_size = (tile_w, tile_h)
+
+        legacy_tile_ms = run(lambda f: legacy_tile(f, tile_w, tile_h), frames, args.frames)
+        fitted_ms = run(fitted.to_qimage, frames, args.frames)
+
+        print(f"display tile {tile_w}x{tile_h}")
+        print(f"  legacy + UI scale   : {legacy_tile_ms:7.2f} ms/frame")
+        print(f"  swscale fit + RGB32 : {fitted_ms:7.2f} ms/frame  ({legacy_tile_ms / fitted_ms:.1f}x)")
+
+        if args.zoom:
+            side = 1.0 / args.zoom
+            crop = ((1.0 - side) / 2, (1.0 - side) / 2, side, side)
+            full = QImageConverter(output_format=QImage.Format_RGB32)
+            full.output_size = (round(tile_w * args.zoom), round(tile_h * args.zoom))
+            x, y = round(crop[0] * full.output_size[0]), round(crop[1] * full.output_size[1])
+
+            def zoom_full(frame):
+                return full.to_qimage(frame).copy(x, y, tile_w, tile_h)
+
+            cropped = QImageConverter(output_format=QImage.Format_RGB32)
+            cropped.output_size = (tile_w, tile_h)
+            cropped.crop = crop
+
+            zoom_full_ms = run(zoom_full, frames, args.frames)
+            cropped_ms = run(cropped.to_qimage, frames, args.frames)
+            print(f"digital zoom x{args.zoom:g} into {tile_w}x{tile_h}")
+            print(f"  convert, then cut   : {zoom_full_ms:7.2f} ms/frame")
+            print(f"  crop, then convert  : {cropped_ms:7.2f} ms/frame  ({zoom_full_ms / cropped_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Motion detection benchmark: per-frame cost of core.motion at 1080p.
+
+Run from project root:
+    python -m benchmarks.bench_motion [--width 1920] [--height 1080] [--frames 300] [--json]
+
+Times luma extraction plus MotionDetector.process() on synthetic yuv420p
+frames with a moving square, for several downscale factors, next to a
+full-resolution swscale gray conversion for comparison. Needs no Qt.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import av
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.motion import MotionConfig, MotionDetector, luma_plane
+
+
+def make_frames(width: int, height: int, count: int = 16) -> list:
+    """yuv420p frames of a noisy background with a square moving across it."""
+    rng = np.random.default_rng(0)
+    background = rng.integers(60, 90, size=(height, width, 3), dtype=np.uint8)
+    side = height // 6
+    frames = []
+    for i in range(count):
+        arr = background.copy()
+        x = (i * width // count) % (width - side)
+        arr[height // 2:height // 2 + side, x:x + side] = 230
+        frames.append(av.VideoFrame.from_ndarray(arr, format="rgb24").reformat(format="yuv420p"))
+    return frames
+
+
+def run(analyze, frames: list, iterations: int) -> float:
+    """Returns mean milliseconds per frame."""
+    analyze(frames[0])  # warm-up
+    start = time.perf_counter()
+    for i in range(iterations):
+        analyze(frames[i % len(frames)])
+    return (time.perf_counter() - start) * 1000.0 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per run")
+    args = parser.parse_args()
+
+    frames = make_frames(args.width, args.height)
+    results = []
+    for downscale in (4, 8, 16):
+        config = MotionConfig(downscale=downscale)
+        detector = MotionDetector(config)
+        ms = run(lambda f: detector.process(luma_plane(f, downscale), f.time), frames, args.frames)
+        results.append({"mode": f"motion /{downscale}", "ms_per_frame": ms})
+    # What converting the full frame first would cost before any analysis
+    ms = run(lambda f: f.reformat(format="gray").to_ndarray(), frames, args.frames)
+    results.append({"mode": "gray conversion only", "ms_per_frame": ms})
+
+    if args.json:
+        for result in results:
+            print(json.dumps({"width": args.width, "height": args.height, **result}))
+        return
+    print(f"{args.width}x{args.height}, {args.frames} frames")
+    for result in results:
+        print(f"  {result['mode']:<22}: {result['ms_per_frame']:7.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Multi-stream benchmark: aggregate decode fps with threads vs. worker processes.
+
+Run from project root:
+    python -m benchmarks.bench_processes [--streams 1 2 4 8] [--size 1280x720] [--frames 300] [--json]
+    python -m benchmarks.bench_processes clip.mp4 --streams 4 8 16
+
+Decodes N copies of the same clip at once (a synthetic one by default),
+converting to BGRA, and reports the total frames per second:
+
+- threads: N DecodeEngine threads in this process, the AVEngine setup
+- processes: N ProcessDecodePool workers, frames read from shared memory
+
+Each consumed frame is copied once, as the Qt adapters do. The process
+figures include worker start-up. Needs no Qt and no network.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from benchmarks.bench_engine import make_synthetic_clip
+from core.decode_engine import DecodeEngine
+from core.frame_convert import FrameConverter
+from core.process_pool import ProcessDecodePool
+
+
+class _Counter:
+    """Counts frames from many threads; copies each one like a consumer would."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.frames = 0
+
+    def __call__(self, image, frame):
+        image.data.copy()
+        with self._lock:
+            self.frames += 1
+
+
+def run_threads(path: str, streams: int) -> tuple[int, float]:
+    counter = _Counter()
+    engines = [
+        DecodeEngine(reconnect_policy=None, converter=FrameConverter(pix_fmt="bgra"), on_frame=counter)
+        for _ in range(streams)
+    ]
+    started = time.perf_counter()
+    for engine in engines:
+        engine.start_stream(path)
+    for engine in engines:
+        engine.wait()
+    return counter.frames, time.perf_counter() - started
+
+
+def run_processes(path: str, streams: int) -> tuple[int, float]:
+    counter = _Counter()
+    pool = ProcessDecodePool(max_workers=streams)
+    started = time.perf_counter()
+    sources = [pool.open(path, reconnect_policy=None, on_frame=counter) for _ in range(streams)]
+    for source in sources:
+        source.wait()
+    elapsed = time.perf_counter() - started
+    pool.close()
+    return counter.frames, elapsed
+
+
+MODES = {"threads": run_threads, "processes": run_processes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("file", nargs="?", help="local media file (default: synthetic clip)")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--size", default="1280x720", metavar="WxH", help="synthetic clip size")
+    parser.add_argument("--frames", type=int, default=300, help="synthetic clip length")
+    parser.add_argument("--codec", default="libx264", help="synthetic clip codec")
+    parser.add_argument("--mode", choices=list(MODES), action="append",
+                        help="only these modes (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if path is None:
+            width, height = (int(v) for v in args.size.split("x"))
+            path = str(make_synthetic_clip(Path(tmp) / "synthetic.mp4", width, height,
+                                           args.frames, codec=args.codec))
+        if not args.json:
+            print(f"{'mode':<10} {'streams':>7} {'frames':>7} {'seconds':>8} {'total fps':>10} {'fps/stream':>11}")
+        for streams in args.streams:
+            for mode in args.mode or MODES:
+                frames, elapsed = MODES[mode](path, streams)
+                result = {"mode": mode, "streams": streams, "frames": frames, "seconds": elapsed,
+                          "fps": frames / elapsed, "fps_per_stream": frames / elapsed / streams}
+                if args.json:
+                    print(json.dumps(result))
+                    continue
+                print(f"{mode:<10} {streams:>7} {frames:>7} {elapsed:>8.2f} "
+                      f"{result['fps']:>10.1f} {result['fps_per_stream']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
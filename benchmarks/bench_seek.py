@@ -0,0 +1,141 @@
+"""
+Seek benchmark: keyframe index and random-access latency in local files.
+
+Run from project root:
+    python -m benchmarks.bench_seek [--size 640x360] [--seconds 120] [--seeks 30] [--json]
+    python -m benchmarks.bench_seek recording.mp4 [--json]
+
+Times building and loading the keyframe index, then DecodeEngine.seek()
+and scrub() to random positions (from the call until the frame is shown),
+next to decoding from the start up to the same positions, which is what
+playback without seeking costs. Without files, a synthetic clip is encoded
+first. Needs no Qt.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import av
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from benchmarks.bench_engine import make_synthetic_clip
+from core.decode_engine import DecodeEngine
+from core.keyframe_index import KeyframeIndex, index_path
+from core.presentation import PacingConfig
+
+
+def time_index(path: str) -> dict:
+    index_path(path).unlink(missing_ok=True)
+    start = time.perf_counter()
+    index = KeyframeIndex.for_file(path)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    KeyframeIndex.load(path)
+    loaded = time.perf_counter() - start
+    return {"keyframes": len(index), "duration_s": index.duration,
+            "index_build_ms": built * 1000.0, "index_load_ms": loaded * 1000.0}
+
+
+def time_seeks(path: str, targets: list) -> dict:
+    """Milliseconds from seek()/scrub() until the frame is handed to on_frame."""
+    shown = threading.Event()
+    wanted = {"time": None}
+
+    def on_frame(image, frame):
+        if wanted["time"] is not None and frame.time is not None and frame.time >= wanted["time"]:
+            wanted["time"] = None
+            shown.set()
+
+    engine = DecodeEngine(reconnect_policy=None, pacing=PacingConfig(), on_frame=on_frame)
+
+    def run(request, seconds, at_least):
+        shown.clear()
+        wanted["time"] = at_least
+        start = time.perf_counter()
+        request(seconds)
+        if not shown.wait(10.0):
+            raise RuntimeError(f"No frame after seeking to {seconds:.2f} s")
+        return (time.perf_counter() - start) * 1000.0
+
+    engine.start_stream(path)
+    index = engine.keyframe_index(path)
+    # Park the engine on a scrub preview so playback does not compete
+    run(engine.scrub, 0.0, 0.0)
+    seeks, scrubs = [], []
+    for seconds in targets:
+        # on_frame sees pts time; seek() and scrub() count from the stream start
+        keyframe = float(index.keyframe_before(seconds) * index.time_base)
+        scrubs.append(run(engine.scrub, seconds, keyframe - 1e-3))
+        seeks.append(run(engine.seek, seconds, index.start_time + seconds - 1e-3))
+        run(engine.scrub, seconds, 0.0)
+    engine.stop()
+    engine.wait(10.0)
+    return {"seek_ms": _summary(seeks), "scrub_ms": _summary(scrubs)}
+
+
+def time_linear(path: str, targets: list) -> dict:
+    """Milliseconds to decode from the start until each target."""
+    times = []
+    for seconds in targets:
+        start = time.perf_counter()
+        with av.open(path) as container:
+            for frame in container.decode(video=0):
+                if frame.time is not None and frame.time >= seconds:
+                    break
+        times.append((time.perf_counter() - start) * 1000.0)
+    return {"linear_ms": _summary(times)}
+
+
+def _summary(values: list) -> dict:
+    values = sorted(values)
+    return {"mean": statistics.fmean(values), "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="local media files (default: synthetic clip)")
+    parser.add_argument("--size", default="640x360", metavar="WxH", help="synthetic clip size")
+    parser.add_argument("--seconds", type=int, default=120, help="synthetic clip length")
+    parser.add_argument("--codec", default="libx264", help="synthetic clip codec")
+    parser.add_argument("--seeks", type=int, default=30, help="random positions per file")
+    parser.add_argument("--linear", type=int, default=3,
+                        help="positions decoded from the start for comparison")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files
+        if not files:
+            width, height = (int(v) for v in args.size.split("x"))
+            clip = make_synthetic_clip(Path(tmp) / "synthetic.mp4", width, height,
+                                       args.seconds * 30, codec=args.codec)
+            files = [str(clip)]
+
+        for path in files:
+            result = {"source": Path(path).name, **time_index(path)}
+            # Stay clear of the very end, where a seek may find no later frame
+            span = max(result["duration_s"] - 1.0, 0.0)
+            targets = [rng.uniform(0.0, span) for _ in range(args.seeks)]
+            result.update(time_seeks(path, targets))
+            result.update(time_linear(path, sorted(targets)[-args.linear:]))
+            if args.json:
+                print(json.dumps(result))
+                continue
+            print(f"{result['source']}: {result['keyframes']} keyframes, {result['duration_s']:.0f} s")
+            print(f"  index build {result['index_build_ms']:9.1f} ms, load {result['index_load_ms']:.1f} ms")
+            for key in ("seek_ms", "scrub_ms", "linear_ms"):
+                stats = result[key]
+                print(f"  {key[:-3]:<7} mean {stats['mean']:8.1f} ms  p50 {stats['p50']:8.1f}  "
+                      f"p95 {stats['p95']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
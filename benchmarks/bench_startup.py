@@ -0,0 +1,99 @@
+"""
+Startup benchmark: time from launching the player until its window is shown.
+
+Run from project root:
+    python -m benchmarks.bench_startup [--runs 10] [--imports 15] [--json]
+
+Each run starts src/main.py in a fresh interpreter on the offscreen Qt
+platform with --quit-after-startup. Reports the wall time of the whole
+process, the app's own startup milestones (see core.startup) and, with
+--imports, the slowest modules by cumulative -X importtime.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MAIN = Path(__file__).resolve().parent.parent / "src" / "main.py"
+
+
+def run_once(report_path: Path, importtime: bool = False) -> tuple[float, dict, str]:
+    """Returns (wall seconds, startup report, stderr)."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += [str(MAIN), "--quit-after-startup", "--startup-report", str(report_path)]
+    started = time.perf_counter()
+    result = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - started
+    return wall, json.loads(report_path.read_text()), result.stderr
+
+
+def slowest_imports(importtime_log: str, count: int) -> list:
+    """(cumulative ms, module) pairs from -X importtime output, slowest first."""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        if cumulative_us.strip().isdigit():
+            rows.append((int(cumulative_us) / 1000.0, module.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="cold starts to time")
+    parser.add_argument("--imports", type=int, default=0, metavar="N",
+                        help="also list the N slowest imports (-X importtime)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object")
+    args = parser.parse_args()
+
+    walls, marks = [], {}
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = Path(tmp) / "startup.json"
+        # The first start warms the OS file cache; it is not counted
+        run_once(report_path)
+        for _ in range(args.runs):
+            wall, report, _ = run_once(report_path)
+            walls.append(wall * 1000.0)
+            for name, ms in report["marks_ms"].items():
+                marks.setdefault(name, []).append(ms)
+        imports = []
+        if args.imports:
+            _, _, log = run_once(report_path, importtime=True)
+            imports = slowest_imports(log, args.imports)
+
+    result = {
+        "runs": args.runs,
+        "wall_ms": {"median": statistics.median(walls), "min": min(walls), "max": max(walls)},
+        "marks_ms": {name: statistics.median(values) for name, values in marks.items()},
+        "deferred_loaded_at_window_shown": report["deferred_loaded"].get("window_shown"),
+        "slowest_imports_ms": [{"module": m.strip(), "cumulative": ms} for ms, m in imports],
+    }
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    wall = result["wall_ms"]
+    print(f"process wall time: median {wall['median']:.0f} ms "
+          f"(min {wall['min']:.0f}, max {wall['max']:.0f}) over {args.runs} runs")
+    for name, ms in result["marks_ms"].items():
+        print(f"  {name:<16} {ms:8.1f} ms")
+    print(f"deferred modules loaded before the window: "
+          f"{result['deferred_loaded_at_window_shown'] or 'none'}")
+    if imports:
+        print("slowest imports (cumulative):")
+        for ms, module in imports:
+            print(f"  {ms:8.1f} ms {module}")
+
+
+if __name__ == "__main__":
+    main()
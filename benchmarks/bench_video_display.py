@@ -0,0 +1,86 @@
+"""
+Headless benchmark: GUI-thread cost per frame of the legacy QLabel display
+vs. the paint-based VideoDisplay.
+
+Run from project root:
+    python -m benchmarks.bench_video_display [--width 1920] [--height 1080] [--frames 200]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QImage, QPixmap
+from PySide6.QtWidgets import QApplication, QLabel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from ui.video_display import VideoDisplay
+
+
+class LegacyVideoDisplay(QLabel):
+    """The original QLabel display: QPixmap + smooth rescale per frame."""
+
+    def update_frame(self, q_img: QImage):
+        pixmap = QPixmap.fromImage(q_img)
+        scaled_pixmap = pixmap.scaled(self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.setPixmap(scaled_pixmap)
+
+
+def make_images(width: int, height: int, count: int = 8) -> list:
+    images = []
+    for i in range(count):
+        img = QImage(width, height, QImage.Format_RGB888)
+        img.fill(QColor.fromHsv(i * 360 // count, 200, 200))
+        images.append(img)
+    return images
+
+
+def run(widget, images: list, iterations: int, fps: float) -> float:
+    """Returns mean GUI-thread milliseconds per frame (update + paint)."""
+    interval = 1.0 / fps
+    total = 0.0
+    for i in range(iterations + 1):
+        start = time.perf_counter()
+        widget.update_frame(images[i % len(images)])
+        widget.repaint()
+        elapsed = time.perf_counter() - start
+        if i:  # first frame is warm-up
+            total += elapsed
+        # Simulate the stream cadence so fps-dependent heuristics engage
+        time.sleep(max(0.0, interval - elapsed))
+    return total * 1000.0 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--display-size", default="960x540")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    display_w, display_h = (int(v) for v in args.display_size.split("x"))
+    images = make_images(args.width, args.height)
+
+    results = {}
+    for name, widget in (("legacy QLabel", LegacyVideoDisplay()), ("VideoDisplay", VideoDisplay())):
+        widget.setMinimumSize(0, 0)
+        widget.resize(display_w, display_h)
+        widget.show()
+        app.processEvents()
+        results[name] = run(widget, images, args.frames, args.fps)
+        widget.close()
+
+    print(f"{args.width}x{args.height} -> {display_w}x{display_h} @ {args.fps:g} fps, {args.frames} frames")
+    for name, ms in results.items():
+        print(f"  {name:14s}: {ms:7.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
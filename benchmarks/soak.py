@@ -0,0 +1,130 @@
+"""
+Soak test: memory, thread, descriptor and latency stability of AVEngine over a long run.
+
+Run from project root:
+    python -m benchmarks.soak [--duration 3600] [--report soak.json] [--baseline old.json]
+    python -m benchmarks.soak recording.mp4 "main.mp4|sub.mp4" --duration 86400
+
+Without files, a 1280x720 clip and a 320x180 sub-stream of it are encoded
+first and played as a plain source and as a MAIN|SUB source in turn. The
+engine restarts on the next source every --cycle seconds and the display
+size alternates every --resize seconds (see core.soak). Prints one line
+per --progress seconds, writes the full report with --report, compares
+its checks with an earlier report given to --baseline, and exits with
+status 1 if a check failed.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from benchmarks.bench_engine import make_synthetic_clip
+from core.soak import (
+    SoakConfig, SoakHarness, SoakThresholds, compare_reports, load_report, write_report,
+)
+
+
+def _optional(value: str):
+    return None if value.lower() == "off" else float(value)
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sources", nargs="*", help="local files or MAIN|SUB pairs (default: synthetic)")
+    parser.add_argument("--duration", type=float, default=3600.0, metavar="SECONDS")
+    parser.add_argument("--warmup", type=float, default=None, metavar="SECONDS",
+                        help="left out of the analysis (default: 25%% of the duration, at most 300 s)")
+    parser.add_argument("--sample", type=float, default=1.0, metavar="SECONDS",
+                        help="seconds between samples")
+    parser.add_argument("--cycle", type=_optional, default=30.0, metavar="SECONDS|off",
+                        help="restart the engine on the next source this often")
+    parser.add_argument("--resize", type=_optional, default=10.0, metavar="SECONDS|off",
+                        help="alternate the display size this often")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="do not trace Python allocations")
+    parser.add_argument("--max-rss-slope", type=_optional, default=50.0, metavar="MB_PER_HOUR|off")
+    parser.add_argument("--max-heap-slope", type=_optional, default=10.0, metavar="MB_PER_HOUR|off")
+    parser.add_argument("--max-thread-growth", type=_optional, default=2, metavar="N|off")
+    parser.add_argument("--max-fd-growth", type=_optional, default=4, metavar="N|off",
+                        help="open file descriptors (handles on Windows)")
+    parser.add_argument("--max-latency-drift", type=_optional, default=1.5, metavar="RATIO|off",
+                        help="late vs. early median frame latency")
+    parser.add_argument("--min-span", type=float, default=600.0, metavar="SECONDS",
+                        help="judge memory growth only over at least this long after the warm-up")
+    parser.add_argument("--progress", type=float, default=60.0, metavar="SECONDS",
+                        help="print a sample this often (0: never)")
+    parser.add_argument("--report", metavar="PATH", help="write the report as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare with this earlier report")
+    return parser.parse_args(argv)
+
+
+def make_sources(directory: Path) -> list:
+    """A plain 1280x720 source and a MAIN|SUB pair, 20 s each."""
+    main = make_synthetic_clip(directory / "main.mp4", 1280, 720, 600)
+    sub = make_synthetic_clip(directory / "sub.mp4", 320, 180, 600)
+    return [str(main), f"{main}|{sub}"]
+
+
+def _format(value) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def main(argv: list | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    warmup = args.warmup if args.warmup is not None else min(300.0, args.duration * 0.25)
+    thread_growth = args.max_thread_growth
+    fd_growth = args.max_fd_growth
+    config = SoakConfig(
+        duration=args.duration,
+        sample_interval=args.sample,
+        cycle_seconds=args.cycle,
+        resize_seconds=args.resize,
+        warmup=warmup,
+        tracemalloc=not args.no_tracemalloc,
+        thresholds=SoakThresholds(
+            rss_mb_per_hour=args.max_rss_slope,
+            heap_mb_per_hour=args.max_heap_slope,
+            thread_growth=None if thread_growth is None else int(thread_growth),
+            fd_growth=None if fd_growth is None else int(fd_growth),
+            latency_drift=args.max_latency_drift,
+            min_span=args.min_span,
+        ),
+    )
+    next_progress = [args.progress]
+
+    def progress(sample):
+        if args.progress and sample.t >= next_progress[0]:
+            next_progress[0] += args.progress
+            print(f"{sample.t:7.0f} s  rss {_format(sample.rss_mb)} MB  heap {_format(sample.heap_mb)} MB  "
+                  f"threads {sample.threads}  fds {_format(sample.fds)}  "
+                  f"latency p50 {_format(sample.latency_p50_ms)} ms  "
+                  f"{sample.fps:.0f} fps  cycles {sample.cycles}", flush=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = args.sources or make_sources(Path(tmp))
+        report = SoakHarness(sources, config, on_sample=progress).run()
+
+    totals = report["totals"]
+    print(f"{totals['seconds']:.0f} s, {totals['frames']} frames, {totals['cycles']} cycles, "
+          f"{totals['restarts']} restarts, {totals['stream_switches']} stream switches")
+    for name, check in report["checks"].items():
+        verdict = {True: "ok  ", False: "FAIL", None: "n/a "}[check["ok"]]
+        print(f"  {verdict} {name:<24} {_format(check['value']):>10}  (limit {_format(check['limit'])})")
+    for allocation in report["top_allocators"][:5]:
+        print(f"  {allocation['size_diff_kb']:+10.1f} KiB  {allocation['location']}")
+    if args.baseline:
+        print(f"compared with {args.baseline}:")
+        for name, before, after in compare_reports(load_report(args.baseline), report):
+            print(f"  {name:<24} {_format(before):>10} -> {_format(after)}")
+    if args.report:
+        write_report(args.report, report)
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
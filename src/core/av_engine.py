@@ -1,142 +1,436 @@
-import av
+import itertools
 import logging
 import threading
-import traceback
-from PySide6.QtCore import QObject, Signal, Slot
+import weakref
+from dataclasses import dataclass
+
+from PySide6.QtCore import QObject, QRectF, QSize, Signal, Slot
 from PySide6.QtGui import QImage
 
-# For debugging: see logs in PyCharm Run console
+from .connection_cache import ConnectionCache
+from .decode_engine import DecodeEngine
+from .frame_mailbox import FrameMailbox
+from .motion import MotionAnalyzer, MotionConfig
+from .pipeline import PipelineConfig
+from .presentation import PacingConfig
+from .qimage_convert import QImageConverter, crop_region
+from .reconnect import BackoffPolicy
+from .recorder import Recorder, RecordingConfig
+from .snapshot import SnapshotWriter
+from .sources import MAIN, StreamSelector, StreamSource
+from .stream_profiles import DEFAULT_PROFILE
+
 logger = logging.getLogger("RTSP")
-logger.setLevel(logging.DEBUG)
+
+
+def _forward(engine, method: str, *bound):
+    """
+    Callback calling engine.<method>(*bound, *args) through a weak
+    reference. A strong one would close a reference cycle, and the garbage
+    collector could then delete the QObject on whichever decode thread
+    happened to trigger it.
+    """
+    ref = weakref.ref(engine)
+
+    def forward(*args):
+        target = ref()
+        if target is not None:
+            getattr(target, method)(*bound, *args)
+
+    return forward
+
+
+@dataclass
+class _Standby:
+    """A stream being switched to; it takes over at its first keyframe."""
+
+    token: int
+    core: DecodeEngine
+    converter: QImageConverter
+    variant: str
 
 
 class AVEngine(QObject):
     """
     Video engine using PyAV (FFmpeg bindings) for high-performance
     RTSP stream decoding and local webcam support.
+
+    Qt adapter around the headless core.decode_engine.DecodeEngine: frames
+    are converted to QImages and left in ``frame_mailbox``, everything else
+    is reported through signals.
+
+    For a camera with a sub-stream (core.sources.StreamSource) the engine
+    plays whichever stream suits the display size and load. A switch runs
+    the new stream on a second DecodeEngine while the old one keeps
+    feeding the display, and swaps them at the new stream's first keyframe.
     """
-    # Signal to send decoded frames to the UI thread
-    new_frame_signal = Signal(QImage)
     # (user_message, technical_detail) for UI; detail shown in "Show Details"
     error_signal = Signal(str, str)
     # Signal to report connection status changes
     status_signal = Signal(str)
+    # Periodic stats() snapshot, emitted from the decode thread
+    stats_signal = Signal(dict)
+    # Path of a snapshot() file once written, emitted from the snapshot thread
+    snapshot_signal = Signal(str)
+    # A session ended and released its source (stop() itself returns at once)
+    stopped_signal = Signal()
+    # core.motion.MotionEvent, emitted from the motion worker thread
+    motion_signal = Signal(object)
+    # "main" or "sub" after the engine switched streams
+    stream_switched_signal = Signal(str)
+
+    STAGES = DecodeEngine.STAGES
 
-    def __init__(self):
+    def __init__(self, scheduler=None, profile: str = DEFAULT_PROFILE,
+                 reconnect_policy: BackoffPolicy | None = BackoffPolicy(),
+                 pipeline: PipelineConfig | None = None,
+                 pacing: PacingConfig | None = None, auto_decode_mode: bool = False,
+                 connections: ConnectionCache | None = None,
+                 motion: MotionConfig | None = None):
+        """
+        Arguments as for DecodeEngine. With auto_decode_mode, the decode mode
+        follows the display reported to fit_to_display() and
+        set_display_visible() (see core.decode_modes). With motion, decoded
+        frames are also analyzed for motion (see core.motion), reported by
+        motion_signal.
+        """
         super().__init__()
-        self._is_running = False
-        self._thread = None
-        self._container = None
-
-    def start_stream(self, url: str):
-        """Initializes and starts the background decoding thread."""
-        # Stop any existing stream first
-        if self._is_running:
-            self.stop()
-            # Wait for thread to finish if it exists
-            if self._thread and self._thread.is_alive():
-                self._thread.join(timeout=0.5)
-
-        # Reset state
-        self._is_running = True
-        self.status_signal.emit("Connecting")
-        self._thread = threading.Thread(
-            target=self._decode_loop,
-            args=(url,),
-            daemon=True
+        self.auto_decode_mode = auto_decode_mode
+        self._display_size = None
+        self._display_visible = True
+        # RGB32 is the format QPainter blits without an extra conversion
+        self._output_format = QImage.Format_RGB32
+        self._core_options = dict(scheduler=scheduler, reconnect_policy=reconnect_policy,
+                                  pipeline=pipeline, pacing=pacing, connections=connections)
+        # Latest decoded frame; the UI pulls from here on its refresh tick
+        self.frame_mailbox = FrameMailbox()
+        self._snapshots = SnapshotWriter()
+        self._motion = None
+        if motion is not None:
+            self._motion = MotionAnalyzer(motion, on_motion=_forward(self, "_on_motion"))
+        # Main/sub-stream switching. Callbacks carry the token of the
+        # DecodeEngine they come from; only the current one (and a standby's
+        # first keyframe) reaches the display. Guarded by _switch_lock.
+        self._switch_lock = threading.Lock()
+        # Picks main or sub-stream; tune its thresholds here
+        self.stream_selector = StreamSelector()
+        self._source = None
+        self._failed_variants = set()
+        self._standby = None
+        self._recording_config = None
+        self.stream_variant = MAIN
+        self.stream_switches = 0
+        self._tokens = itertools.count()
+        self._token = next(self._tokens)
+        self._converter, self.core = self._make_core(self._token, profile)
+
+    def _make_core(self, token: int, profile: str):
+        """A DecodeEngine with its own QImage converter, reporting under token."""
+        pipeline = self._core_options["pipeline"]
+        # Every conversion worker may hold one pooled buffer in flight
+        workers = pipeline.convert_workers if pipeline is not None else 0
+        converter = QImageConverter(pool_slots=4 + workers, output_format=self._output_format)
+        core = DecodeEngine(
+            profile=profile,
+            **self._core_options,
+            converter=converter,
+            convert=converter.to_qimage,
+            on_frame=_forward(self, "_on_frame", token),
+            on_status=_forward(self, "_on_status", token),
+            on_error=_forward(self, "_on_error", token),
+            on_stats=_forward(self, "_on_stats", token),
+            on_stopped=_forward(self, "_on_stopped", token),
         )
-        self._thread.start()
+        return converter, core
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames decoded but overwritten before the UI displayed them."""
+        return self.frame_mailbox.dropped
+
+    @property
+    def profile(self) -> str:
+        return self.core.profile
+
+    @property
+    def reconnect_count(self) -> int:
+        return self.core.reconnect_count
+
+    @property
+    def is_recording(self) -> bool:
+        return self.core.is_recording
+
+    @property
+    def is_running(self) -> bool:
+        """See DecodeEngine.is_running."""
+        return self.core.is_running
+
+    @Slot(str)
+    def set_profile(self, name: str):
+        """Selects the RTSP tuning profile used by the next start_stream()."""
+        self.core.set_profile(name)
 
-    def _decode_loop(self, url: str):
+    def start_recording(self, config: RecordingConfig = RecordingConfig()) -> Recorder:
+        """See DecodeEngine.start_recording. A stream switch continues it in new files."""
+        self._recording_config = config
+        return self.core.start_recording(config)
+
+    def stop_recording(self) -> list:
+        """See DecodeEngine.stop_recording."""
+        self._recording_config = None
+        return self.core.stop_recording()
+
+    def snapshot(self, path, quality: int = -1):
         """
-        Background loop for fetching and decoding packets from a source.
+        Saves the newest decoded frame at full resolution to path (.png, .jpg
+        or .jpeg). Encoding runs on a worker thread; returns a Future that
+        resolves to the written Path. snapshot_signal reports it as well.
+
+        Raises:
+            RuntimeError: No frame has been decoded yet.
+            ValueError: Unsupported file suffix.
         """
+        frame = self.core.latest_frame
+        if frame is None:
+            raise RuntimeError("No frame decoded yet")
+        future = self._snapshots.capture(
+            frame, path, quality, on_saved=lambda saved: self.snapshot_signal.emit(str(saved))
+        )
+        future.add_done_callback(self._on_snapshot_done)
+        return future
+
+    def _on_snapshot_done(self, future):
+        error = future.exception()
+        if error is not None:
+            logger.error("Snapshot failed: %s", error)
+            self.error_signal.emit("Snapshot failed", f"{type(error).__name__}: {error}")
+
+    def latency_stats(self) -> dict:
+        """See DecodeEngine.latency_stats."""
+        return self.core.latency_stats()
+
+    def stats(self) -> dict:
+        """DecodeEngine.stats() plus the mailbox's display-side counters (and motion stats)."""
+        return self._with_adapter_stats(self.core.stats())
 
-        def emit_error(user_msg: str, technical: str):
-            logger.error("RTSP error: %s | %s", user_msg, technical)
-            traceback.print_exc()
+    def _with_adapter_stats(self, stats: dict) -> dict:
+        stats["dropped_frames"] = self.frame_mailbox.dropped
+        stats["delivered_frames"] = self.frame_mailbox.delivered
+        stats["queue_depth"] = int(self.frame_mailbox.pending)
+        stats["stream_variant"] = self.stream_variant
+        stats["stream_switches"] = self.stream_switches
+        if self._motion is not None:
+            stats.update(self._motion.stats())
+        return stats
+
+    def _on_status(self, token: int, status: str):
+        if token == self._token:
+            self.status_signal.emit(status)
+
+    def _on_error(self, token: int, user_msg: str, technical: str):
+        if token == self._token:
             self.error_signal.emit(user_msg, technical)
+            return
+        with self._switch_lock:
+            standby = self._standby
+            if standby is None or standby.token != token:
+                return
+            # Keep playing the current stream; do not retry this one
+            self._failed_variants.add(standby.variant)
+            self._standby = None
+        logger.warning("Switching to the %s stream failed: %s (%s)", standby.variant, user_msg, technical)
+        standby.core.stop()
+
+    def _on_stats(self, token: int, stats: dict):
+        if token != self._token:
+            return
+        self.stream_selector.report_load(stats)
+        self.stats_signal.emit(self._with_adapter_stats(stats))
+        self._update_stream_variant()
+
+    def _on_stopped(self, token: int):
+        if token == self._token:
+            self.stopped_signal.emit()
+
+    def _on_motion(self, event):
+        self.motion_signal.emit(event)
+
+    def _on_frame(self, token: int, image: QImage, frame):
+        if token != self._token:
+            if frame.key_frame:
+                self._promote(token, image, frame)
+            return
+        self._show(image, frame)
+
+    def _show(self, image: QImage, frame):
+        self.frame_mailbox.put(image)
+        if self._motion is not None:
+            # Only hands over the reference; analysis runs on its own thread
+            self._motion.submit(frame)
 
-        try:
-            logger.info("Opening source: %s", url)
-
-            # --- החלק ששינינו מתחיל כאן ---
-            url_str = str(url).strip()
-            is_rtsp = url_str.startswith("rtsp://")
-            is_webcam = url_str.isdigit() or url_str.startswith("video=")
-
-            if is_rtsp:
-                # RTSP source
-                options = {
-                    "rtsp_transport": "tcp",
-                    "stimeout": "5000000",
-                    "buffer_size": "1024000",
-                }
-                self._container = av.open(url_str, options=options)
-
-            elif is_webcam:
-                # Webcam source for Windows (DirectShow)
-                camera_src = f"video={url_str}" if url_str.isdigit() else url_str
-                logger.info(f"Attempting to open webcam via dshow: {camera_src}")
-                self._container = av.open(camera_src, format='dshow')
-
-            else:
-                # Local file source
-                self._container = av.open(url_str)
-            # --- החלק ששינינו נגמר כאן ---
-
-            if not self._container.streams.video:
-                emit_error("No video data received from source", "Container has no video stream.")
-                self.stop()
+    def _promote(self, token: int, image: QImage, frame):
+        """A standby stream delivered its first keyframe: it replaces the current one."""
+        with self._switch_lock:
+            standby = self._standby
+            if standby is None or standby.token != token:
                 return
+            old = self.core
+            self.core, self._converter, self._token = standby.core, standby.converter, token
+            self.stream_variant = standby.variant
+            self.stream_switches += 1
+            self._standby = None
+        self._show(image, frame)
+        recording = self._recording_config if old.is_recording else None
+        old.stop()
+        if recording is not None:
+            self.core.start_recording(recording)
+        logger.info("Switched to the %s stream", standby.variant)
+        self.stream_switched_signal.emit(standby.variant)
+
+    def _update_stream_variant(self):
+        """Starts a switch when the display size or load calls for the other stream."""
+        source = self._source
+        if source is None or source.sub is None or not self.core.is_running:
+            return
+        size = self._display_size
+        width, height = (size.width(), size.height()) if size is not None else (0, 0)
+        crop = self.core.converter.crop
+        if crop is not None:
+            # A zoomed display needs as many source pixels as a larger one
+            width, height = int(width / crop[2]), int(height / crop[3])
+        variant = self.stream_selector.choose(width, height)
+        with self._switch_lock:
+            if self._source is not source:
+                return
+            standby = self._standby
+            if standby is not None and standby.variant == variant:
+                return
+            self._standby = None
+            if variant != self.stream_variant and variant not in self._failed_variants:
+                token = next(self._tokens)
+                converter, core = self._make_core(token, self.core.profile)
+                self._standby = _Standby(token, core, converter, variant)
+            new_standby = self._standby
+            current = self.core
+        if standby is not None:
+            # Direction changed while switching
+            standby.core.stop()
+        if new_standby is not None:
+            core = new_standby.core
+            core.converter.output_size = current.converter.output_size
+            core.converter.crop = current.converter.crop
+            core.set_decode_mode(current.decode_mode)
+            core.start_stream(source.url(variant))
+
+    def set_output_size(self, width: int, height: int):
+        """See DecodeEngine.set_output_size."""
+        self.core.set_output_size(width, height)
+        standby = self._standby
+        if standby is not None:
+            standby.core.set_output_size(width, height)
+
+    @Slot(QSize)
+    def fit_to_display(self, size: QSize):
+        """Slot for VideoDisplay.resized: decode at the display's size."""
+        self.set_output_size(size.width(), size.height())
+        self._display_size = size
+        self._update_decode_mode()
+        self._update_stream_variant()
+
+    @Slot(bool)
+    def set_display_visible(self, visible: bool):
+        """Slot for VideoDisplay.on_screen_changed."""
+        self._display_visible = visible
+        self._update_decode_mode()
+
+    @Slot(QRectF)
+    def set_region(self, region: QRectF):
+        """Slot for VideoDisplay.region_changed: converts only the zoomed region (see DecodeEngine.set_crop)."""
+        crop = crop_region(region)
+        self.core.set_crop(crop)
+        standby = self._standby
+        if standby is not None:
+            standby.core.set_crop(crop)
+        self._update_stream_variant()
+
+    @property
+    def decode_mode(self) -> str:
+        return self.core.decode_mode
+
+    @Slot(str)
+    def set_decode_mode(self, name: str):
+        """Fixes the decode mode (see DecodeEngine.set_decode_mode); turns auto_decode_mode off."""
+        self.auto_decode_mode = False
+        self.core.set_decode_mode(name)
+
+    def _update_decode_mode(self):
+        if not self.auto_decode_mode:
+            return
+        size = self._display_size
+        if size is None:
+            if self._display_visible:
+                # Size still unknown; keep decoding in full until it is
+                return
+            size = QSize()
+        self.core.fit_decode_mode(self._display_visible, size.width(), size.height())
+
+    def set_output_format(self, q_format: QImage.Format):
+        """
+        Selects the QImage format frames are converted to: Format_RGB888,
+        Format_RGB32 (default) or Format_ARGB32_Premultiplied.
+        """
+        self._output_format = q_format
+        self._converter.output_format = q_format
+
+    @Slot(float)
+    def seek(self, seconds: float):
+        """See DecodeEngine.seek (local files)."""
+        self.core.seek(seconds)
+
+    @Slot(float)
+    def scrub(self, seconds: float):
+        """See DecodeEngine.scrub (local files)."""
+        self.core.scrub(seconds)
+
+    def prewarm(self, urls):
+        """See DecodeEngine.prewarm."""
+        self.core.prewarm(urls)
+
+    def start_stream(self, url: str | StreamSource):
+        """
+        Starts decoding in the background; never blocks (see
+        DecodeEngine.start_stream). url may name a sub-stream as "MAIN|SUB"
+        (or be a StreamSource); the stream to start with follows the
+        display size.
+        """
+        source = url if isinstance(url, StreamSource) else StreamSource.parse(url)
+        self._cancel_standby()
+        # Stop first, so the old session cannot refill the reset mailbox
+        if self.core.is_running:
+            self.core.stop()
+        self.frame_mailbox.reset()
+        if self._motion is not None:
+            self._motion.reset()
+        size = self._display_size
+        with self._switch_lock:
+            self._source = source
+            self._failed_variants = set()
+            self.stream_variant = MAIN
+            if source.sub is not None and size is not None:
+                self.stream_variant = self.stream_selector.choose(size.width(), size.height())
+        self.core.start_stream(source.url(self.stream_variant))
+
+    def _cancel_standby(self):
+        with self._switch_lock:
+            standby, self._standby = self._standby, None
+        if standby is not None:
+            standby.core.stop()
 
-            stream = self._container.streams.video[0]
-            stream.thread_type = 'AUTO'
-
-            self.status_signal.emit("Streaming")
-            frame_count = 0
-
-            for frame in self._container.decode(stream):
-                if not self._is_running:
-                    break
-
-                frame_count += 1
-
-                try:
-                    img = frame.to_image()
-                    data = img.tobytes("raw", "RGB")
-                    q_img = QImage(data, img.width, img.height, QImage.Format_RGB888)
-                    self.new_frame_signal.emit(q_img)
-                except Exception:
-                    continue
-
-            if frame_count == 0 and self._is_running:
-                emit_error("No video data received from source", "Decode loop ended with 0 frames.")
-
-        except (av.FFmpegError, av.OSError) as e:
-            technical = f"{type(e).__name__}: {e}"
-            error_msg = str(e).lower()
-            if '401' in error_msg or 'unauthorized' in error_msg:
-                emit_error("Authentication failed. Check credentials", technical)
-            else:
-                emit_error("Connection failed. Check source and network", technical)
-            self.stop()
-        except Exception as e:
-            technical = f"{type(e).__name__}: {e}"
-            emit_error(f"Error: {str(e)}", technical)
-            self.stop()
-        finally:
-            if self._container:
-                try:
-                    self._container.close()
-                except Exception:
-                    pass
-                self._container = None
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits for the decode thread or task to end; False on timeout."""
+        return self.core.wait(timeout)
 
     def stop(self):
-        was_running = self._is_running
-        self._is_running = False
-        if self._thread and threading.current_thread() != self._thread:
-            self._thread.join(timeout=2.0)
-        if was_running:
-            self.status_signal.emit("Ready")
\ No newline at end of file
+        """Returns at once; stopped_signal follows when the session has ended."""
+        self._cancel_standby()
+        self.core.stop()
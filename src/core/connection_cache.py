@@ -0,0 +1,251 @@
+"""
+Connection cache: remembered stream parameters and pre-opened sources.
+
+Opening an RTSP camera costs a DESCRIBE/SETUP round trip plus stream
+probing. ConnectionCache keeps the SessionParams of every source that
+delivered frames (an LRU keyed by URL without credentials), so the next
+open of the same camera skips most of the probing. Optionally it also
+keeps a few "favorite" sources connected in the background. Each warm
+connection keeps reading and holds the packets since the last keyframe,
+so switching to it shows a picture at once.
+"""
+import collections
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from .recorder import PreEventBuffer
+
+logger = logging.getLogger("RTSP")
+
+
+def cache_key(url: str) -> str:
+    """
+    The URL without user name and password. Keys never hold secrets, and
+    the same camera still matches after its password changes.
+    """
+    url = url.strip()
+    if "://" not in url:
+        return url
+    parts = urlsplit(url)
+    netloc = parts.netloc.rpartition("@")[2].lower()
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path, parts.query, ""))
+
+
+def is_prewarmable(url: str) -> bool:
+    """Network sources only: opening a file is cheap, and a device is exclusive."""
+    return "://" in url
+
+
+class WarmConnection:
+    """A source opened on a background thread and read until it is taken."""
+
+    def __init__(self, url: str, opener):
+        self.url = url
+        self.error = None
+        self._opener = opener
+        self._container = None
+        self._stream = None
+        self._gop = PreEventBuffer()
+        self._lock = threading.Lock()
+        self._opened = threading.Event()
+        self._stop = threading.Event()
+        # Guarded by _lock: a taker wants the container; the reader ended
+        self._wanted = False
+        self._finished = False
+        self._usable = False
+        self._thread = threading.Thread(target=self._run, name="Prewarm", daemon=True)
+        self._thread.start()
+
+    @property
+    def is_open(self) -> bool:
+        """Connected and still reading."""
+        return self._opened.is_set() and not self._finished
+
+    @property
+    def is_dead(self) -> bool:
+        """Failed to open or lost its connection."""
+        return self._finished and not self._wanted
+
+    def wait_open(self, timeout: float | None = None) -> bool:
+        return self._opened.wait(timeout) and self.error is None
+
+    def take(self, timeout: float = 1.0):
+        """
+        Stops the reader and hands over (container, stream, packets), where
+        packets start at the most recent keyframe. Returns None if the
+        connection is not open, or the reader does not stop within timeout.
+        The caller owns (and closes) the container.
+        """
+        if not self.is_open:
+            return None
+        with self._lock:
+            self._wanted = True
+        self._stop.set()
+        self._thread.join(timeout)
+        with self._lock:
+            if not self._finished:
+                # Stuck in a read; the reader closes the container itself
+                self._wanted = False
+                return None
+            if not self._usable:
+                return None
+        packets = self._gop.packets()
+        if packets and not packets[0].is_keyframe:
+            # No keyframe received yet; nothing decodable to replay
+            packets = []
+        return self._container, self._stream, packets
+
+    def close(self):
+        """Disconnects without waiting for the reader."""
+        self._stop.set()
+
+    def _run(self):
+        stopped = False
+        try:
+            self._container = self._opener(self.url)
+            self._stream = self._container.streams.video[0]
+            self._opened.set()
+            for packet in self._container.demux(self._stream):
+                # Keep the packet read while take() waited: the next owner
+                # continues demuxing after it
+                if packet.size:
+                    self._gop.add(packet)
+                if self._stop.is_set():
+                    stopped = True
+                    break
+            else:
+                logger.info("Pre-opened source ended: %s", cache_key(self.url))
+        except Exception as e:
+            self.error = e
+            logger.warning("Pre-opening %s failed: %s", cache_key(self.url), e)
+        finally:
+            self._opened.set()
+            with self._lock:
+                self._finished = True
+                self._usable = stopped and self._wanted
+                keep = self._usable
+            if not keep and self._container is not None:
+                try:
+                    self._container.close()
+                except Exception:
+                    pass
+
+
+class ConnectionCache:
+    """
+    Stream parameters per source (LRU, at most max_params) and up to
+    max_open pre-opened favorite sources: the ones used most recently, or
+    the first ones given to prewarm(). Share one instance between engines;
+    all methods are thread-safe.
+    """
+
+    def __init__(self, max_params: int = 64, max_open: int = 4):
+        if max_params < 1 or max_open < 0:
+            raise ValueError("max_params must be positive and max_open non-negative")
+        self.max_params = max_params
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._params = collections.OrderedDict()
+        # key -> WarmConnection
+        self._warm = {}
+        # key -> URL (with credentials) to keep warm, most recently used first
+        self._favorites = collections.OrderedDict()
+        self._in_use = collections.Counter()
+        self._opener = None
+
+    def params(self, url: str):
+        """Cached SessionParams for url, or None."""
+        key = cache_key(url)
+        with self._lock:
+            params = self._params.get(key)
+            if params is not None:
+                self._params.move_to_end(key)
+            return params
+
+    def store(self, url: str, params):
+        with self._lock:
+            key = cache_key(url)
+            self._params[key] = params
+            self._params.move_to_end(key)
+            while len(self._params) > self.max_params:
+                self._params.popitem(last=False)
+
+    def prewarm(self, urls, opener):
+        """
+        Keeps the first max_open network sources of urls connected in the
+        background; warm connections to other sources are closed.
+        opener(url) must return an opened av container.
+        """
+        with self._lock:
+            self._opener = opener
+            self._favorites = collections.OrderedDict(
+                (cache_key(url), url) for url in urls if is_prewarmable(url)
+            )
+            self._refill()
+
+    def is_warm(self, url: str) -> bool:
+        with self._lock:
+            warm = self._warm.get(cache_key(url))
+            return warm is not None and warm.is_open
+
+    def acquire(self, url: str, timeout: float = 1.0):
+        """
+        Marks url as in use until release(url), so it is not pre-opened
+        meanwhile. Hands over its warm connection as (container, stream,
+        packets since the last keyframe) if there is one, otherwise returns
+        None and the caller opens the source itself.
+        """
+        key = cache_key(url)
+        with self._lock:
+            self._in_use[key] += 1
+            warm = self._warm.pop(key, None)
+        if warm is None:
+            return None
+        taken = warm.take(timeout)
+        if taken is None:
+            warm.close()
+        return taken
+
+    def release(self, url: str):
+        """The caller stopped using url; favorites are pre-opened again."""
+        key = cache_key(url)
+        with self._lock:
+            self._in_use[key] -= 1
+            if self._in_use[key] <= 0:
+                del self._in_use[key]
+            if key in self._favorites:
+                # Most recently used favorites stay warm first
+                self._favorites.move_to_end(key, last=False)
+            self._refill()
+
+    def close(self):
+        """Disconnects all warm connections and forgets the favorites."""
+        with self._lock:
+            self._favorites = collections.OrderedDict()
+            while self._warm:
+                self._warm.popitem()[1].close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cached_params": len(self._params),
+                "warm_connections": sum(1 for warm in self._warm.values() if warm.is_open),
+            }
+
+    def _refill(self):
+        """
+        Keeps the max_open most recently used favorites (not currently in
+        use) connected, closing the rest. Lock held.
+        """
+        wanted = [key for key in self._favorites if key not in self._in_use][:self.max_open]
+        for key in list(self._warm):
+            warm = self._warm[key]
+            if key not in wanted or warm.is_dead:
+                del self._warm[key]
+                warm.close()
+        if self._opener is None:
+            return
+        for key in wanted:
+            if key not in self._warm:
+                self._warm[key] = WarmConnection(self._favorites[key], self._opener)
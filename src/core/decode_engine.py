@@ -0,0 +1,1048 @@
+"""
+Qt-free decode engine.
+
+DecodeEngine opens a source (RTSP, file or webcam), decodes and converts its
+frames and hands them to plain callbacks, or yields them from frames(). It
+owns reconnection, tuning profiles, the staged pipeline, recording and the
+performance counters, so it runs the same in a server process, a benchmark
+or behind the Qt adapter (core.av_engine.AVEngine).
+"""
+import av
+import collections
+import itertools
+import logging
+import threading
+import time
+import traceback
+
+from .connection_cache import ConnectionCache
+from .decode_modes import DEFAULT_DECODE_MODE, FrameRateCap, choose_decode_mode, get_decode_mode
+from .frame_convert import FrameConverter
+from .keyframe_index import KeyframeIndex
+from .pipeline import PipelineConfig, StagedPipeline
+from .presentation import PacingConfig, PresentationClock
+from .reconnect import BackoffPolicy, SessionParams
+from .recorder import PreEventBuffer, Recorder, RecordingConfig
+from .stats import CpuMeter, RateMeter, RollingStats
+from .stream_profiles import DEFAULT_PROFILE, get_profile
+
+# For debugging: see logs in PyCharm Run console
+logger = logging.getLogger("RTSP")
+logger.setLevel(logging.DEBUG)
+
+
+def _ignore(*args):
+    pass
+
+
+def open_source(url_str: str, profile, resume: SessionParams | None = None,
+                timeout=None):
+    """
+    Opens an RTSP URL (tuned by a StreamProfile), a DirectShow webcam
+    ("0", "video=...") or a local file. Network sources are probed
+    minimally when resume holds the parameters of an earlier session;
+    devices and files always get FFmpeg's full probing. timeout is av.open's
+    (open, read) timeout in seconds.
+    """
+    # --- החלק ששינינו מתחיל כאן ---
+    is_rtsp = url_str.startswith("rtsp://")
+    is_webcam = url_str.isdigit() or url_str.startswith("video=")
+
+    if is_rtsp:
+        # RTSP source, tuned by the selected profile
+        options = profile.rtsp_options()
+        if resume is not None:
+            # Codec is already known, skip most of the stream probing
+            options = resume.resume_options(options)
+        logger.info("Using stream profile: %s", profile.name)
+        return av.open(url_str, options=options, timeout=timeout)
+
+    elif is_webcam:
+        # Webcam source for Windows (DirectShow)
+        camera_src = f"video={url_str}" if url_str.isdigit() else url_str
+        logger.info(f"Attempting to open webcam via dshow: {camera_src}")
+        return av.open(camera_src, format='dshow', timeout=timeout)
+
+    elif "://" in url_str:
+        # Other network protocols (HTTP, RTMP, ...)
+        options = resume.resume_options({}) if resume is not None else None
+        return av.open(url_str, options=options, timeout=timeout)
+
+    else:
+        # Local file source: a short probe can miss late stream headers
+        return av.open(url_str, timeout=timeout)
+    # --- החלק ששינינו נגמר כאן ---
+
+
+def _worker_done(worker) -> bool:
+    """True if a decode thread or DecodeTask (or None) has finished."""
+    if worker is None:
+        return True
+    if isinstance(worker, threading.Thread):
+        return not worker.is_alive()
+    return worker.done
+
+
+def _media_time(packet) -> float | None:
+    if packet.pts is None or packet.time_base is None:
+        return None
+    return float(packet.pts * packet.time_base)
+
+
+class DecodeEngine:
+    """
+    Decodes one source on its own thread (or a DecodeScheduler) and reports
+    through callbacks:
+
+    - on_frame(image, frame): each converted image with its decoded frame
+    - on_status(status): "Connecting", "Streaming", "Ready", ...
+    - on_error(user_message, technical_detail)
+    - on_stats(stats_dict): at most once per STATS_INTERVAL
+    - on_stopped(): a session has ended and released its source
+
+    Callbacks run on decode (or conversion) threads. ``image`` is whatever
+    ``convert`` returns, by default a core.frame_convert.ConvertedFrame.
+    """
+
+    # Pipeline stages timed per frame (demux and decode per packet)
+    STAGES = ("demux", "decode", "convert", "emit")
+    STATS_INTERVAL = 1.0
+    # FFmpeg (open, read) timeouts in seconds: a stalled source fails, and a
+    # stopped session ends, within this long
+    IO_TIMEOUT = (10.0, 5.0)
+    # Longest single sleep while waiting on the engine's own thread, and the
+    # poll interval of a session parked on a shared scheduler
+    WAIT_SLICE = 0.05
+
+    def __init__(self, scheduler=None, profile: str = DEFAULT_PROFILE,
+                 reconnect_policy: BackoffPolicy | None = BackoffPolicy(),
+                 pipeline: PipelineConfig | None = None,
+                 pacing: PacingConfig | None = None,
+                 connections: ConnectionCache | None = None,
+                 converter: FrameConverter | None = None, convert=None,
+                 on_frame=None, on_status=None, on_error=None, on_stats=None,
+                 on_stopped=None):
+        """
+        Args:
+            scheduler: Optional DecodeScheduler shared with other engines.
+                Without one, the engine decodes on its own thread.
+            profile: RTSP tuning profile name, see core.stream_profiles.
+            reconnect_policy: Backoff used to reopen a dropped stream;
+                None disables reconnection.
+            pipeline: Run demux, decode and conversion as separate threaded
+                stages (core.pipeline). Not combinable with a scheduler,
+                which exists to bound the thread count.
+            pacing: Present frames at their timestamps (files in real time,
+                live sources through a jitter buffer). None delivers frames
+                as fast as they decode.
+            connections: ConnectionCache shared with other engines: stream
+                parameters of known sources and pre-opened favorites.
+            converter: FrameConverter whose output_size the engine controls;
+                by default an RGB24 converter.
+            convert: frame -> image, default converter.convert.
+            on_frame, on_status, on_error, on_stats, on_stopped: see class
+                docstring.
+        """
+        if pipeline is not None and scheduler is not None:
+            raise ValueError("A staged pipeline cannot run on a DecodeScheduler")
+        self._pipeline_config = pipeline
+        self._pipeline = None
+        self.pacing = pacing
+        self.connections = connections
+        self._url = None
+        # Whether the current connection was pre-opened
+        self._prewarmed = False
+        self._clock = None
+        self._catching_up = False
+        self._late_frames = 0
+        self._presentation_error = RollingStats()
+        # Decode mode as requested (any thread) and as applied by the decode
+        # stage, which owns the codec context
+        self._decode_mode = get_decode_mode(DEFAULT_DECODE_MODE)
+        self._applied_mode = None
+        self._applied_skip = "DEFAULT"
+        self._frame_cap = None
+        self._await_keyframe = False
+        self._skipped_packets = 0
+        self._skipped_frames = 0
+        self._profile = get_profile(profile)
+        self.reconnect_policy = reconnect_policy
+        self.reconnect_count = 0
+        self._session_params = None
+        self._connection_frames = 0
+        self._is_running = False
+        # Lifecycle: every start_stream()/stop() bumps the generation; a
+        # started session only begins once its predecessor has ended, and
+        # only if no stop() came in between (guarded by _lifecycle_lock)
+        self._lifecycle_lock = threading.Lock()
+        self._generation = 0
+        self._starting = False
+        self._thread = None
+        self._task = None
+        self._scheduler = scheduler
+        # Whether the running session is stepped by the scheduler, which
+        # parks it instead of letting it sleep
+        self._scheduled = False
+        self._container = None
+        if converter is None:
+            # Every conversion worker may hold one pooled buffer in flight
+            workers = pipeline.convert_workers if pipeline is not None else 0
+            converter = FrameConverter(pool_slots=4 + workers)
+        self.converter = converter
+        self._convert = convert or converter.convert
+        self.on_frame = on_frame or _ignore
+        self.on_status = on_status or _ignore
+        self.on_error = on_error or _ignore
+        self.on_stats = on_stats or _ignore
+        self.on_stopped = on_stopped or _ignore
+        # Output queue of frames() while it runs
+        self._collected = None
+        # Latency measurements for the current session
+        self._start_time = None
+        self._time_to_first_frame = None
+        self._frame_latency = RollingStats()
+        # Throughput and per-stage timing for stats()
+        self._stage_times = {stage: RollingStats() for stage in self.STAGES}
+        self._decode_rate = RateMeter()
+        self._bitrate = RateMeter()
+        self._cpu = CpuMeter()
+        self._next_stats_time = 0.0
+        self._received_at = collections.OrderedDict()
+        self._received_lock = threading.Lock()
+        self._last_received = 0.0
+        # Recording: packets since the last keyframe, the active recorder and
+        # the stream it copies from (guarded by _recording_lock)
+        self._pre_event = PreEventBuffer()
+        self._recorder = None
+        self._record_stream = None
+        self._recording_lock = threading.Lock()
+        # Newest decoded frame at full resolution; only a reference is kept
+        self._latest_frame = None
+        # Seeking in local files: the newest request (guarded by _seek_lock),
+        # the (path, KeyframeIndex) in use, then the decode stage's state.
+        # Frames before _seek_target (pts) are decoded but not shown; a scrub
+        # preview holds after its keyframe
+        self._seek_lock = threading.Lock()
+        self._seek_request = None
+        self._seek_requested = threading.Event()
+        self._keyframe_index = None
+        self._seek_target = None
+        self._seek_started = None
+        self._previewing = False
+        self._holding = False
+        self._seeks = 0
+        self._seek_times = RollingStats()
+
+    @property
+    def profile(self) -> str:
+        return self._profile.name
+
+    @property
+    def decode_mode(self) -> str:
+        return self._decode_mode.name
+
+    @property
+    def is_running(self) -> bool:
+        """A session is decoding, or started and waiting for its predecessor."""
+        return self._is_running or self._starting
+
+    @property
+    def latest_frame(self):
+        """The newest decoded av.VideoFrame at source resolution, or None."""
+        return self._latest_frame
+
+    @property
+    def session_params(self) -> SessionParams | None:
+        """Parameters of the last connection that delivered frames."""
+        return self._session_params
+
+    def set_profile(self, name: str):
+        """Selects the RTSP tuning profile used by the next start_stream()."""
+        self._profile = get_profile(name)
+
+    @property
+    def is_recording(self) -> bool:
+        return self._recorder is not None
+
+    def start_recording(self, config: RecordingConfig = RecordingConfig()) -> Recorder:
+        """
+        Starts copying the demuxed stream to disk without re-encoding. The
+        recording begins with the packets since the last keyframe; if no
+        stream is open yet, it starts with the next connection.
+        """
+        self.stop_recording()
+        recorder = Recorder(config)
+        recorder.start()
+        with self._recording_lock:
+            if self._record_stream is not None:
+                recorder.set_source(self._record_stream)
+                for packet in self._pre_event.packets():
+                    recorder.write(packet)
+            self._recorder = recorder
+        return recorder
+
+    def _finish_recording(self):
+        """Like stop_recording(), but lets the writer flush in the background."""
+        with self._recording_lock:
+            recorder, self._recorder = self._recorder, None
+        if recorder is not None:
+            recorder.finish()
+
+    def stop_recording(self) -> list:
+        """Finalizes the recording; returns the segment files written."""
+        with self._recording_lock:
+            recorder, self._recorder = self._recorder, None
+        if recorder is None:
+            return []
+        if not recorder.stop():
+            logger.warning("Recorder did not flush in time")
+        return list(recorder.segments)
+
+    def _set_recording_source(self, stream):
+        """Called when a connection opens (stream) or closes (None)."""
+        with self._recording_lock:
+            self._record_stream = stream
+            self._pre_event.clear()
+            if stream is not None and self._recorder is not None:
+                self._recorder.set_source(stream)
+
+    def latency_stats(self) -> dict:
+        """
+        Startup and per-frame latency of the current (or last) session.
+
+        ``frame_latency_ms`` measures from the moment a packet was read off
+        the source until its frame was ready for display (decode + convert).
+        """
+        ttff = self._time_to_first_frame
+        latency = self._frame_latency.summary()
+        return {
+            "profile": self._profile.name,
+            "time_to_first_frame_ms": None if ttff is None else ttff * 1000.0,
+            "frame_latency_ms": {
+                key: None if value is None else value * 1000.0
+                for key, value in latency.items()
+            },
+            "frames": len(self._frame_latency),
+        }
+
+    def stats(self) -> dict:
+        """
+        Snapshot of the engine's performance counters: decode fps, incoming
+        bitrate, per-stage timings (p50/p95/p99 in ms), dropped frames,
+        pipeline queue depths, process CPU and the latency_stats() fields.
+        """
+        pipeline = self._pipeline
+        snapshot = {
+            "decode_fps": self._decode_rate.rate(),
+            "bitrate_kbps": self._bitrate.rate() / 1000.0,
+            "stages_ms": {
+                stage: times.percentiles(scale=1000.0)
+                for stage, times in self._stage_times.items()
+            },
+            "packet_queue_depth": pipeline.packet_queue.depth if pipeline else 0,
+            "frame_queue_depth": pipeline.frame_queue.depth if pipeline else 0,
+            "pipeline_dropped_packets": pipeline.dropped_packets if pipeline else 0,
+            "pipeline_dropped_frames": pipeline.dropped_frames if pipeline else 0,
+            "decode_mode": self._decode_mode.name,
+            "skipped_packets": self._skipped_packets,
+            "skipped_frames": self._skipped_frames,
+            "late_frames": self._late_frames,
+            "presentation_error_ms": self._presentation_error.percentiles(scale=1000.0),
+            "clock_reanchors": self._clock.reanchors if self._clock else 0,
+            "reconnects": self.reconnect_count,
+            "seeks": self._seeks,
+            "seek_ms": self._seek_times.percentiles(scale=1000.0),
+            "prewarmed": self._prewarmed,
+            "recording": self._recorder is not None,
+            "recording_dropped_packets": self._recorder.dropped_packets if self._recorder else 0,
+            "cpu_percent": self._cpu.percent,
+        }
+        snapshot.update(self.latency_stats())
+        return snapshot
+
+    def _maybe_emit_stats(self, now: float):
+        """Calls on_stats at most once per STATS_INTERVAL."""
+        if now < self._next_stats_time:
+            return
+        self._next_stats_time = now + self.STATS_INTERVAL
+        self._cpu.sample()
+        self.on_stats(self.stats())
+
+    def set_output_size(self, width: int, height: int):
+        """
+        Limits decoded frames to fit within width x height (aspect ratio
+        kept, never upscaled). Scaling happens inside libswscale during
+        conversion, so small displays do not pay for full-resolution frames.
+        Pass 0 for either dimension to go back to the source resolution.
+        """
+        if width <= 0 or height <= 0:
+            self.converter.output_size = None
+        else:
+            self.converter.output_size = (width, height)
+
+    def set_crop(self, region: tuple | None):
+        """
+        Digital zoom: converts (and scales) only region, an (x, y, width,
+        height) rectangle in fractions of the frame, so a zoomed view costs
+        what its output size costs. None shows the whole frame. Decoding,
+        recording, snapshots and motion detection still see full frames.
+        """
+        self.converter.crop = tuple(region) if region is not None else None
+
+    def set_decode_mode(self, name: str):
+        """
+        Selects a core.decode_modes mode ("full", "reduced", "keyframes").
+        Safe to call from any thread; the decode stage applies it at the
+        next packet.
+        """
+        self._decode_mode = get_decode_mode(name)
+
+    def fit_decode_mode(self, visible: bool, width: int, height: int):
+        """Picks the decode mode for a display of width x height device pixels."""
+        self.set_decode_mode(choose_decode_mode(visible, width, height))
+
+    def prewarm(self, urls):
+        """
+        Keeps the given network sources connected in the background, so a
+        later start_stream() of one of them shows video almost at once
+        (see ConnectionCache.prewarm; needs ``connections``).
+        """
+        cache = self.connections
+        if cache is None:
+            raise ValueError("prewarm() needs a ConnectionCache")
+        profile, timeout = self._profile, self.IO_TIMEOUT
+        cache.prewarm(urls, lambda url: open_source(url, profile, cache.params(url), timeout))
+
+    def seek(self, seconds: float):
+        """
+        Continues playback of a local file at the frame shown ``seconds``
+        after the stream start (0 to KeyframeIndex.duration, whatever the
+        file's first timestamp), also ending a scrub preview. Decoding
+        restarts at the keyframe before it (from the file's KeyframeIndex),
+        and the frames in between are decoded but neither converted nor
+        shown. Safe to call from any thread; the newest request wins. Not
+        available with a pipeline.
+        """
+        self._request_seek(seconds, preview=False)
+
+    def scrub(self, seconds: float):
+        """
+        Scrub preview: shows the keyframe at or before ``seconds`` (from the
+        stream start, as for seek()) of a local file and holds there until
+        the next scrub() or seek(). Only that keyframe is decoded, so
+        dragging across hours of footage stays cheap; seek() to the final
+        position resumes playback.
+        """
+        self._request_seek(seconds, preview=True)
+
+    def _request_seek(self, seconds: float, preview: bool):
+        if self._pipeline_config is not None:
+            raise ValueError("Seeking is not available with a staged pipeline")
+        with self._seek_lock:
+            self._seek_request = (max(0.0, seconds), preview)
+        self._seek_requested.set()
+        self._wake_task()
+
+    def keyframe_index(self, path) -> KeyframeIndex:
+        """The keyframe index of a local file, read from next to it or built and stored."""
+        cached = self._keyframe_index
+        if cached is not None and cached[0] == str(path):
+            return cached[1]
+        index = KeyframeIndex.for_file(path)
+        self._keyframe_index = (str(path), index)
+        return index
+
+    def start_stream(self, url: str):
+        """
+        Starts decoding url in the background and returns at once. The new
+        session waits (on its own thread) for the previous one to release
+        its source, so two sessions never decode at the same time.
+        """
+        self.stop()
+        self._clear_seek()
+        with self._lifecycle_lock:
+            self._generation += 1
+            generation = self._generation
+            self._starting = True
+        previous = self._thread or self._task
+        session = self._after(previous, generation, url, scheduled=self._scheduler is not None)
+        if self._scheduler is not None:
+            # Shared worker pool steps the session one frame at a time
+            self._thread = None
+            self._task = self._scheduler.submit(session, name=url)
+            return
+
+        self._task = None
+        self._thread = threading.Thread(
+            target=self._decode_loop,
+            args=(session,),
+            name="Decode",
+            daemon=True
+        )
+        self._thread.start()
+
+    def frames(self, url: str):
+        """
+        Decodes url on the calling thread and yields (image, frame) pairs in
+        decode order; on_frame is still called for each. Stops when the
+        source ends, on stop() or when the caller stops iterating.
+        """
+        self.stop()
+        # Unlike start_stream(), the caller's thread waits for the old session
+        self.wait()
+        self._clear_seek()
+        with self._lifecycle_lock:
+            self._generation += 1
+            generation = self._generation
+        self._thread = self._task = None
+        collected = self._collected = collections.deque()
+        session = self._after(None, generation, url)
+        try:
+            for _ in session:
+                while collected:
+                    yield collected.popleft()
+            # The pipeline's last conversions finish while the session closes
+            while collected:
+                yield collected.popleft()
+        finally:
+            session.close()
+            self._collected = None
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Waits for the decode thread or task to end; False on timeout. Also
+        covers sessions before it, which always end first.
+        """
+        if self._thread is not None and threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        if self._task is not None and not self._task.is_current():
+            return self._task.wait(timeout)
+        return True
+
+    def _after(self, previous, generation: int, url: str, scheduled: bool = False):
+        """
+        Session generator: waits for the previous thread or task to end,
+        then decodes url unless stop() or another start came in meanwhile.
+        With scheduled, it runs on the DecodeScheduler and yields deadlines
+        to be parked instead of sleeping.
+        """
+        while not _worker_done(previous):
+            if isinstance(previous, threading.Thread):
+                previous.join(self.WAIT_SLICE)
+            else:
+                # Parked between checks so the scheduler worker stays shared
+                yield time.perf_counter() + self.WAIT_SLICE
+        if not self._begin(generation):
+            return
+        self._scheduled = scheduled
+        try:
+            yield from self._decode_session(url)
+        finally:
+            with self._lifecycle_lock:
+                self._is_running = False
+            self.on_stopped()
+
+    def _begin(self, generation: int) -> bool:
+        """
+        Makes the session of ``generation`` the running one and resets the
+        per-session state; False if it was stopped or replaced meanwhile.
+        """
+        with self._lifecycle_lock:
+            if generation != self._generation:
+                return False
+            self._starting = False
+            self._is_running = True
+
+        self._start_time = time.perf_counter()
+        self._time_to_first_frame = None
+        self._frame_latency.reset()
+        for times in self._stage_times.values():
+            times.reset()
+        self._decode_rate.reset()
+        self._bitrate.reset()
+        self._late_frames = 0
+        self._presentation_error.reset()
+        self._skipped_packets = 0
+        self._skipped_frames = 0
+        with self._received_lock:
+            self._received_at.clear()
+        self._pipeline = None
+        self._session_params = None
+        self._latest_frame = None
+        # The file may have changed (a growing recording) since it was indexed
+        self._keyframe_index = None
+        self._seek_target = None
+        self._seek_started = None
+        self._previewing = False
+        self._holding = False
+        self._seeks = 0
+        self._seek_times.reset()
+        self.reconnect_count = 0
+        self.on_status("Connecting")
+        return True
+
+    def _decode_loop(self, session):
+        """
+        Background loop for fetching and decoding packets from a source.
+        """
+        for _ in session:
+            pass
+
+    def _decode_session(self, url: str):
+        """
+        Opens the source and decodes it, yielding after every frame so a
+        DecodeScheduler can interleave many sessions on a few threads.
+
+        A stream that drops after delivering frames is reopened with
+        jittered exponential backoff (see reconnect_policy).
+        """
+
+        def emit_error(user_msg: str, technical: str):
+            logger.error("RTSP error: %s | %s", user_msg, technical)
+            traceback.print_exc()
+            self.on_error(user_msg, technical)
+
+        url_str = str(url).strip()
+        is_rtsp = url_str.startswith("rtsp://")
+        self._url = url_str
+        connections = self.connections
+        warm = connections.acquire(url_str) if connections is not None else None
+        try:
+            yield from self._reconnect_loop(url_str, is_rtsp, emit_error, warm)
+        finally:
+            if connections is not None:
+                connections.release(url_str)
+
+    def _reconnect_loop(self, url_str: str, is_rtsp: bool, emit_error, warm):
+        """Connects, and reconnects while reconnect_policy allows."""
+        has_streamed = False
+        attempt = 0
+        while self._is_running:
+            failure = None
+            self._connection_frames = 0
+            try:
+                yield from self._stream_once(url_str, emit_error, warm)
+            except (av.FFmpegError, av.OSError) as e:
+                failure = e
+            except Exception as e:
+                technical = f"{type(e).__name__}: {e}"
+                emit_error(f"Error: {str(e)}", technical)
+                self._halt()
+                return
+            finally:
+                self._set_recording_source(None)
+                self._close_container()
+                # Reconnects open a fresh connection
+                warm = None
+
+            if self._connection_frames:
+                has_streamed = True
+                attempt = 0
+            if not self._is_running:
+                return
+
+            if failure is None:
+                if not has_streamed:
+                    emit_error("No video data received from source", "Decode loop ended with 0 frames.")
+                    self._halt()
+                    return
+                if not is_rtsp:
+                    # A file (or other finite source) simply ended
+                    return
+                technical = "Live stream ended unexpectedly."
+            else:
+                technical = f"{type(failure).__name__}: {failure}"
+                error_msg = str(failure).lower()
+                if '401' in error_msg or 'unauthorized' in error_msg:
+                    emit_error("Authentication failed. Check credentials", technical)
+                    self._halt()
+                    return
+                if not has_streamed:
+                    # Never connected: report immediately instead of retrying
+                    emit_error("Connection failed. Check source and network", technical)
+                    self._halt()
+                    return
+
+            policy = self.reconnect_policy
+            if policy is None or attempt >= policy.max_attempts:
+                emit_error(
+                    "Connection failed. Check source and network",
+                    f"Stream disconnected, gave up after {attempt} reconnect attempts. {technical}"
+                )
+                self._halt()
+                return
+
+            delay = policy.delay(attempt)
+            attempt += 1
+            self.reconnect_count += 1
+            logger.warning("Stream disconnected (%s), reconnect %d/%d in %.2fs",
+                           technical, attempt, policy.max_attempts, delay)
+            self.on_status("Stream disconnected. Attempting to reconnect...")
+            yield from self._wait(delay)
+
+    def _stream_once(self, url_str: str, emit_error, warm=None):
+        """
+        One connection: open the source (or take over the pre-opened
+        connection ``warm``, see ConnectionCache.acquire) and decode until
+        it ends.
+        """
+        logger.info("Opening source: %s", url_str)
+        # Network sources and devices are live; local files are not
+        is_webcam = url_str.isdigit() or url_str.startswith("video=")
+        network = "://" in url_str
+        live = network or is_webcam
+        # Only network connections resume with reduced probing
+        resume = self._session_params if network else None
+        if resume is None and network and self.connections is not None:
+            # Known from an earlier session with this camera
+            resume = self.connections.params(url_str)
+
+        self._prewarmed = warm is not None
+        if warm is not None:
+            self._container, stream, buffered = warm
+            logger.info("Using pre-opened connection (%d packets buffered)", len(buffered))
+        else:
+            self._container = open_source(url_str, self._profile, resume, self.IO_TIMEOUT)
+            buffered = []
+
+        if not self._container.streams.video:
+            emit_error("No video data received from source", "Container has no video stream.")
+            self._halt()
+            return
+
+        stream = self._container.streams.video[0]
+        if resume is not None and resume.matches(stream):
+            resume.apply(stream)
+        stream.thread_type = self._profile.thread_type
+        if self._scheduler is not None:
+            # Bound FFmpeg's own decoder threads too
+            stream.codec_context.thread_count = self._scheduler.codec_threads
+
+        self.on_status("Streaming")
+        self._set_recording_source(stream)
+        # A pre-opened connection replays its packets since the last keyframe
+        packets = itertools.chain(buffered, self._container.demux(stream))
+        # A new decoder starts without any skipping
+        self._catching_up = False
+        self._applied_mode = None
+        self._applied_skip = "DEFAULT"
+        self._await_keyframe = False
+        clock = self._clock = (
+            PresentationClock(self.pacing, live) if self.pacing is not None else None
+        )
+
+        if self._pipeline_config is not None:
+            yield from self._run_pipeline(packets, stream, live, clock)
+            return
+
+        stage_times = self._stage_times
+        while self._is_running:
+            if self._seek_request is not None:
+                packets = self._apply_seek(url_str, stream, live, packets)
+            if self._holding:
+                # A scrub preview is on screen; nothing to decode until the next request
+                yield from self._wait_for_seek()
+                continue
+            started = time.perf_counter()
+            packet = next(packets, None)
+            received = time.perf_counter()
+            if packet is None:
+                break
+            stage_times["demux"].add(received - started)
+            self._on_packet(packet, received)
+            if not self._admit_packet(packet, stream):
+                yield
+                continue
+
+            frames = packet.decode()
+            stage_times["decode"].add(time.perf_counter() - received)
+
+            for frame in frames:
+                if not self._is_running or self._holding or self._seek_request is not None:
+                    break
+
+                self._on_frame_decoded(frame, stream)
+                if self._seek_target is not None:
+                    if frame.pts is not None and frame.pts < self._seek_target:
+                        # Only a reference for the frames up to the seek target
+                        yield
+                        continue
+                    self._seek_target = None
+                if not self._admit_frame(frame):
+                    yield
+                    continue
+                deadline = None
+                if clock is not None and frame.time is not None and not self._previewing:
+                    deadline = clock.due(frame.time)
+                    late = clock.is_late(deadline)
+                    self._set_catching_up(stream, late)
+                    if late:
+                        # Too late to show: skip the conversion as well
+                        self._late_frames += 1
+                        yield
+                        continue
+                try:
+                    converting = time.perf_counter()
+                    image = self._convert(frame)
+                    stage_times["convert"].add(time.perf_counter() - converting)
+                except Exception:
+                    pass
+                else:
+                    if deadline is not None:
+                        yield from self._wait_until(deadline)
+                        self._presentation_error.add(time.perf_counter() - deadline)
+                    self._deliver(image, frame)
+                    # A scrub preview shows a single keyframe
+                    self._holding = self._previewing
+                yield
+
+    def _clear_seek(self):
+        with self._seek_lock:
+            self._seek_request = None
+        self._seek_requested.clear()
+
+    def _apply_seek(self, url_str: str, stream, live: bool, packets):
+        """
+        Decode stage: repositions the file for the newest seek request and
+        returns the packets to continue with.
+        """
+        with self._seek_lock:
+            request, self._seek_request = self._seek_request, None
+            self._seek_requested.clear()
+        if live:
+            logger.warning("Ignoring seek: live sources cannot seek")
+            return packets
+        seconds, preview = request
+        try:
+            index = self.keyframe_index(url_str)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring seek: cannot index %s: %s", url_str, e)
+            return packets
+
+        keyframe = index.keyframe_before(seconds)
+        target = keyframe if preview else max(index.to_pts(seconds), keyframe)
+        current = self._latest_frame
+        # The target lies ahead in the GOP being decoded: just decode on (a
+        # scrub preview skipped the frames after its keyframe, so not then)
+        in_gop = (not preview and not self._previewing and current is not None
+                  and current.pts is not None and keyframe <= current.pts < target)
+        self._seeks += 1
+        self._seek_started = time.perf_counter()
+        self._seek_target = target
+        self._previewing = preview
+        self._holding = False
+        if self._clock is not None:
+            # Playback continues from the target as if it had just started
+            self._clock.reset()
+        if preview:
+            # Keyframes only; the decode mode's setting returns with seek()
+            self._applied_skip = stream.codec_context.skip_frame = "NONKEY"
+        else:
+            self._apply_skip_frame(stream)
+        if in_gop:
+            return packets
+
+        self._container.seek(keyframe, stream=stream, backward=True)
+        stream.codec_context.flush_buffers()
+        self._await_keyframe = False
+        return self._container.demux(stream)
+
+    def _wait_for_seek(self):
+        """Holds the decode stage until the next seek request (or stop)."""
+        while self._is_running and self._seek_request is None:
+            if self._scheduled:
+                # Parked; seek() and stop() wake the task at once
+                yield time.perf_counter() + self.WAIT_SLICE
+            else:
+                self._seek_requested.wait(self.WAIT_SLICE)
+                yield
+
+    def _set_catching_up(self, stream, behind: bool):
+        """While behind schedule, the decoder skips non-reference frames."""
+        if behind != self._catching_up:
+            self._catching_up = behind
+            self._apply_skip_frame(stream)
+
+    def _apply_skip_frame(self, stream):
+        mode = self._applied_mode
+        skip = mode.skip_frame if mode is not None else "DEFAULT"
+        if skip == "DEFAULT" and self._catching_up:
+            skip = "NONREF"
+        if skip != self._applied_skip:
+            self._applied_skip = skip
+            stream.codec_context.skip_frame = skip
+
+    def _admit_packet(self, packet, stream) -> bool:
+        """
+        Decode-stage gate: applies decode mode changes and drops packets the
+        mode would not show, as long as later frames do not depend on them.
+        """
+        mode = self._decode_mode
+        if mode is not self._applied_mode:
+            if self._applied_mode is not None and self._applied_mode.keyframes_only:
+                # Reference frames were dropped; resume decoding at a keyframe
+                self._await_keyframe = True
+            self._applied_mode = mode
+            self._frame_cap = FrameRateCap(mode.max_fps) if mode.max_fps else None
+            self._apply_skip_frame(stream)
+
+        if not packet.size:
+            # Flush packet at the end of the stream: drains the decoder
+            return True
+        if packet.is_keyframe:
+            self._await_keyframe = False
+            return True
+        cap = self._frame_cap
+        if (mode.keyframes_only or self._await_keyframe
+                or (packet.is_disposable and cap is not None
+                    and not cap.due(_media_time(packet)))):
+            self._skipped_packets += 1
+            return False
+        return True
+
+    def _admit_frame(self, frame) -> bool:
+        """Frame rate cap for frames that had to be decoded anyway."""
+        cap = self._frame_cap
+        if cap is not None and not cap.admit(frame.time):
+            self._skipped_frames += 1
+            return False
+        return True
+
+    def _run_pipeline(self, packets, stream, live: bool, clock: PresentationClock | None):
+        """Decodes through a StagedPipeline (demux/decode/convert threads)."""
+        pipeline = StagedPipeline(
+            packets,
+            convert=self._convert,
+            deliver=self._deliver,
+            on_packet=self._on_packet,
+            config=self._pipeline_config,
+            live=live,
+            timings=self._stage_times,
+            admit=lambda packet: self._admit_packet(packet, stream),
+            admit_frame=self._admit_frame,
+        )
+        self._pipeline = pipeline
+        try:
+            for frame in pipeline.frames(lambda: self._is_running):
+                self._on_frame_decoded(frame, stream)
+                if clock is not None and frame.time is not None:
+                    # Paced at the decode stage; the frame queue's own drop
+                    # policy handles falling behind
+                    yield from self._wait_until(clock.due(frame.time))
+                yield
+        finally:
+            if not pipeline.close():
+                # The demux thread is stuck in a read; closing the container
+                # under it would crash, so leave the container to that thread
+                logger.warning("Demux thread did not stop; abandoning container")
+                self._container = None
+
+    def _on_packet(self, packet, received: float):
+        """Per-packet bookkeeping (demux thread in pipeline mode)."""
+        if packet.size:
+            self._bitrate.add(packet.size * 8)
+        with self._recording_lock:
+            self._pre_event.add(packet)
+            if self._recorder is not None:
+                self._recorder.write(packet)
+        with self._received_lock:
+            self._last_received = received
+            if packet.pts is not None:
+                # Receive time per packet pts, so frame-threaded decoders (which
+                # return frames several packets later) are measured correctly
+                self._received_at[packet.pts] = received
+                if len(self._received_at) > 64:
+                    self._received_at.popitem(last=False)
+
+    def _on_frame_decoded(self, frame, stream):
+        self._latest_frame = frame
+        if self._connection_frames == 0:
+            # Remember what worked for a fast resume
+            self._session_params = SessionParams.from_stream(stream)
+            if self.connections is not None and "://" in self._url:
+                self.connections.store(self._url, self._session_params)
+        self._connection_frames += 1
+
+    def _deliver(self, image, frame):
+        """Hands a converted frame to the outputs and records its latency."""
+        converted = time.perf_counter()
+        if self._seek_started is not None:
+            self._seek_times.add(converted - self._seek_started)
+            self._seek_started = None
+        if self._is_running:
+            # A stopped session's last frame must not follow its successor's reset
+            self.on_frame(image, frame)
+        collected = self._collected
+        if collected is not None:
+            collected.append((image, frame))
+        ready = time.perf_counter()
+        self._stage_times["emit"].add(ready - converted)
+        self._decode_rate.add()
+        with self._received_lock:
+            received = self._received_at.pop(frame.pts, self._last_received)
+        self._frame_latency.add(ready - received)
+        if self._time_to_first_frame is None:
+            self._time_to_first_frame = ready - self._start_time
+        self._maybe_emit_stats(ready)
+
+    def _wait(self, seconds: float):
+        yield from self._wait_until(time.perf_counter() + seconds)
+
+    def _wait_until(self, deadline: float):
+        """
+        Waits until deadline (time.perf_counter() scale). On its own thread
+        the session sleeps in short slices so stop() stays responsive; on a
+        scheduler it yields the deadline and is parked, as other sessions
+        share the worker (stop() wakes it early).
+        """
+        while self._is_running:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            if self._scheduled:
+                yield deadline
+            else:
+                time.sleep(min(remaining, self.WAIT_SLICE))
+                yield
+
+    def _wake_task(self):
+        """Ends a scheduler park of the current session early."""
+        task = self._task
+        if task is not None:
+            task.wake()
+
+    def _close_container(self):
+        if self._container:
+            try:
+                self._container.close()
+            except Exception:
+                pass
+            self._container = None
+
+    def stop(self):
+        """
+        Asks the current session to end and returns at once; on_stopped
+        reports when it has. A session stuck in a read ends once FFmpeg's
+        I/O timeout (IO_TIMEOUT) expires.
+        """
+        with self._lifecycle_lock:
+            was_running = self._is_running or self._starting
+            self._is_running = False
+            self._starting = False
+            # Cancels a start that is still waiting for its predecessor
+            self._generation += 1
+        self._wake_task()
+        if was_running:
+            self._finish_recording()
+            self.on_status("Ready")
+
+    def _halt(self):
+        """Ends the running session from inside it (errors, missing video)."""
+        with self._lifecycle_lock:
+            # A successor waits for this session, so running means current
+            was_running = self._is_running
+            self._is_running = False
+        if was_running:
+            self._finish_recording()
+            self.on_status("Ready")
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Decode modes: how much of a stream is decoded.
+
+A camera that is off-screen or shown as a small tile does not need every
+frame. A mode sets the decoder's skip_frame and an optional frame rate cap.
+Packets that cannot be shown are dropped before they reach the decoder
+whenever the stream stays decodable without them.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class DecodeMode:
+    """A named decode-rate reduction."""
+
+    name: str
+    # AVCodecContext.skip_frame: "DEFAULT", "NONREF" (drop frames no other
+    # frame depends on) or "NONKEY" (keyframes only)
+    skip_frame: str
+    # Frames per second of media time shown at most; None for no cap
+    max_fps: float | None = None
+
+    @property
+    def keyframes_only(self) -> bool:
+        return self.skip_frame == "NONKEY"
+
+
+DECODE_MODES = {
+    "full": DecodeMode(name="full", skip_frame="DEFAULT"),
+    # Small tiles: B-frames skipped, the rest capped
+    "reduced": DecodeMode(name="reduced", skip_frame="NONREF", max_fps=10.0),
+    # Hidden or minimized: one frame per GOP keeps the last image fresh
+    "keyframes": DecodeMode(name="keyframes", skip_frame="NONKEY"),
+}
+
+DEFAULT_DECODE_MODE = "full"
+
+# Displays with at most this many device pixels count as thumbnails
+THUMBNAIL_PIXELS = 480 * 270
+
+
+def get_decode_mode(name: str) -> DecodeMode:
+    """Looks up a decode mode by name, raising ValueError for unknown names."""
+    try:
+        return DECODE_MODES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown decode mode {name!r}; expected one of {', '.join(DECODE_MODES)}"
+        ) from None
+
+
+def choose_decode_mode(visible: bool, width: int, height: int) -> str:
+    """Decode mode for a display of width x height device pixels."""
+    if not visible or width <= 0 or height <= 0:
+        return "keyframes"
+    if width * height <= THUMBNAIL_PIXELS:
+        return "reduced"
+    return "full"
+
+
+class FrameRateCap:
+    """Admits frames at most max_fps per second of media time."""
+
+    # Timestamps are rounded; a frame this early still takes its slot
+    TOLERANCE = 0.001
+
+    def __init__(self, max_fps: float):
+        if max_fps <= 0:
+            raise ValueError("max_fps must be positive")
+        self._interval = 1.0 / max_fps
+        self._next = None
+
+    def due(self, media_time: float | None) -> bool:
+        """True if a frame at media_time would be admitted."""
+        if media_time is None or self._next is None:
+            return True
+        # A backwards jump (seek, wrap) restarts the cap
+        if media_time < self._next - self._interval - 1.0:
+            return True
+        return media_time + self.TOLERANCE >= self._next
+
+    def admit(self, media_time: float | None) -> bool:
+        """Like due(), but takes the slot when the frame is admitted."""
+        if not self.due(media_time):
+            return False
+        if media_time is not None:
+            self._next = media_time + self._interval
+        return True
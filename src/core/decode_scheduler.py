@@ -0,0 +1,263 @@
+"""
+Shared decode scheduler for running many AVEngine sessions on a fixed pool
+of worker threads.
+
+Instead of one free-running thread per stream, each engine hands the
+scheduler a decode session (a generator that yields after every frame). A
+bounded set of workers steps the sessions round-robin, and an optional CPU
+budget throttles the workers when the process as a whole uses more CPU than
+allowed.
+
+A session that has nothing to do until later (pacing, a paused scrub, a
+reconnect delay) yields a deadline on the time.perf_counter() scale instead
+of sleeping: the scheduler parks it until then, or until DecodeTask.wake(),
+and the worker steps the other sessions meanwhile.
+"""
+import collections
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("RTSP")
+
+
+class DecodeTask:
+    """Handle for a session submitted to a DecodeScheduler."""
+
+    def __init__(self, session, name: str = "", scheduler=None):
+        self.name = name
+        self._session = session
+        self._scheduler = scheduler
+        self._done = threading.Event()
+        self._owner = None
+        # Heap entry id while parked; a wake() that found the task not
+        # parked keeps it from parking at its next yield
+        self._parked = None
+        self._woken = False
+        self.steps = 0
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Blocks until the session finished. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def is_current(self) -> bool:
+        """True when called from the worker currently stepping this task."""
+        return self._owner is threading.current_thread()
+
+    def wake(self):
+        """Ends a park early, e.g. after a stop or seek request. Any thread."""
+        if self._scheduler is not None:
+            self._scheduler._wake(self)
+
+
+class DecodeScheduler:
+    """
+    Steps decode sessions on at most ``max_threads`` worker threads.
+
+    Args:
+        max_threads: Worker thread cap shared by all engines.
+            Defaults to min(4, CPU count).
+        max_cpu_percent: Optional process-wide CPU budget, in percent of the
+            whole machine (100 = every core busy). Workers sleep when the
+            process exceeds it.
+        codec_threads: FFmpeg decoder threads per stream. Keeping this at 1
+            makes ``max_threads`` the real bound on decode threads.
+    """
+
+    # Length of the CPU accounting window in seconds
+    CPU_WINDOW = 0.5
+
+    def __init__(self, max_threads: int | None = None,
+                 max_cpu_percent: float | None = None,
+                 codec_threads: int = 1):
+        cpu_count = os.cpu_count() or 1
+        if max_threads is None:
+            max_threads = min(4, cpu_count)
+        if max_threads < 1:
+            raise ValueError("max_threads must be >= 1")
+        if max_cpu_percent is not None and not 0 < max_cpu_percent <= 100:
+            raise ValueError("max_cpu_percent must be in (0, 100]")
+
+        self.max_threads = max_threads
+        self.codec_threads = codec_threads
+        # Budget in CPU-seconds per wall-clock second
+        self._cpu_budget = None
+        if max_cpu_percent is not None:
+            self._cpu_budget = max_cpu_percent / 100.0 * cpu_count
+
+        self._ready = collections.deque()
+        # Parked tasks: (deadline, entry id, task)
+        self._parked = []
+        self._park_ids = itertools.count()
+        self._cond = threading.Condition()
+        self._workers = []
+        self._active = 0
+        self._shutdown = False
+
+        self._cpu_lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_cpu_start = time.process_time()
+        self.throttled_time = 0.0
+
+    @property
+    def active_tasks(self) -> int:
+        """Sessions submitted and not finished yet."""
+        with self._cond:
+            return self._active
+
+    @property
+    def thread_count(self) -> int:
+        with self._cond:
+            return len(self._workers)
+
+    def submit(self, session, name: str = "") -> DecodeTask:
+        """Queues a decode session generator and returns its task handle."""
+        task = DecodeTask(session, name, self)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("DecodeScheduler has been shut down")
+            self._active += 1
+            self._ready.append(task)
+            # Grow the pool lazily, never past max_threads
+            if len(self._workers) < min(self.max_threads, self._active):
+                worker = threading.Thread(
+                    target=self._worker,
+                    name=f"DecodeWorker-{len(self._workers)}",
+                    daemon=True
+                )
+                self._workers.append(worker)
+                worker.start()
+            self._cond.notify()
+        return task
+
+    def shutdown(self, timeout: float = 2.0):
+        """Closes all pending sessions and stops the workers."""
+        with self._cond:
+            self._shutdown = True
+            pending = list(self._ready)
+            pending.extend(task for _, entry, task in self._parked if task._parked == entry)
+            self._ready.clear()
+            self._parked.clear()
+            self._cond.notify_all()
+        for task in pending:
+            self._finish(task, close=True)
+        for worker in self._workers:
+            if worker is not threading.current_thread():
+                worker.join(timeout)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._shutdown:
+                        return
+                    self._release_due()
+                    if self._ready:
+                        break
+                    self._cond.wait(self._next_due())
+                task = self._ready.popleft()
+
+            self._throttle()
+
+            task._owner = threading.current_thread()
+            try:
+                deadline = next(task._session)
+                finished = False
+            except StopIteration:
+                finished = True
+            except Exception:
+                logger.exception("Decode session %s crashed", task.name)
+                finished = True
+            finally:
+                task._owner = None
+            task.steps += 1
+
+            if finished:
+                self._finish(task)
+                continue
+            with self._cond:
+                if self._shutdown:
+                    requeue = False
+                else:
+                    if deadline is None or task._woken:
+                        self._ready.append(task)
+                        self._cond.notify()
+                    else:
+                        self._park(task, deadline)
+                    task._woken = False
+                    requeue = True
+            if not requeue:
+                self._finish(task, close=True)
+
+    def _park(self, task: DecodeTask, deadline: float):
+        """Holds task back until deadline (called with _cond held)."""
+        entry = next(self._park_ids)
+        task._parked = entry
+        heapq.heappush(self._parked, (deadline, entry, task))
+        # A worker sleeping until a later deadline must recompute its timeout
+        self._cond.notify()
+
+    def _wake(self, task: DecodeTask):
+        with self._cond:
+            if task._parked is None:
+                task._woken = True
+                return
+            # The heap entry goes stale and is skipped when it comes due
+            task._parked = None
+            self._ready.append(task)
+            self._cond.notify()
+
+    def _release_due(self):
+        """Moves parked tasks whose deadline passed to the ready queue."""
+        parked = self._parked
+        now = time.perf_counter()
+        while parked and parked[0][0] <= now:
+            _, entry, task = heapq.heappop(parked)
+            if task._parked == entry:
+                task._parked = None
+                self._ready.append(task)
+
+    def _next_due(self) -> float | None:
+        """Seconds until the earliest valid parked deadline, or None."""
+        parked = self._parked
+        while parked and parked[0][2]._parked != parked[0][1]:
+            heapq.heappop(parked)
+        if not parked:
+            return None
+        return max(0.0, parked[0][0] - time.perf_counter())
+
+    def _finish(self, task: DecodeTask, close: bool = False):
+        if close:
+            try:
+                task._session.close()
+            except Exception:
+                pass
+        with self._cond:
+            self._active -= 1
+        task._done.set()
+
+    def _throttle(self):
+        """Sleeps long enough to bring process CPU use back under budget."""
+        if self._cpu_budget is None:
+            return
+        with self._cpu_lock:
+            now = time.monotonic()
+            cpu = time.process_time()
+            elapsed = now - self._window_start
+            if elapsed >= self.CPU_WINDOW:
+                self._window_start = now
+                self._window_cpu_start = cpu
+                return
+            excess = (cpu - self._window_cpu_start) - self._cpu_budget * elapsed
+            if excess <= 0:
+                return
+            delay = min(excess / self._cpu_budget, self.CPU_WINDOW)
+            self.throttled_time += delay
+        time.sleep(delay)
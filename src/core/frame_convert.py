@@ -0,0 +1,219 @@
+"""
+Frame conversion helpers: decoded PyAV frames -> packed pixel buffers.
+
+The legacy path (frame.to_image() -> PIL tobytes() -> QImage) allocated and
+copied every frame at least twice. Here a single cached libswscale context
+converts to RGB and the result is copied once into a buffer taken from a
+small, stride-aware pool that is reused frame after frame.
+
+The same swscale pass also resizes to the display size and writes directly in
+the requested pixel layout, so consumers do no further work. A zoomed view
+(``crop``) is cut out of the decoded planes before that pass, so it costs
+what its output size costs, whatever the source resolution. This module has
+no Qt dependency; core.qimage_convert wraps the buffers in QImages.
+"""
+import sys
+import threading
+from dataclasses import dataclass
+from fractions import Fraction
+
+import av.filter
+import numpy as np
+from av.video.reformatter import VideoReformatter
+
+# Packed FFmpeg pixel formats FrameConverter can produce -> bytes per pixel
+PACKED_FORMATS = {
+    "rgb24": 3,
+    "bgr24": 3,
+    "rgba": 4,
+    "bgra": 4,
+    "argb": 4,
+    "gray": 1,
+}
+
+
+class FrameBufferPool:
+    """
+    Ring of reusable pixel buffers, all with the same geometry.
+
+    QImages built on these buffers do not copy them, and the mailbox and the
+    display keep such an image until a newer one replaces it. A buffer is
+    therefore only handed out again once nothing outside the pool refers to
+    it any more (a QImage holds a reference to its buffer, as does any NumPy
+    view of it). When every buffer is still held, a fresh one joins the ring,
+    so a slow consumer costs memory, never a frame rewritten under it.
+    """
+
+    def __init__(self, slots: int = 4):
+        if slots < 1:
+            raise ValueError("slots must be >= 1")
+        self._slots = slots
+        self._lock = threading.Lock()
+        self._shape = None
+        self._buffers = []
+        self._index = 0
+
+    @property
+    def shape(self):
+        """(height, bytes_per_line) of the current generation, or None."""
+        return self._shape
+
+    def __len__(self):
+        with self._lock:
+            return len(self._buffers)
+
+    def acquire(self, height: int, bytes_per_line: int) -> np.ndarray:
+        """Returns a buffer of shape (height, bytes_per_line) nobody else holds."""
+        shape = (height, bytes_per_line)
+        with self._lock:
+            if shape != self._shape:
+                # Buffers of the old geometry still in use stay alive through
+                # their holders' references
+                self._buffers = [np.empty(shape, dtype=np.uint8) for _ in range(self._slots)]
+                self._shape = shape
+                self._index = 0
+
+            buffers = self._buffers
+            for step in range(len(buffers)):
+                i = (self._index + step) % len(buffers)
+                # Two references: the list's and getrefcount's argument
+                if sys.getrefcount(buffers[i]) <= 2:
+                    self._index = (i + 1) % len(buffers)
+                    return buffers[i]
+            buf = np.empty(shape, dtype=np.uint8)
+            buffers.insert(self._index, buf)
+            self._index = (self._index + 1) % len(buffers)
+            return buf
+
+
+@dataclass(frozen=True)
+class ConvertedFrame:
+    """
+    A converted frame in a pooled buffer.
+
+    ``data`` has shape (height, bytes_per_line) and includes FFmpeg's row
+    padding; pixels() gives the (height, width, channels) view without it.
+    """
+
+    data: np.ndarray
+    width: int
+    height: int
+    bytes_per_line: int
+    pix_fmt: str
+
+    def pixels(self) -> np.ndarray:
+        channels = PACKED_FORMATS[self.pix_fmt]
+        rows = self.data[:, :self.width * channels]
+        return rows.reshape(self.height, self.width, channels)
+
+
+class FrameConverter:
+    """
+    Converts av.VideoFrame objects to packed pixel buffers using a reused
+    swscale context and a FrameBufferPool.
+
+    ``output_size`` may be set from another thread to a (width, height) box
+    the output should fit in; None keeps the source resolution.
+    ``crop`` may likewise be set to an (x, y, width, height) region given in
+    fractions of the frame (0..1); only that region is converted, and it is
+    what has to fit ``output_size``. None converts the whole frame.
+    ``pix_fmt`` is one of the FFmpeg formats in PACKED_FORMATS.
+
+    convert() may be called from several threads at once: each thread gets
+    its own swscale context, and the buffer pool is locked.
+    """
+
+    def __init__(self, pool_slots: int = 4, pix_fmt: str = "rgb24"):
+        if pix_fmt not in PACKED_FORMATS:
+            raise ValueError(f"Unsupported pixel format: {pix_fmt}")
+        self._local = threading.local()
+        self._pool = FrameBufferPool(pool_slots)
+        self._pix_fmt = pix_fmt
+        self.output_size = None
+        self.crop = None
+
+    @property
+    def pix_fmt(self) -> str:
+        return self._pix_fmt
+
+    def fit_size(self, width: int, height: int) -> tuple[int, int]:
+        """Output dimensions for a source frame, aspect ratio preserved."""
+        box = self.output_size
+        if box is None:
+            return width, height
+        scale = min(box[0] / width, box[1] / height)
+        if scale >= 1.0:
+            return width, height
+        # Even dimensions keep swscale's chroma handling exact
+        return max(2, int(width * scale) & ~1), max(2, int(height * scale) & ~1)
+
+    def crop_box(self, width: int, height: int) -> tuple | None:
+        """
+        ``crop`` in pixels of a width x height frame, as (x, y, width,
+        height) on even coordinates; None when it covers the whole frame.
+        """
+        crop = self.crop
+        if crop is None:
+            return None
+        # Even offsets and sizes keep 4:2:0 chroma planes aligned
+        left = min(max(int(crop[0] * width), 0), width - 2) & ~1
+        top = min(max(int(crop[1] * height), 0), height - 2) & ~1
+        box_width = min(max(2, round(crop[2] * width)), width - left) & ~1
+        box_height = min(max(2, round(crop[3] * height)), height - top) & ~1
+        if box_width >= width - 1 and box_height >= height - 1:
+            return None
+        return left, top, box_width, box_height
+
+    def convert(self, frame, pix_fmt: str | None = None) -> ConvertedFrame:
+        """
+        Converts a decoded frame to ``pix_fmt`` (default: the converter's),
+        cut to ``crop`` and scaled to fit ``output_size``.
+
+        The result references a pooled buffer, which the pool does not hand
+        out again while the result (or an image or view of its data) lives.
+        """
+        pix_fmt = pix_fmt or self._pix_fmt
+        box = self.crop_box(frame.width, frame.height)
+        if box is not None:
+            frame = self._cropped(frame, box)
+        width, height = self.fit_size(frame.width, frame.height)
+        reformatter = getattr(self._local, "reformatter", None)
+        if reformatter is None:
+            reformatter = self._local.reformatter = VideoReformatter()
+        rgb = reformatter.reformat(frame, width=width, height=height, format=pix_fmt)
+        plane = rgb.planes[0]
+        bytes_per_line = plane.line_size
+
+        # View the plane in place (including FFmpeg's row padding) and copy it
+        # into the pooled buffer in one pass.
+        src = np.frombuffer(plane, dtype=np.uint8).reshape(rgb.height, bytes_per_line)
+        buf = self._pool.acquire(rgb.height, bytes_per_line)
+        np.copyto(buf, src)
+        return ConvertedFrame(buf, rgb.width, rgb.height, bytes_per_line, pix_fmt)
+
+    def _cropped(self, frame, box: tuple):
+        """
+        frame cut to box by FFmpeg's crop filter, which only offsets the
+        plane pointers: nothing is copied at source resolution.
+        """
+        key = (frame.width, frame.height, frame.format.name, box)
+        cached = getattr(self._local, "crop_graph", None)
+        if cached is None or cached[0] != key:
+            cached = self._local.crop_graph = (key, _crop_graph(frame, box))
+        graph = cached[1]
+        graph.push(frame)
+        return graph.pull()
+
+
+def _crop_graph(frame, box: tuple):
+    """A buffer -> crop -> buffersink graph for frames like frame."""
+    x, y, width, height = box
+    graph = av.filter.Graph()
+    source = graph.add_buffer(width=frame.width, height=frame.height, format=frame.format.name,
+                              time_base=frame.time_base or Fraction(1, 1000))
+    crop = graph.add("crop", f"{width}:{height}:{x}:{y}")
+    sink = graph.add("buffersink")
+    source.link_to(crop)
+    crop.link_to(sink)
+    graph.configure()
+    return graph
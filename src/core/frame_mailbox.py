@@ -0,0 +1,71 @@
+"""
+Single-slot, latest-frame-wins handoff between the decode thread and the UI.
+
+The decoder overwrites whatever the UI has not picked up yet, so the amount of
+buffered video (and therefore latency and memory) never grows past one frame
+no matter how far the UI falls behind.
+
+Frames are usually QImages over pooled conversion buffers
+(core.frame_convert.FrameBufferPool). The pool reuses a buffer only once
+nothing refers to it, so the mailbox owns a frame until put() replaces it,
+and take() hands that ownership to the consumer, which keeps the frame
+intact for as long as it holds the image.
+"""
+import threading
+
+
+class FrameMailbox:
+    """Thread-safe mailbox holding at most one (the newest) frame."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self._delivered = 0
+        self._dropped = 0
+
+    def put(self, frame) -> bool:
+        """
+        Stores a frame, replacing any frame that has not been taken yet.
+
+        Returns:
+            True if an older, never displayed frame was dropped.
+        """
+        with self._lock:
+            dropped = self._frame is not None
+            if dropped:
+                self._dropped += 1
+            self._frame = frame
+            return dropped
+
+    def take(self):
+        """Removes and returns the newest frame, or None if nothing is new."""
+        with self._lock:
+            frame = self._frame
+            if frame is not None:
+                self._frame = None
+                self._delivered += 1
+            return frame
+
+    def reset(self):
+        """Discards the pending frame and clears the counters."""
+        with self._lock:
+            self._frame = None
+            self._delivered = 0
+            self._dropped = 0
+
+    @property
+    def pending(self) -> bool:
+        with self._lock:
+            return self._frame is not None
+
+    @property
+    def delivered(self) -> int:
+        """Number of frames handed to the consumer."""
+        with self._lock:
+            return self._delivered
+
+    @property
+    def dropped(self) -> int:
+        """Number of frames overwritten before the consumer took them."""
+        with self._lock:
+            return self._dropped
@@ -0,0 +1,306 @@
+"""
+Camera inventory validation: probe many sources at once before showing them.
+
+URLValidator only checks that a string looks like a URL, so a dead camera
+shows up only after Start and a full connection timeout. load_inventory()
+reads a CSV or JSON inventory, and InventoryValidator opens every source on
+a bounded pool of threads, each probe limited to timeout seconds, and
+reports codec, resolution, frame rate, time to first frame and failures.
+URLs and error messages in the results never contain credentials.
+Results are kept in a ProbeCache (optionally a JSON file) for ttl seconds,
+and order_by_health() uses it to start known-good grid sources first.
+"""
+import csv
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from .connection_cache import cache_key
+from .sources import StreamSource
+from .stream_profiles import DEFAULT_PROFILE, get_profile
+from .url_validator import URLValidator
+
+logger = logging.getLogger("RTSP")
+
+# The "user[:password]@" part of any URL quoted in a message
+_USERINFO = re.compile(r"://[^/@\s]+@")
+
+# ProbeResult.status values
+OK = "ok"
+INVALID = "invalid"
+AUTH_FAILED = "auth_failed"
+TIMEOUT = "timeout"
+UNREACHABLE = "unreachable"
+NO_VIDEO = "no_video"
+
+
+@dataclass(frozen=True)
+class InventoryEntry:
+    """One camera of an inventory: a display name and a "MAIN" or "MAIN|SUB" source."""
+
+    name: str
+    url: str
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """
+    Outcome of probing one URL. url is redacted; codec, width, height, fps
+    and first_frame_ms are None when the source did not deliver a frame.
+    checked_at is wall-clock time (time.time()), so results can be stored.
+    """
+
+    url: str
+    status: str
+    error: str = ""
+    codec: str | None = None
+    width: int | None = None
+    height: int | None = None
+    fps: float | None = None
+    first_frame_ms: float | None = None
+    checked_at: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProbeResult":
+        return cls(**{key: data[key] for key in cls.__dataclass_fields__ if key in data})
+
+
+def redact_url(url: str) -> str:
+    """url with any user name and password replaced by "***"."""
+    username, _password = URLValidator.extract_credentials(url)
+    if not username:
+        return url
+    parts = urlsplit(url)
+    netloc = "***@" + parts.netloc.rpartition("@")[2]
+    return urlunsplit((parts.scheme, netloc, parts.path, parts.query, parts.fragment))
+
+
+def redact_text(text: str, url: str) -> str:
+    """
+    text (an error message that may quote url) with the user name and
+    password of url, and of any other URL in it, replaced by "***". The
+    rest of the message is left as it is.
+    """
+    text = text.replace(url, redact_url(url))
+    return _USERINFO.sub("://***@", text)
+
+
+def load_inventory(path) -> list:
+    """
+    Reads InventoryEntry items from a .json or .csv file. CSV files need a
+    "url" column and may have a "name" column. JSON files hold a list of
+    URL strings or {"url": ..., "name": ...} objects, either at the top level
+    or under a "cameras" key. Raises ValueError for an unusable file.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(data, dict):
+            data = data.get("cameras")
+        if not isinstance(data, list):
+            raise ValueError(f"{path}: expected a list of cameras")
+        rows = [{"url": item} if isinstance(item, str) else item for item in data]
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames is None or "url" not in reader.fieldnames:
+                raise ValueError(f"{path}: CSV inventory needs a 'url' column")
+            rows = list(reader)
+
+    entries = []
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f"{path}: unexpected inventory item {row!r}")
+        url = str(row.get("url") or "").strip()
+        if not url:
+            continue
+        name = str(row.get("name") or "").strip() or redact_url(StreamSource.parse(url).main)
+        entries.append(InventoryEntry(name, url))
+    return entries
+
+
+def probe_source(url: str, profile: str = DEFAULT_PROFILE, timeout: float = 5.0) -> ProbeResult:
+    """
+    Opens url and decodes until the first frame, giving up after timeout
+    seconds. Never raises; failures are reported in the result's status.
+    """
+    from .decode_engine import open_source
+
+    url = url.strip()
+    safe_url = redact_url(url)
+    valid, message = URLValidator.validate(url)
+    if not valid:
+        return ProbeResult(safe_url, INVALID, message, checked_at=time.time())
+
+    started = time.monotonic()
+    deadline = started + timeout
+    container = None
+    try:
+        # Each blocking open or read gives up after timeout
+        container = open_source(url, get_profile(profile), timeout=(timeout, timeout))
+        if not container.streams.video:
+            return ProbeResult(safe_url, NO_VIDEO, "Container has no video stream.",
+                               checked_at=time.time())
+        stream = container.streams.video[0]
+        for packet in container.demux(stream):
+            for frame in packet.decode():
+                rate = stream.average_rate or stream.guessed_rate
+                return ProbeResult(
+                    safe_url, OK,
+                    codec=stream.codec_context.name,
+                    width=frame.width,
+                    height=frame.height,
+                    fps=round(float(rate), 3) if rate else None,
+                    first_frame_ms=(time.monotonic() - started) * 1000.0,
+                    checked_at=time.time(),
+                )
+            if time.monotonic() > deadline:
+                return ProbeResult(safe_url, TIMEOUT, f"No frame within {timeout:g} s",
+                                   checked_at=time.time())
+        return ProbeResult(safe_url, NO_VIDEO, "Source ended before the first frame.",
+                           checked_at=time.time())
+    except Exception as e:
+        return ProbeResult(safe_url, _failure_status(e), redact_text(f"{type(e).__name__}: {e}", url),
+                           checked_at=time.time())
+    finally:
+        if container is not None:
+            try:
+                container.close()
+            except Exception:
+                pass
+
+
+def _failure_status(error: Exception) -> str:
+    import av
+
+    message = str(error).lower()
+    if "401" in message or "unauthorized" in message:
+        return AUTH_FAILED
+    # ExitError: av.open's timeout interrupted a blocking call
+    if isinstance(error, (av.ExitError, TimeoutError)):
+        return TIMEOUT
+    return UNREACHABLE
+
+
+class ProbeCache:
+    """
+    Probe results per source, fresh for ttl seconds. Keys are cache_key()
+    of the probed URL, so they hold no credentials and survive a password
+    change. With a path, the cache is read from and saved to a JSON file,
+    which lets the validation CLI and the grid share results. Thread-safe.
+    """
+
+    def __init__(self, ttl: float = 300.0, path=None):
+        self.ttl = ttl
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._results = {}
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def get(self, url: str, now: float | None = None) -> ProbeResult | None:
+        """The fresh result for url, or None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            result = self._results.get(cache_key(url))
+        if result is None or now - result.checked_at > self.ttl:
+            return None
+        return result
+
+    def put(self, url: str, result: ProbeResult):
+        with self._lock:
+            self._results[cache_key(url)] = result
+
+    def save(self):
+        """Writes the fresh results to path (atomically); no-op without a path."""
+        if self.path is None:
+            return
+        now = time.time()
+        with self._lock:
+            data = {key: result.to_dict() for key, result in self._results.items()
+                    if now - result.checked_at <= self.ttl}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._results = {key: ProbeResult.from_dict(value) for key, value in data.items()}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable probe cache %s: %s", self.path, e)
+
+
+def order_by_health(urls: list, cache: ProbeCache) -> list:
+    """
+    urls with sources whose main stream last probed fine first, then the
+    unknown ones, then the failed ones; the order is kept within each group.
+    """
+    def rank(url):
+        result = cache.get(StreamSource.parse(url).main)
+        if result is None:
+            return 1
+        return 0 if result.ok else 2
+
+    return sorted(urls, key=rank)
+
+
+class InventoryValidator:
+    """
+    Probes sources concurrently, at most max_workers at a time, each for
+    at most timeout seconds. Fresh results in cache are reused unless
+    validate() is called with refresh=True.
+    """
+
+    def __init__(self, max_workers: int = 8, timeout: float = 5.0,
+                 profile: str = DEFAULT_PROFILE, cache: ProbeCache | None = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.profile = profile
+        self.cache = cache if cache is not None else ProbeCache()
+
+    def validate(self, urls: list, refresh: bool = False) -> list:
+        """ProbeResult for each URL, in the order given."""
+        results = [None if refresh else self.cache.get(url) for url in urls]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)),
+                                    thread_name_prefix="Probe") as executor:
+                futures = {i: executor.submit(probe_source, urls[i], self.profile, self.timeout)
+                           for i in pending}
+                for i, future in futures.items():
+                    results[i] = future.result()
+                    self.cache.put(urls[i], results[i])
+        return results
+
+    def validate_inventory(self, entries: list, refresh: bool = False) -> list:
+        """
+        (entry, [ProbeResult per URL]) for each InventoryEntry; both streams
+        of a "MAIN|SUB" source are probed.
+        """
+        urls = [StreamSource.parse(entry.url).urls for entry in entries]
+        flat = self.validate([url for group in urls for url in group], refresh=refresh)
+        report, start = [], 0
+        for entry, group in zip(entries, urls):
+            report.append((entry, flat[start:start + len(group)]))
+            start += len(group)
+        return report
@@ -0,0 +1,154 @@
+"""
+Keyframe index for local files and recordings.
+
+Seeking means starting to decode at a keyframe before the target, and
+formats such as MPEG-TS carry no index of their own. KeyframeIndex is built
+once by demuxing the file without decoding (packet headers only), and is
+stored next to the file as "<file>.kfindex.json". A stored index is used
+only while the file's size and modification time still match, so a
+recording that grew since gets a fresh scan.
+
+Positions in seconds count from the start of the stream, so 0 is the first
+frame and ``duration`` the end, whatever the file's first timestamp (MPEG-TS
+rarely starts at 0).
+"""
+import bisect
+import json
+import logging
+import os
+import tempfile
+from fractions import Fraction
+from pathlib import Path
+
+logger = logging.getLogger("RTSP")
+
+INDEX_SUFFIX = ".kfindex.json"
+INDEX_VERSION = 2
+
+
+def index_path(media_path) -> Path:
+    """Where the index of media_path is stored."""
+    return Path(str(media_path) + INDEX_SUFFIX)
+
+
+def _file_stamp(media_path) -> list:
+    info = os.stat(media_path)
+    return [info.st_size, info.st_mtime_ns]
+
+
+class KeyframeIndex:
+    """
+    Presentation timestamps of the keyframes of a file's first video
+    stream, in stream time_base units and ascending order. ``start`` is the
+    stream's first pts, which positions in seconds are relative to.
+    """
+
+    def __init__(self, keyframes: list, time_base: Fraction, duration: float | None = None,
+                 stamp: list | None = None, start: int = 0):
+        if not keyframes:
+            raise ValueError("A keyframe index needs at least one keyframe")
+        self.keyframes = sorted(keyframes)
+        self.time_base = Fraction(time_base)
+        self.duration = duration
+        self.start = start
+        self._stamp = stamp
+
+    def __len__(self):
+        return len(self.keyframes)
+
+    @property
+    def start_time(self) -> float:
+        """pts time (frame.time) of the stream start, in seconds."""
+        return float(self.start * self.time_base)
+
+    @property
+    def times(self) -> list:
+        """Keyframe positions in seconds from the stream start."""
+        return [self.to_seconds(pts) for pts in self.keyframes]
+
+    def to_pts(self, seconds: float) -> int:
+        """pts of the position seconds after the stream start."""
+        return self.start + round(Fraction(seconds) / self.time_base)
+
+    def to_seconds(self, pts: int) -> float:
+        """Position of pts in seconds from the stream start."""
+        return float((pts - self.start) * self.time_base)
+
+    def keyframe_before(self, seconds: float) -> int:
+        """pts of the last keyframe at or before seconds (the first one for earlier times)."""
+        i = bisect.bisect_right(self.keyframes, self.to_pts(seconds))
+        return self.keyframes[max(i - 1, 0)]
+
+    @classmethod
+    def build(cls, media_path) -> "KeyframeIndex":
+        """Scans media_path's packets (nothing is decoded). Raises ValueError without video."""
+        import av
+
+        stamp = _file_stamp(media_path)
+        with av.open(str(media_path)) as container:
+            if not container.streams.video:
+                raise ValueError(f"{media_path}: no video stream")
+            stream = container.streams.video[0]
+            keyframes = []
+            first = end = None
+            for packet in container.demux(stream):
+                pts = packet.pts if packet.pts is not None else packet.dts
+                if pts is None:
+                    continue
+                if packet.is_keyframe:
+                    keyframes.append(pts)
+                packet_end = pts + (packet.duration or 0)
+                first = pts if first is None else min(first, pts)
+                end = packet_end if end is None else max(end, packet_end)
+            if not keyframes:
+                raise ValueError(f"{media_path}: no keyframes")
+            start = stream.start_time if stream.start_time is not None else first
+            duration = float((end - start) * stream.time_base)
+            return cls(keyframes, stream.time_base, duration, stamp, start)
+
+    @classmethod
+    def load(cls, media_path) -> "KeyframeIndex | None":
+        """The stored index of media_path, or None if missing, unreadable or stale."""
+        try:
+            data = json.loads(index_path(media_path).read_text(encoding="utf-8"))
+            if data.get("version") != INDEX_VERSION or data.get("stamp") != _file_stamp(media_path):
+                return None
+            return cls(data["keyframes"], Fraction(data["time_base"]), data.get("duration"),
+                       data["stamp"], data["start"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable keyframe index for %s: %s", media_path, e)
+            return None
+
+    def save(self, media_path):
+        """Stores the index next to media_path (atomically)."""
+        path = index_path(media_path)
+        data = {
+            "version": INDEX_VERSION,
+            "stamp": self._stamp or _file_stamp(media_path),
+            "time_base": str(self.time_base),
+            "duration": self.duration,
+            "start": self.start,
+            "keyframes": self.keyframes,
+        }
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def for_file(cls, media_path) -> "KeyframeIndex":
+        """
+        The stored index, or a fresh scan that is then stored. A folder that
+        cannot be written to only costs the scan again next time.
+        """
+        index = cls.load(media_path)
+        if index is not None:
+            return index
+        index = cls.build(media_path)
+        try:
+            index.save(media_path)
+        except OSError as e:
+            logger.warning("Could not store keyframe index for %s: %s", media_path, e)
+        return index
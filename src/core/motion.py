@@ -0,0 +1,232 @@
+"""
+Motion detection on decoded frames.
+
+MotionDetector compares the luma plane of each analyzed frame with a
+running-average background model. It works on a strided view of
+``frame.planes[0]``: nothing is converted or copied at source resolution,
+so a 1080p frame costs about as much as a 240x135 one. MotionAnalyzer runs
+the detector on its own thread at a reduced rate; the decode thread only
+hands over a frame reference, so analysis never delays display.
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .decode_modes import FrameRateCap
+from .frame_mailbox import FrameMailbox
+from .stats import RollingStats
+
+# 8-bit pixel formats whose first plane is the luma plane
+LUMA_FORMATS = frozenset({
+    "yuv420p", "yuvj420p", "yuv422p", "yuvj422p", "yuv444p", "yuvj444p",
+    "nv12", "nv21", "gray",
+})
+
+
+@dataclass(frozen=True)
+class MotionConfig:
+    """
+    Motion detection settings.
+
+    Args:
+        max_fps: Frames analyzed per second at most; the rest are skipped.
+        downscale: Every downscale-th luma sample is used in each direction.
+        threshold: Luma difference from the background that counts as change.
+        learning_rate: Weight of each analyzed frame in the background model.
+        grid: Columns and rows of the cells motion is reported in.
+        min_cell_fraction: Share of changed samples that makes a cell a region.
+    """
+
+    max_fps: float = 5.0
+    downscale: int = 8
+    threshold: int = 25
+    learning_rate: float = 0.05
+    grid: tuple = (8, 6)
+    min_cell_fraction: float = 0.02
+
+    def __post_init__(self):
+        if self.max_fps <= 0 or self.downscale < 1:
+            raise ValueError("max_fps and downscale must be positive")
+        if not 0.0 < self.learning_rate <= 1.0:
+            raise ValueError("learning_rate must be in (0, 1]")
+        if min(self.grid) < 1:
+            raise ValueError("grid needs at least one column and row")
+
+
+@dataclass(frozen=True)
+class MotionRegion:
+    """A grid cell with motion; coordinates are fractions of the frame size."""
+
+    x: float
+    y: float
+    width: float
+    height: float
+    score: float
+
+
+@dataclass(frozen=True)
+class MotionEvent:
+    """
+    Result of analyzing one frame: score is the changed share of the whole
+    frame, regions the cells above MotionConfig.min_cell_fraction.
+    """
+
+    score: float
+    regions: tuple
+    media_time: float | None = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.regions)
+
+
+def luma_plane(frame, step: int = 1) -> np.ndarray:
+    """
+    Every step-th luma sample of frame as a uint8 array. For the formats in
+    LUMA_FORMATS this is a view into the frame's own buffer; other formats
+    are converted to gray at the reduced size first.
+    """
+    if frame.format.name not in LUMA_FORMATS:
+        frame = frame.reformat(width=max(1, frame.width // step),
+                               height=max(1, frame.height // step), format="gray")
+        step = 1
+    plane = frame.planes[0]
+    rows = np.frombuffer(plane, np.uint8).reshape(-1, plane.line_size)
+    return rows[:frame.height:step, :frame.width:step]
+
+
+class MotionDetector:
+    """Frame differencing against a running-average background."""
+
+    def __init__(self, config: MotionConfig = MotionConfig()):
+        self.config = config
+        self._background = None
+
+    def reset(self):
+        """Forgets the background, e.g. when the source changes."""
+        self._background = None
+
+    def process(self, luma: np.ndarray, media_time: float | None = None) -> MotionEvent | None:
+        """
+        Compares luma with the background and then blends it in. Returns
+        None for the first frame (or after a size change), which only
+        seeds the background.
+        """
+        config = self.config
+        current = luma.astype(np.float32)
+        background = self._background
+        if background is None or background.shape != current.shape:
+            self._background = current
+            return None
+        delta = current - background
+        changed = np.abs(delta) > config.threshold
+        # In place: background += learning_rate * (current - background)
+        delta *= config.learning_rate
+        background += delta
+
+        height, width = changed.shape
+        columns, rows = config.grid
+        xs = np.linspace(0, width, min(columns, width) + 1).astype(np.intp)
+        ys = np.linspace(0, height, min(rows, height) + 1).astype(np.intp)
+        counts = np.add.reduceat(
+            np.add.reduceat(changed, ys[:-1], axis=0, dtype=np.int32), xs[:-1], axis=1
+        )
+        fractions = counts / np.outer(np.diff(ys), np.diff(xs))
+        regions = tuple(
+            MotionRegion(
+                x=int(xs[col]) / width, y=int(ys[row]) / height,
+                width=int(xs[col + 1] - xs[col]) / width,
+                height=int(ys[row + 1] - ys[row]) / height,
+                score=float(fractions[row, col]),
+            )
+            for row, col in zip(*np.nonzero(fractions >= config.min_cell_fraction))
+        )
+        return MotionEvent(score=float(counts.sum()) / changed.size, regions=regions,
+                           media_time=media_time)
+
+
+class MotionAnalyzer:
+    """
+    Runs a MotionDetector on a worker thread. submit() is cheap enough for
+    the decode thread: it admits at most MotionConfig.max_fps frames per
+    second and leaves them in a single-slot mailbox, so a frame is skipped
+    rather than queued when analysis falls behind. on_motion(event) is
+    called on the worker thread for every frame with motion, and once more
+    with an inactive event when motion ends.
+    """
+
+    def __init__(self, config: MotionConfig = MotionConfig(), on_motion=None):
+        self.config = config
+        self.on_motion = on_motion or (lambda event: None)
+        self._detector = MotionDetector(config)
+        self._cap = FrameRateCap(config.max_fps)
+        self._mailbox = FrameMailbox()
+        self._wake = threading.Event()
+        self._closed = False
+        self._reset_pending = False
+        self._thread = None
+        self._cost = RollingStats()
+        self._analyzed = 0
+        self._active = False
+        self._last_score = None
+
+    def submit(self, frame) -> bool:
+        """Offers a decoded frame; True if it was taken for analysis."""
+        if self._closed or not self._cap.admit(time.monotonic()):
+            return False
+        self._mailbox.put(frame)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="Motion", daemon=True)
+            self._thread.start()
+        self._wake.set()
+        return True
+
+    def reset(self):
+        """Drops the pending frame and restarts the background model."""
+        self._mailbox.reset()
+        self._reset_pending = True
+
+    def close(self, timeout: float = 1.0):
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "motion_analyzed": self._analyzed,
+            "motion_skipped": self._mailbox.dropped,
+            "motion_ms": self._cost.percentiles(scale=1000.0)["p50"],
+            "motion_score": self._last_score,
+        }
+
+    def analyze(self, frame) -> MotionEvent | None:
+        """Runs the detector on frame and records its cost."""
+        started = time.perf_counter()
+        event = self._detector.process(luma_plane(frame, self.config.downscale), frame.time)
+        self._cost.add(time.perf_counter() - started)
+        self._analyzed += 1
+        return event
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                return
+            if self._reset_pending:
+                self._reset_pending = False
+                self._detector.reset()
+                self._active = False
+            frame = self._mailbox.take()
+            if frame is None:
+                continue
+            event = self.analyze(frame)
+            if event is None:
+                continue
+            self._last_score = event.score
+            if event.active or self._active:
+                self._active = event.active
+                self.on_motion(event)
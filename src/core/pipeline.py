@@ -0,0 +1,359 @@
+"""
+Staged decode pipeline: demux thread -> packet queue -> decode stage ->
+frame queue -> conversion workers -> in-order delivery.
+
+A slow conversion no longer stalls packet reading: the demux thread keeps
+draining the socket into a bounded packet queue, and each queue has its own
+limit and drop policy for live sources. Conversion runs on a small worker
+pool, and a reorder buffer hands results on in decode order.
+"""
+import collections
+import threading
+import time
+from dataclasses import dataclass
+
+# Sentinel for the end of a stream: PacketQueue.get() returns it once the
+# queue is closed, and the demux thread queues it after the last packet
+END = object()
+
+
+class _Failure:
+    """Carries an exception from the demux thread to the decode stage."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    """
+    Limits for the staged pipeline.
+
+    Args:
+        packet_queue_size: Packets buffered between demux and decode.
+        frame_queue_size: Decoded frames waiting for a conversion worker.
+        convert_workers: Conversion threads.
+    """
+
+    packet_queue_size: int = 120
+    frame_queue_size: int = 4
+    convert_workers: int = 2
+
+    def __post_init__(self):
+        if min(self.packet_queue_size, self.frame_queue_size, self.convert_workers) < 1:
+            raise ValueError("PipelineConfig limits must be >= 1")
+
+
+class PacketQueue:
+    """
+    Bounded packet queue between the demux thread and the decoder.
+
+    For live sources (``drop=True``) a full queue never blocks the demuxer.
+    The oldest disposable (non-reference) packet is dropped first. If there
+    is none, the whole backlog is discarded and incoming packets are skipped
+    until the next keyframe, so the decoder resumes on a clean GOP. For
+    finite sources (``drop=False``) the producer waits instead.
+    """
+
+    def __init__(self, maxsize: int, drop: bool = True):
+        self._maxsize = maxsize
+        self._drop = drop
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._skip_to_keyframe = False
+        self._closed = False
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def put(self, packet):
+        with self._cond:
+            if self._skip_to_keyframe:
+                if not packet.is_keyframe:
+                    self.dropped += 1
+                    return
+                self._skip_to_keyframe = False
+
+            while len(self._items) >= self._maxsize and not self._closed:
+                if not self._drop:
+                    self._cond.wait()
+                    continue
+                self._make_room(packet)
+                if self._skip_to_keyframe:
+                    return
+
+            if self._closed:
+                return
+            self._items.append(packet)
+            self._cond.notify_all()
+
+    def _make_room(self, incoming):
+        for index, queued in enumerate(self._items):
+            if queued.is_disposable:
+                del self._items[index]
+                self.dropped += 1
+                return
+        # Nothing cheap to drop: discard the backlog and catch up to live
+        self.dropped += len(self._items)
+        self._items.clear()
+        if not incoming.is_keyframe:
+            self.dropped += 1
+            self._skip_to_keyframe = True
+
+    def put_control(self, item):
+        """Queues a sentinel; never dropped and never blocks."""
+        with self._cond:
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout: float | None = None):
+        """Next item, None if nothing arrived within timeout, or END once closed."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return END if self._closed else None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
+
+
+class FrameQueue:
+    """
+    Bounded queue of (seq, frame) awaiting conversion.
+
+    Live sources drop the oldest frame when full (the newest frame is the
+    one worth showing); finite sources block the decoder instead.
+    """
+
+    def __init__(self, maxsize: int, drop: bool = True, on_drop=None):
+        self._maxsize = maxsize
+        self._drop = drop
+        self._on_drop = on_drop
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def put(self, seq: int, frame):
+        evicted = None
+        with self._cond:
+            while len(self._items) >= self._maxsize and not self._closed:
+                if self._drop:
+                    evicted = self._items.popleft()[0]
+                    self.dropped += 1
+                    break
+                self._cond.wait()
+            if self._closed:
+                evicted = seq
+            else:
+                self._items.append((seq, frame))
+                self._cond.notify_all()
+        if evicted is not None and self._on_drop:
+            self._on_drop(evicted)
+
+    def get(self):
+        """Next (seq, frame), or None once the queue is closed and empty."""
+        with self._cond:
+            while not self._items and not self._closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def wait_empty(self, is_running):
+        """Blocks until every queued frame was picked up (or is_running fails)."""
+        with self._cond:
+            while self._items and is_running():
+                self._cond.wait(0.05)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ReorderBuffer:
+    """Releases converted frames strictly in sequence order."""
+
+    def __init__(self, deliver):
+        self._deliver = deliver
+        self._next = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def complete(self, seq: int, result):
+        with self._lock:
+            self._pending[seq] = result
+            self._flush()
+
+    def skip(self, seq: int):
+        """Marks a sequence number as dropped so later frames are not held back."""
+        self.complete(seq, END)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _flush(self):
+        while self._next in self._pending:
+            result = self._pending.pop(self._next)
+            self._next += 1
+            if result is not END:
+                self._deliver(*result)
+
+
+class StagedPipeline:
+    """
+    Runs demux, decode and conversion as separate stages.
+
+    Args:
+        packets: Iterator of demuxed packets (container.demux(stream)).
+        convert: frame -> converted image, called on worker threads.
+        deliver: (image, frame) -> None, called in decode order.
+        on_packet: Optional (packet, received_time) hook, demux thread.
+        admit: Optional packet -> bool filter, decode stage; packets it
+            rejects are not decoded.
+        admit_frame: Optional frame -> bool filter, decode stage; frames it
+            rejects are not converted.
+        config: PipelineConfig.
+        live: Drop under load (True) or apply backpressure (False).
+        timings: Optional dict of RollingStats keyed by stage name.
+    """
+
+    # How often the decode stage re-checks is_running while idle
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, packets, convert, deliver, on_packet=None,
+                 config: PipelineConfig = PipelineConfig(), live: bool = True,
+                 timings: dict | None = None, admit=None, admit_frame=None):
+        self._packets = packets
+        self._convert = convert
+        self._on_packet = on_packet
+        self._admit = admit
+        self._admit_frame = admit_frame
+        self._config = config
+        self._timings = timings or {}
+        self._running = True
+
+        self._reorder = ReorderBuffer(deliver)
+        self.packet_queue = PacketQueue(config.packet_queue_size, drop=live)
+        self.frame_queue = FrameQueue(config.frame_queue_size, drop=live,
+                                      on_drop=self._reorder.skip)
+        self._seq = 0
+
+        self._demux_thread = threading.Thread(target=self._demux, name="Demux", daemon=True)
+        self._workers = [
+            threading.Thread(target=self._convert_worker, name=f"Convert-{i}", daemon=True)
+            for i in range(config.convert_workers)
+        ]
+
+    @property
+    def dropped_packets(self) -> int:
+        return self.packet_queue.dropped
+
+    @property
+    def dropped_frames(self) -> int:
+        return self.frame_queue.dropped
+
+    def frames(self, is_running):
+        """
+        Decode stage, run on the caller's thread. Yields each decoded frame
+        after handing it to the conversion workers; re-raises demux errors.
+        """
+        self._demux_thread.start()
+        for worker in self._workers:
+            worker.start()
+
+        while is_running():
+            item = self.packet_queue.get(timeout=self.POLL_INTERVAL)
+            if item is None:
+                continue
+            if item is END:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            if self._admit is not None and not self._admit(item):
+                continue
+
+            started = time.perf_counter()
+            decoded = item.decode()
+            self._time("decode", time.perf_counter() - started)
+            for frame in decoded:
+                if self._admit_frame is not None and not self._admit_frame(frame):
+                    continue
+                self.frame_queue.put(self._seq, frame)
+                self._seq += 1
+                yield frame
+
+        # Let the workers finish what was decoded before the source ended
+        self.frame_queue.wait_empty(is_running)
+
+    def close(self, timeout: float = 10.0) -> bool:
+        """
+        Stops all stages. Returns False if the demux thread is still inside
+        a read, in which case the container must not be closed yet.
+        """
+        self._running = False
+        self.packet_queue.close()
+        self.frame_queue.close()
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.join(timeout)
+        if self._demux_thread.is_alive():
+            self._demux_thread.join(timeout)
+        return not self._demux_thread.is_alive()
+
+    def _time(self, stage: str, seconds: float):
+        stats = self._timings.get(stage)
+        if stats is not None:
+            stats.add(seconds)
+
+    def _demux(self):
+        try:
+            while self._running:
+                started = time.perf_counter()
+                packet = next(self._packets, None)
+                received = time.perf_counter()
+                if packet is None:
+                    break
+                self._time("demux", received - started)
+                if self._on_packet:
+                    self._on_packet(packet, received)
+                self.packet_queue.put(packet)
+        except Exception as e:
+            self.packet_queue.put_control(_Failure(e))
+            return
+        self.packet_queue.put_control(END)
+
+    def _convert_worker(self):
+        while True:
+            item = self.frame_queue.get()
+            if item is None:
+                return
+            seq, frame = item
+            try:
+                started = time.perf_counter()
+                image = self._convert(frame)
+                self._time("convert", time.perf_counter() - started)
+            except Exception:
+                self._reorder.skip(seq)
+                continue
+            self._reorder.complete(seq, (image, frame))
@@ -0,0 +1,80 @@
+"""
+Timestamp-driven presentation: when each decoded frame should be shown.
+
+Without a clock, files play as fast as they decode and live streams show
+network jitter one to one. PresentationClock maps a frame's media time
+(pts * time_base) to a wall-clock deadline. The engine sleeps until that
+deadline, or skips the frame when it is already too late. Live sources are
+held back by a tunable jitter buffer, so bursts of late packets still come
+out evenly spaced.
+"""
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PacingConfig:
+    """
+    Args:
+        jitter_buffer: Seconds live frames are delayed to absorb network
+            jitter (0 shows each frame as soon as it is due).
+        late_threshold: Frames this many seconds past their deadline are
+            skipped; while behind, the decoder also skips non-reference frames.
+        max_drift: A deadline further than this from now (a timestamp jump,
+            a seek, a long stall) re-anchors the clock instead of sleeping
+            or skipping.
+    """
+
+    jitter_buffer: float = 0.0
+    late_threshold: float = 0.1
+    max_drift: float = 2.0
+
+    def __post_init__(self):
+        if self.jitter_buffer < 0 or self.late_threshold <= 0 or self.max_drift <= 0:
+            raise ValueError("PacingConfig values must be positive")
+
+
+class PresentationClock:
+    """
+    Wall-clock deadlines for media timestamps.
+
+    The first frame anchors the clock: a frame at media time t is due at
+    anchor + t, where anchor places the first frame ``delay`` seconds from
+    now. Files use no delay; live sources use the jitter buffer, and a live
+    frame that arrives later than the buffer can absorb re-anchors the
+    clock, which refills the buffer.
+    """
+
+    def __init__(self, config: PacingConfig = PacingConfig(), live: bool = False):
+        self.config = config
+        self.live = live
+        self._delay = config.jitter_buffer if live else 0.0
+        self._anchor = None
+        self.reanchors = 0
+
+    def reset(self):
+        self._anchor = None
+
+    def due(self, media_time: float, now: float | None = None) -> float:
+        """Deadline (time.perf_counter() scale) for a frame at media_time seconds."""
+        now = time.perf_counter() if now is None else now
+        if self._anchor is None:
+            self._anchor = now + self._delay - media_time
+            return self._anchor + media_time
+
+        deadline = self._anchor + media_time
+        lateness = now - deadline
+        drifted = abs(lateness) > self.config.max_drift
+        # Live frames are never skipped (they are the newest there is); a
+        # late one means the source stalled, so start a fresh buffer instead
+        underrun = self.live and lateness > self.config.late_threshold
+        if drifted or underrun:
+            self._anchor = now + self._delay - media_time
+            self.reanchors += 1
+            deadline = self._anchor + media_time
+        return deadline
+
+    def is_late(self, deadline: float, now: float | None = None) -> bool:
+        """True if a frame due at deadline should be skipped."""
+        now = time.perf_counter() if now is None else now
+        return now - deadline > self.config.late_threshold
@@ -0,0 +1,158 @@
+"""
+Qt adapter for sources decoded in worker processes (core.process_pool).
+
+ProcessEngine offers the subset of AVEngine that VideoGrid uses, so a cell
+can decode in its own process instead of on a thread of the GUI process.
+"""
+from PySide6.QtCore import QObject, QRectF, QSize, Signal, Slot
+from PySide6.QtGui import QImage
+
+from .decode_modes import DEFAULT_DECODE_MODE, choose_decode_mode, get_decode_mode
+from .frame_mailbox import FrameMailbox
+from .presentation import PacingConfig
+from .process_pool import ProcessDecodePool
+from .qimage_convert import PIXEL_FORMATS, crop_region
+from .reconnect import BackoffPolicy
+from .sources import MAIN, StreamSelector, StreamSource
+from .stream_profiles import DEFAULT_PROFILE
+
+
+class ProcessEngine(QObject):
+    """
+    Decodes one source in a ProcessDecodePool worker. Frames arrive as
+    shared-memory buffers already in QImage.Format_RGB32's byte order (see
+    core.qimage_convert.PIXEL_FORMATS) and are copied once into a QImage,
+    which lands in ``frame_mailbox``.
+    """
+    # QImage format of the frames; the worker converts to its PIXEL_FORMATS layout
+    IMAGE_FORMAT = QImage.Format_RGB32
+    error_signal = Signal(str, str)
+    status_signal = Signal(str)
+    stats_signal = Signal(dict)
+    stopped_signal = Signal()
+
+    def __init__(self, pool: ProcessDecodePool, profile: str = DEFAULT_PROFILE,
+                 reconnect_policy: BackoffPolicy | None = BackoffPolicy(),
+                 pacing: PacingConfig | None = None, auto_decode_mode: bool = False):
+        super().__init__()
+        self.pool = pool
+        self.profile = profile
+        self.reconnect_policy = reconnect_policy
+        self.pacing = pacing
+        self.auto_decode_mode = auto_decode_mode
+        self.frame_mailbox = FrameMailbox()
+        self._source = None
+        self._output_size = None
+        self._display_size = None
+        self._display_visible = True
+        self._decode_mode = DEFAULT_DECODE_MODE
+        self._crop = None
+
+    @property
+    def source(self):
+        """The current core.process_pool.ProcessSource, or None."""
+        return self._source
+
+    @property
+    def decode_mode(self) -> str:
+        return self._decode_mode
+
+    def start_stream(self, url: str | StreamSource):
+        """
+        Starts decoding url in a new worker process; never blocks. For a
+        "MAIN|SUB" source the stream is chosen by the display size once,
+        at start (AVEngine also switches while playing).
+        """
+        source = url if isinstance(url, StreamSource) else StreamSource.parse(url)
+        size = self._display_size
+        variant = StreamSelector().choose(size.width(), size.height()) if size is not None else MAIN
+        self.stop()
+        self.frame_mailbox.reset()
+        self._source = self.pool.open(
+            source.url(variant), profile=self.profile, reconnect_policy=self.reconnect_policy,
+            pacing=self.pacing, output_size=self._output_size,
+            pix_fmt=PIXEL_FORMATS[self.IMAGE_FORMAT],
+            on_frame=self._on_frame, on_status=self.status_signal.emit,
+            on_error=self.error_signal.emit, on_stats=self._on_stats,
+            on_stopped=self.stopped_signal.emit,
+        )
+        if self._decode_mode != DEFAULT_DECODE_MODE:
+            self._source.set_decode_mode(self._decode_mode)
+        if self._crop is not None:
+            self._source.set_crop(self._crop)
+
+    def stop(self):
+        """Returns at once; stopped_signal follows when the worker has exited."""
+        if self._source is not None:
+            self._source.stop()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits for the worker process to exit; False on timeout."""
+        return self._source is None or self._source.wait(timeout)
+
+    def set_output_size(self, width: int, height: int):
+        """See DecodeEngine.set_output_size."""
+        self._output_size = (width, height) if width > 0 and height > 0 else None
+        if self._source is not None:
+            self._source.set_output_size(width, height)
+
+    @Slot(QSize)
+    def fit_to_display(self, size: QSize):
+        """Slot for VideoDisplay.resized: decode at the display's size."""
+        self.set_output_size(size.width(), size.height())
+        self._display_size = size
+        self._update_decode_mode()
+
+    @Slot(bool)
+    def set_display_visible(self, visible: bool):
+        """Slot for VideoDisplay.on_screen_changed."""
+        self._display_visible = visible
+        self._update_decode_mode()
+
+    @Slot(QRectF)
+    def set_region(self, region: QRectF):
+        """Slot for VideoDisplay.region_changed (see AVEngine.set_region)."""
+        self._crop = crop_region(region)
+        if self._source is not None:
+            self._source.set_crop(self._crop)
+
+    @Slot(str)
+    def set_decode_mode(self, name: str):
+        """Fixes the decode mode (see DecodeEngine.set_decode_mode); turns auto_decode_mode off."""
+        self.auto_decode_mode = False
+        self._apply_decode_mode(name)
+
+    def stats(self) -> dict:
+        """The worker's stats plus the mailbox's display-side counters."""
+        stats = self._source.stats() if self._source is not None else {}
+        return self._with_mailbox(stats)
+
+    def _with_mailbox(self, stats: dict) -> dict:
+        stats["dropped_frames"] = self.frame_mailbox.dropped
+        stats["delivered_frames"] = self.frame_mailbox.delivered
+        stats["queue_depth"] = int(self.frame_mailbox.pending)
+        return stats
+
+    def _update_decode_mode(self):
+        if not self.auto_decode_mode:
+            return
+        size = self._display_size
+        if size is None:
+            if self._display_visible:
+                return
+            size = QSize()
+        self._apply_decode_mode(choose_decode_mode(self._display_visible, size.width(), size.height()))
+
+    def _apply_decode_mode(self, name: str):
+        self._decode_mode = get_decode_mode(name).name
+        if self._source is not None:
+            self._source.set_decode_mode(name)
+
+    def _on_frame(self, image, info):
+        # The ring slot is reused once this returns: copy into the QImage
+        qimage = QImage(image.data, image.width, image.height, image.bytes_per_line,
+                        self.IMAGE_FORMAT).copy()
+        self.frame_mailbox.put(qimage)
+
+    def _on_stats(self, stats: dict):
+        self.stats_signal.emit(self._with_mailbox(stats))
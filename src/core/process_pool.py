@@ -0,0 +1,516 @@
+"""
+Decoding in separate processes, with frames passed through shared memory.
+
+PyAV releases the GIL while decoding, but conversion bookkeeping, frame
+delivery and the callbacks around them do not, so decode threads in one
+process stop scaling after a few cameras. ProcessDecodePool runs every
+source in its own worker process instead. A worker decodes and converts
+with a regular DecodeEngine and copies each converted frame into a slot of
+a FrameRing, a multiprocessing.shared_memory block owned by the parent.
+Only small tuples travel through the pipe: ("frame", slot, geometry,
+timestamps) one way, ("free", slot) back. A worker with no free slot drops
+the frame, so a slow consumer never builds up latency.
+
+Workers are started with the "spawn" method, which is safe next to Qt
+and other threads in the parent. A worker that dies without being asked
+to is restarted with backoff; the source's DecodeEngine handles ordinary
+reconnects inside the worker as before.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_ready
+from typing import NamedTuple
+
+import numpy as np
+
+from .frame_convert import PACKED_FORMATS, ConvertedFrame
+from .presentation import PacingConfig
+from .reconnect import BackoffPolicy
+from .stream_profiles import DEFAULT_PROFILE
+
+logger = logging.getLogger("RTSP")
+
+# One 1080p BGRA frame, with room for FFmpeg's row padding
+DEFAULT_SLOT_BYTES = 1920 * 1088 * 4
+
+
+class FrameRing:
+    """
+    ``slots`` fixed-size frame buffers in one shared memory block. The
+    creating process (name None) owns the block and unlinks it on close();
+    other processes attach by name.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, name: str | None = None):
+        if slots < 1 or slot_bytes < 1:
+            raise ValueError("slots and slot_bytes must be positive")
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                               size=slots * slot_bytes if self.owner else 0)
+        self._buffer = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=self._shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def write(self, slot: int, data: np.ndarray):
+        """Copies a C-contiguous frame buffer into slot."""
+        if data.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {data.nbytes} bytes exceeds the {self.slot_bytes}-byte slot")
+        self._buffer[slot, :data.nbytes] = data.reshape(-1)
+
+    def view(self, slot: int, height: int, bytes_per_line: int) -> np.ndarray:
+        """The frame in slot as a (height, bytes_per_line) array, without copying."""
+        return self._buffer[slot, :height * bytes_per_line].reshape(height, bytes_per_line)
+
+    def close(self):
+        """Detaches; the owner also frees the block. Views must be gone by then."""
+        self._buffer = None
+        try:
+            self._shm.close()
+        except BufferError:
+            logger.warning("Frame ring %s still has views; leaving it mapped", self.name)
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class FrameInfo(NamedTuple):
+    """Timestamps of a frame decoded in a worker (stands in for av.VideoFrame)."""
+
+    pts: int | None
+    time: float | None
+
+
+@dataclass(frozen=True)
+class WorkerOptions:
+    """Everything a worker process needs besides the URL; must pickle."""
+
+    profile: str = DEFAULT_PROFILE
+    reconnect_policy: BackoffPolicy | None = BackoffPolicy()
+    pacing: PacingConfig | None = None
+    pix_fmt: str = "bgra"
+    output_size: tuple | None = None
+    ring_slots: int = 3
+    slot_bytes: int = DEFAULT_SLOT_BYTES
+
+
+def slot_box(width: int, height: int, bytes_per_pixel: int, slot_bytes: int) -> tuple:
+    """Largest box of the source's aspect ratio whose frames fit a slot."""
+    # Leaves room for row padding
+    scale = math.sqrt(slot_bytes * 0.9 / (width * height * bytes_per_pixel))
+    return max(2, int(width * scale)), max(2, int(height * scale))
+
+
+def _worker_main(url: str, options: WorkerOptions, ring_name: str, conn):
+    """Entry point of a worker process: decodes url into the ring until stopped."""
+    # Imported here, so only workers (not the GUI process) load them for this
+    from .decode_engine import DecodeEngine
+    from .frame_convert import FrameConverter
+
+    ring = FrameRing(options.ring_slots, options.slot_bytes, name=ring_name)
+    free = queue.SimpleQueue()
+    for slot in range(options.ring_slots):
+        free.put(slot)
+    send_lock = threading.Lock()
+    dropped = [0]
+
+    def send(*message):
+        with send_lock:
+            conn.send(message)
+
+    converter = FrameConverter(pool_slots=2, pix_fmt=options.pix_fmt)
+    engine = DecodeEngine(
+        profile=options.profile,
+        reconnect_policy=options.reconnect_policy,
+        pacing=options.pacing,
+        converter=converter,
+        on_status=lambda status: send("status", status),
+        on_error=lambda message, detail: send("error", message, detail),
+        on_stats=lambda stats: send("stats", dict(stats, ring_dropped_frames=dropped[0])),
+    )
+    # The parent's requested box, and the box that fits a ring slot
+    requested, capacity = [options.output_size], [None]
+
+    def apply_size():
+        boxes = [box for box in (requested[0], capacity[0]) if box is not None]
+        converter.output_size = (min(b[0] for b in boxes), min(b[1] for b in boxes)) if boxes else None
+
+    def control():
+        try:
+            while True:
+                message = conn.recv()
+                kind = message[0]
+                if kind == "free":
+                    free.put(message[1])
+                elif kind == "size":
+                    requested[0] = message[1]
+                    apply_size()
+                elif kind == "mode":
+                    engine.set_decode_mode(message[1])
+                elif kind == "crop":
+                    engine.set_crop(message[1])
+                elif kind == "stop":
+                    engine.stop()
+                    return
+        except (EOFError, OSError):
+            # Parent gone
+            engine.stop()
+
+    def next_slot(live: bool):
+        """A free slot; live sources drop the frame when none is free, files wait."""
+        if live:
+            try:
+                return free.get_nowait()
+            except queue.Empty:
+                return None
+        while engine.is_running:
+            try:
+                return free.get(timeout=engine.WAIT_SLICE)
+            except queue.Empty:
+                pass
+        return None
+
+    apply_size()
+    threading.Thread(target=control, name="WorkerControl", daemon=True).start()
+    # As in DecodeEngine: network sources and devices are live
+    live = "://" in url or url.isdigit() or url.startswith("video=")
+    try:
+        bytes_per_pixel = PACKED_FORMATS[options.pix_fmt]
+        for image, frame in engine.frames(url):
+            if image.data.nbytes > options.slot_bytes:
+                capacity[0] = slot_box(frame.width, frame.height, bytes_per_pixel, options.slot_bytes)
+                apply_size()
+                dropped[0] += 1
+                continue
+            slot = next_slot(live)
+            if slot is None:
+                # The parent is still busy with every slot
+                dropped[0] += 1
+                continue
+            ring.write(slot, image.data)
+            send("frame", slot, image.width, image.height, image.bytes_per_line,
+                 frame.pts, frame.time)
+        send("ended")
+    except (EOFError, OSError, BrokenPipeError):
+        pass
+    finally:
+        ring.close()
+
+
+class ProcessSource:
+    """
+    Handle for one source decoded by a ProcessDecodePool. Callbacks run on
+    the pool's supervisor thread, like DecodeEngine's:
+
+    - on_frame(image, info): image is a ConvertedFrame viewing the shared
+      ring slot, info a FrameInfo. The slot is reused once the callback
+      returns, so copy (or paint) the pixels before returning.
+    - on_status(status), on_error(user_message, technical_detail),
+      on_stats(stats_dict), on_stopped()
+    """
+
+    def __init__(self, pool, url: str, options: WorkerOptions,
+                 on_frame=None, on_status=None, on_error=None, on_stats=None, on_stopped=None):
+        self.url = url
+        self._pool = pool
+        self._options = options
+        self.on_frame = on_frame or _ignore
+        self.on_status = on_status or _ignore
+        self.on_error = on_error or _ignore
+        self.on_stats = on_stats or _ignore
+        self.on_stopped = on_stopped or _ignore
+        self._ring = FrameRing(options.ring_slots, options.slot_bytes)
+        self._send_lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._output_size = options.output_size
+        self._decode_mode = None
+        self._crop = None
+        self._stopping = False
+        self._stop_deadline = None
+        self._restart_at = None
+        self._attempt = 0
+        self._done = threading.Event()
+        self._frames = 0
+        self._worker_stats = {}
+        self.restarts = 0
+
+    @property
+    def pid(self) -> int | None:
+        process = self._process
+        return process.pid if process is not None else None
+
+    @property
+    def is_running(self) -> bool:
+        return not self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits until the worker has exited for good; False on timeout."""
+        return self._done.wait(timeout)
+
+    def set_output_size(self, width: int, height: int):
+        """See DecodeEngine.set_output_size; applied by the worker."""
+        self._output_size = (width, height) if width > 0 and height > 0 else None
+        self._send("size", self._output_size)
+
+    def set_decode_mode(self, name: str):
+        """See DecodeEngine.set_decode_mode; applied by the worker."""
+        self._decode_mode = name
+        self._send("mode", name)
+
+    def set_crop(self, region: tuple | None):
+        """See DecodeEngine.set_crop; applied by the worker."""
+        self._crop = tuple(region) if region is not None else None
+        self._send("crop", self._crop)
+
+    def stop(self):
+        """Asks the worker to finish and returns at once; on_stopped follows."""
+        if self._stopping:
+            return
+        self._stopping = True
+        self._restart_at = None
+        self._stop_deadline = time.monotonic() + self._pool.STOP_TIMEOUT
+        self._send("stop")
+
+    def stats(self) -> dict:
+        """The worker's latest DecodeEngine stats plus process counters."""
+        stats = dict(self._worker_stats)
+        stats["process_frames"] = self._frames
+        stats["process_restarts"] = self.restarts
+        stats["pid"] = self.pid
+        return stats
+
+    def _send(self, *message):
+        conn = self._conn
+        if conn is None:
+            return
+        try:
+            with self._send_lock:
+                conn.send(message)
+        except (OSError, ValueError):
+            # Worker already gone; the supervisor notices
+            pass
+
+    def _spawn(self, context):
+        parent_conn, child_conn = context.Pipe()
+        options = self._options
+        if self._output_size != options.output_size:
+            options = replace(options, output_size=self._output_size)
+        process = context.Process(
+            target=_worker_main, args=(self.url, options, self._ring.name, child_conn),
+            name="DecodeProcess", daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._conn, self._process = parent_conn, process
+        if self._decode_mode is not None:
+            self._send("mode", self._decode_mode)
+        if self._crop is not None:
+            self._send("crop", self._crop)
+
+    def _drain(self):
+        """Handles every message the worker has sent so far."""
+        conn = self._conn
+        try:
+            while conn is not None and conn.poll():
+                self._handle(conn.recv())
+        except (EOFError, OSError):
+            pass
+
+    def _handle(self, message):
+        kind = message[0]
+        if kind == "frame":
+            _, slot, width, height, bytes_per_line, pts, media_time = message
+            self._frames += 1
+            self._attempt = 0
+            image = ConvertedFrame(self._ring.view(slot, height, bytes_per_line),
+                                   width, height, bytes_per_line, self._options.pix_fmt)
+            try:
+                self.on_frame(image, FrameInfo(pts, media_time))
+            finally:
+                del image
+                self._send("free", slot)
+        elif kind == "status":
+            self.on_status(message[1])
+        elif kind == "error":
+            self.on_error(message[1], message[2])
+        elif kind == "stats":
+            self._worker_stats = message[1]
+            self.on_stats(self.stats())
+        elif kind == "ended":
+            self._stopping = True
+
+    def _exited(self, now: float):
+        """The worker process ended: finish, or restart it after a crash."""
+        self._drain()
+        process = self._process
+        process.join(0)
+        exitcode = process.exitcode
+        self._conn.close()
+        self._conn = self._process = None
+        if self._stopping or exitcode == 0:
+            self._finish()
+            return
+        policy = self._pool.restart_policy
+        logger.warning("Decode process for %s exited with code %s", self.url, exitcode)
+        if policy is None or self._attempt >= policy.max_attempts:
+            self.on_error("Decoder process failed",
+                          f"Worker exited with code {exitcode}; gave up after {self._attempt} restarts.")
+            self._finish()
+            return
+        self._restart_at = now + policy.delay(self._attempt)
+        self._attempt += 1
+        self.on_status("Restarting decoder")
+
+    def _tick(self, now: float, context):
+        """Restarts a crashed worker when due; kills one that ignores stop()."""
+        if self._restart_at is not None and now >= self._restart_at:
+            self._restart_at = None
+            self.restarts += 1
+            self._spawn(context)
+        elif self._process is None and self._stopping and not self._done.is_set():
+            # Stopped while waiting to restart
+            self._finish()
+        elif self._stop_deadline is not None and now >= self._stop_deadline and self._process is not None:
+            logger.warning("Decode process for %s did not stop; terminating it", self.url)
+            self._process.kill()
+            self._stop_deadline = None
+
+    def _finish(self):
+        self._ring.close()
+        self._done.set()
+        self._pool._forget(self)
+        self.on_status("Ready")
+        self.on_stopped()
+
+
+class ProcessDecodePool:
+    """
+    Runs up to max_workers sources, each in its own worker process, and
+    supervises them from one thread.
+
+    Args:
+        max_workers: Concurrent sources; defaults to the CPU count.
+        ring_slots: Shared frame slots per source (frames in flight).
+        slot_bytes: Size of each slot; larger frames are scaled down to fit.
+        restart_policy: Backoff between restarts of a crashed worker; None
+            never restarts.
+    """
+
+    # Seconds a worker gets to honor stop() before it is killed
+    STOP_TIMEOUT = 5.0
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, max_workers: int | None = None, ring_slots: int = 3,
+                 slot_bytes: int = DEFAULT_SLOT_BYTES,
+                 restart_policy: BackoffPolicy | None = BackoffPolicy(initial_delay=0.2, max_attempts=5)):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.ring_slots = ring_slots
+        self.slot_bytes = slot_bytes
+        self.restart_policy = restart_policy
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._sources = []
+        self._thread = None
+        self._closed = False
+
+    @property
+    def sources(self) -> list:
+        with self._lock:
+            return list(self._sources)
+
+    def open(self, url: str, profile: str = DEFAULT_PROFILE,
+             reconnect_policy: BackoffPolicy | None = BackoffPolicy(),
+             pacing: PacingConfig | None = None, output_size: tuple | None = None,
+             pix_fmt: str = "bgra", **callbacks) -> ProcessSource:
+        """
+        Starts decoding url in a new worker process, which converts frames to
+        the packed pix_fmt. callbacks are those of ProcessSource (on_frame,
+        on_status, ...). Sources already told to
+        stop do not count against max_workers, so a stream can be restarted
+        in a full pool while its old worker is still exiting.
+
+        Raises:
+            RuntimeError: The pool is closed or already runs max_workers sources.
+        """
+        options = WorkerOptions(profile=profile, reconnect_policy=reconnect_policy, pacing=pacing,
+                                pix_fmt=pix_fmt, output_size=output_size, ring_slots=self.ring_slots,
+                                slot_bytes=self.slot_bytes)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Process pool is closed")
+            if sum(not source._stopping for source in self._sources) >= self.max_workers:
+                raise RuntimeError(f"Process pool already runs {self.max_workers} sources")
+            source = ProcessSource(self, url, options, **callbacks)
+            source._spawn(self._context)
+            self._sources.append(source)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._supervise, name="ProcessPool", daemon=True)
+                self._thread.start()
+        return source
+
+    def close(self, timeout: float | None = None) -> bool:
+        """Stops every source and waits for the workers; False on timeout."""
+        with self._lock:
+            self._closed = True
+            sources = list(self._sources)
+        for source in sources:
+            source.stop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for source in sources:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not source.wait(remaining):
+                return False
+        return True
+
+    def _forget(self, source):
+        with self._lock:
+            if source in self._sources:
+                self._sources.remove(source)
+
+    def _supervise(self):
+        while True:
+            with self._lock:
+                sources = list(self._sources)
+                if self._closed and not sources:
+                    self._thread = None
+                    return
+            conns, sentinels = {}, {}
+            for source in sources:
+                if source._process is not None:
+                    conns[source._conn] = source
+                    sentinels[source._process.sentinel] = source
+            if conns:
+                ready = set(wait_ready(list(conns) + list(sentinels), timeout=self.POLL_INTERVAL))
+            else:
+                time.sleep(self.POLL_INTERVAL)
+                ready = set()
+            now = time.monotonic()
+            # Messages first: a worker's last frames arrive before its exit
+            for conn, source in conns.items():
+                if conn in ready:
+                    source._drain()
+            for sentinel, source in sentinels.items():
+                if sentinel in ready:
+                    source._exited(now)
+            for source in sources:
+                try:
+                    source._tick(now, self._context)
+                except Exception:
+                    logger.exception("Restarting the decode process for %s failed", source.url)
+
+
+def _ignore(*args):
+    pass
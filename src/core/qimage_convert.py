@@ -0,0 +1,70 @@
+"""
+Qt side of frame conversion: wraps FrameConverter buffers in QImages laid out
+the way Qt paints fastest.
+"""
+import sys
+
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QImage
+
+from .frame_convert import FrameConverter
+
+# Qt's 32-bit formats are native-endian 0xAARRGGBB words
+_QT32_PIX_FMT = "bgra" if sys.byteorder == "little" else "argb"
+
+# QImage format -> FFmpeg pixel format with the same memory layout
+PIXEL_FORMATS = {
+    QImage.Format_RGB888: "rgb24",
+    QImage.Format_RGB32: _QT32_PIX_FMT,
+    # Decoded video is opaque, so premultiplied and straight alpha coincide
+    QImage.Format_ARGB32_Premultiplied: _QT32_PIX_FMT,
+}
+
+
+def crop_region(region: QRectF) -> tuple | None:
+    """
+    A VideoDisplay region (fractions of the frame) as a FrameConverter.crop
+    tuple; None when it shows the whole frame.
+    """
+    if region.isEmpty() or region == QRectF(0.0, 0.0, 1.0, 1.0):
+        return None
+    return region.x(), region.y(), region.width(), region.height()
+
+
+class QImageConverter(FrameConverter):
+    """
+    FrameConverter producing QImages.
+
+    ``output_format`` is one of the QImage formats in PIXEL_FORMATS.
+    """
+
+    def __init__(self, pool_slots: int = 4, output_format=QImage.Format_RGB888):
+        super().__init__(pool_slots)
+        self._formats = None
+        self.output_format = output_format
+
+    @property
+    def output_format(self):
+        return self._formats[0]
+
+    @output_format.setter
+    def output_format(self, q_format):
+        if q_format not in PIXEL_FORMATS:
+            raise ValueError(f"Unsupported output format: {q_format}")
+        # One tuple, so the decode thread never sees a mismatched pair
+        self._formats = (q_format, PIXEL_FORMATS[q_format])
+
+    @property
+    def pix_fmt(self) -> str:
+        return self._formats[1]
+
+    def to_qimage(self, frame) -> QImage:
+        """
+        Converts a decoded frame to a QImage in ``output_format``, scaled to
+        fit ``output_size``. The image references a pooled buffer (see
+        FrameConverter.convert).
+        """
+        q_format, pix_fmt = self._formats
+        converted = self.convert(frame, pix_fmt)
+        return QImage(converted.data.data, converted.width, converted.height,
+                      converted.bytes_per_line, q_format)
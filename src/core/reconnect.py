@@ -0,0 +1,84 @@
+"""
+Reconnection helpers for AVEngine: backoff policy and the cached parameters
+of the last successful session, used to resume a dropped stream quickly.
+"""
+import random
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    """
+    Jittered exponential backoff.
+
+    The n-th retry (0-based) waits initial_delay * factor**n seconds, capped at
+    max_delay, then scaled by a random factor in [1 - jitter, 1 + jitter] so
+    many cameras dropping together do not reconnect in lockstep.
+    """
+
+    initial_delay: float = 0.5
+    factor: float = 2.0
+    max_delay: float = 10.0
+    jitter: float = 0.3
+    max_attempts: int = 8
+
+    def delay(self, attempt: int, rng: random.Random | None = None) -> float:
+        base = min(self.max_delay, self.initial_delay * (self.factor ** attempt))
+        spread = (rng or random).uniform(-self.jitter, self.jitter)
+        return max(0.0, base * (1.0 + spread))
+
+
+# Probing limits used when resuming a source whose parameters are known
+RESUME_PROBE_OPTIONS = {
+    "probesize": "32768",
+    "analyzeduration": "0",
+}
+
+
+@dataclass
+class SessionParams:
+    """
+    Stream parameters captured from the last session that delivered frames.
+
+    On resume the demuxer is opened with minimal probing, and the cached
+    codec extradata (SPS/PPS for H.264/H.265) is handed to the decoder when
+    the short probe did not find it, so decoding starts at the next keyframe.
+    PyAV does not expose the RTSP SDP itself, so the DESCRIBE round trip is
+    still made.
+    """
+
+    codec_name: str
+    width: int
+    height: int
+    pix_fmt: str | None
+    extradata: bytes | None
+    time_base: object = None
+    average_rate: object = None
+
+    @classmethod
+    def from_stream(cls, stream) -> "SessionParams":
+        ctx = stream.codec_context
+        return cls(
+            codec_name=ctx.name,
+            width=ctx.width,
+            height=ctx.height,
+            pix_fmt=ctx.pix_fmt,
+            extradata=ctx.extradata,
+            time_base=stream.time_base,
+            average_rate=stream.average_rate,
+        )
+
+    def resume_options(self, options: dict) -> dict:
+        """Returns a copy of av.open options with probing cut to a minimum."""
+        resumed = dict(options)
+        resumed.update(RESUME_PROBE_OPTIONS)
+        return resumed
+
+    def matches(self, stream) -> bool:
+        return stream.codec_context.name == self.codec_name
+
+    def apply(self, stream):
+        """Fills in what a short probe may have missed."""
+        ctx = stream.codec_context
+        if not ctx.extradata and self.extradata:
+            ctx.extradata = self.extradata
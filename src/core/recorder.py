@@ -0,0 +1,226 @@
+"""
+Stream recording by packet remux (stream copy, no decode or encode).
+
+AVEngine tees every demuxed packet into a Recorder. The Recorder only
+queues it; a background writer thread muxes packets into MP4/MKV segments
+that rotate by duration or size, always on a keyframe. A PreEventBuffer
+keeps the packets since the last keyframe, so a recording started on demand
+begins with a complete GOP.
+"""
+import collections
+import io
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import av
+
+from .pipeline import END, PacketQueue
+
+logger = logging.getLogger("RTSP")
+
+# Writer thread control items
+_STOP = object()
+
+
+class _Source:
+    """Marks a new input stream (first connection or reconnect)."""
+
+    def __init__(self, holder, template):
+        self.holder = holder
+        self.template = template
+
+
+@dataclass(frozen=True)
+class RecordingConfig:
+    """
+    Where and how to record.
+
+    Args:
+        directory: Output folder, created if missing.
+        prefix: File name prefix; files are <prefix>_<YYYYmmdd-HHMMSS>_<n>.<container>.
+        container: "mp4" or "mkv".
+        segment_seconds: Rotate after this much media time (None: no limit).
+        segment_bytes: Rotate after this many bytes (None: no limit).
+        queue_size: Packets buffered for the writer before dropping.
+    """
+
+    directory: str | Path = "recordings"
+    prefix: str = "recording"
+    container: str = "mp4"
+    segment_seconds: float | None = 300.0
+    segment_bytes: int | None = None
+    queue_size: int = 1024
+
+    def __post_init__(self):
+        if self.container not in ("mp4", "mkv"):
+            raise ValueError(f"Unsupported recording container '{self.container}'. Use mp4 or mkv")
+
+
+class PreEventBuffer:
+    """Packets back to (and including) the most recent keyframe."""
+
+    def __init__(self, max_packets: int = 600):
+        self._packets = collections.deque(maxlen=max_packets)
+
+    def add(self, packet):
+        if packet.is_keyframe:
+            self._packets.clear()
+        self._packets.append(packet)
+
+    def packets(self) -> list:
+        return list(self._packets)
+
+    def clear(self):
+        self._packets.clear()
+
+    def __len__(self):
+        return len(self._packets)
+
+
+class Recorder:
+    """
+    Remuxes queued packets into rotating segment files on a writer thread.
+
+    write() never blocks: when the disk falls behind and the queue fills,
+    non-reference packets are dropped first, otherwise the writer resumes at
+    the next keyframe (see PacketQueue).
+    """
+
+    def __init__(self, config: RecordingConfig = RecordingConfig()):
+        self.config = config
+        self.segments = []
+        self.error = None
+        self._queue = PacketQueue(config.queue_size)
+        self._thread = threading.Thread(target=self._run, name="Recorder", daemon=True)
+        # Writer thread state
+        self._template = None
+        self._holder = None
+        self._output = None
+        self._out_stream = None
+        self._offset = None
+        self._segment_start = None
+        self._segment_bytes = 0
+
+    @property
+    def dropped_packets(self) -> int:
+        return self._queue.dropped
+
+    @property
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self):
+        Path(self.config.directory).mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+
+    def set_source(self, stream):
+        """
+        Starts a new segment for stream. Must be called while the input
+        container is open: the codec parameters are copied right away.
+        """
+        # Holding the parameters in an in-memory container decouples the
+        # writer from the lifetime of the input container
+        holder = av.open(io.BytesIO(), "w", format="matroska")
+        self._queue.put_control(_Source(holder, holder.add_stream_from_template(stream)))
+
+    def write(self, packet):
+        """Queues a demuxed packet; called from the demux thread."""
+        self._queue.put(packet)
+
+    def finish(self):
+        """Asks the writer to flush queued packets and close, without waiting."""
+        self._queue.put_control(_STOP)
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """Flushes queued packets and closes the segment. False on timeout."""
+        self.finish()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        if self._thread.is_alive():
+            self._queue.close()
+            return False
+        return True
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP or item is END:
+                    break
+                if isinstance(item, _Source):
+                    self._close_segment()
+                    self._close_holder()
+                    self._holder, self._template = item.holder, item.template
+                    continue
+                self._write(item)
+        except Exception as e:
+            self.error = e
+            logger.exception("Recording failed")
+        finally:
+            self._close_segment()
+            self._close_holder()
+
+    def _close_holder(self):
+        """Closes the in-memory container behind the current template."""
+        if self._holder is not None:
+            self._holder.close()
+            self._holder = self._template = None
+
+    def _write(self, packet):
+        if self._template is None or not packet.size:
+            return
+        # A segment has to start on a keyframe to be playable
+        if self._output is None:
+            if not packet.is_keyframe:
+                return
+            self._open_segment(packet)
+        elif packet.is_keyframe and self._should_rotate(packet):
+            self._open_segment(packet)
+
+        # Copy instead of retagging the demuxed packet, which the decoder
+        # may still be reading on another thread
+        out = av.Packet(bytes(packet))
+        if packet.pts is not None:
+            out.pts = packet.pts - self._offset
+        if packet.dts is not None:
+            out.dts = packet.dts - self._offset
+        out.time_base = packet.time_base
+        out.duration = packet.duration
+        out.is_keyframe = packet.is_keyframe
+        out.stream = self._out_stream
+        self._output.mux(out)
+        self._segment_bytes += packet.size
+
+    def _should_rotate(self, packet) -> bool:
+        config = self.config
+        if config.segment_bytes is not None and self._segment_bytes >= config.segment_bytes:
+            return True
+        if config.segment_seconds is not None and packet.pts is not None:
+            elapsed = float((packet.pts - self._segment_start) * packet.time_base)
+            return elapsed >= config.segment_seconds
+        return False
+
+    def _open_segment(self, packet):
+        self._close_segment()
+        config = self.config
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = Path(config.directory) / f"{config.prefix}_{stamp}_{len(self.segments):03d}.{config.container}"
+        self._output = av.open(str(path), "w")
+        self._out_stream = self._output.add_stream_from_template(self._template)
+        # Each segment starts at timestamp zero
+        self._offset = packet.dts if packet.dts is not None else (packet.pts or 0)
+        self._segment_start = packet.pts if packet.pts is not None else self._offset
+        self._segment_bytes = 0
+        self.segments.append(path)
+        logger.info("Recording to %s", path)
+
+    def _close_segment(self):
+        if self._output is not None:
+            output, self._output = self._output, None
+            try:
+                output.close()
+            except Exception:
+                logger.exception("Could not finalize %s", self.segments[-1])
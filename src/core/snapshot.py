@@ -0,0 +1,67 @@
+"""
+Full-resolution still capture.
+
+The engine only keeps a reference to the newest decoded frame, which costs
+nothing per frame. A snapshot takes that reference and converts and encodes
+it on a worker thread, so a burst of captures never holds up decoding.
+"""
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from PySide6.QtGui import QImage
+
+from .qimage_convert import QImageConverter
+
+# Suffix -> Qt image writer format
+SNAPSHOT_FORMATS = {
+    ".png": "PNG",
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+}
+
+
+def snapshot_path(directory, prefix: str = "snapshot", suffix: str = ".png") -> Path:
+    """A unique, time-stamped file name in directory (millisecond resolution)."""
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+    return Path(directory) / f"{prefix}_{stamp}-{int(now * 1000) % 1000:03d}{suffix}"
+
+
+class SnapshotWriter:
+    """Encodes decoded frames to PNG/JPEG files on a single worker thread."""
+
+    def __init__(self):
+        self._executor = None
+        # One worker, so a single pooled buffer is never shared
+        self._converter = QImageConverter(pool_slots=1, output_format=QImage.Format_RGB888)
+
+    def capture(self, frame, path, quality: int = -1, on_saved=None) -> Future:
+        """
+        Queues frame for encoding to path. The format follows the suffix.
+        The returned Future resolves to the written Path; on_saved(path) is
+        called on the worker thread before that.
+        """
+        path = Path(path)
+        fmt = SNAPSHOT_FORMATS.get(path.suffix.lower())
+        if fmt is None:
+            raise ValueError(
+                f"Unsupported snapshot format '{path.suffix}'. Use one of: {', '.join(SNAPSHOT_FORMATS)}"
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Snapshot")
+        return self._executor.submit(self._encode, frame, path, fmt, quality, on_saved)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _encode(self, frame, path: Path, fmt: str, quality: int, on_saved) -> Path:
+        image = self._converter.to_qimage(frame)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not image.save(str(path), fmt, quality):
+            raise OSError(f"Could not write snapshot {path}")
+        if on_saved is not None:
+            on_saved(path)
+        return path
@@ -0,0 +1,397 @@
+"""
+Soak testing: memory and latency stability of the decode path over hours.
+
+SoakHarness plays local sources through an AVEngine for a set duration. A
+file that ends is restarted, so a short clip behaves like a camera that
+never stops. Every cycle the engine is stopped and started on the next
+source, and the display size alternates between a large and a small box,
+which changes the output size and switches MAIN|SUB sources between their
+streams. A consumer takes frames from the mailbox at display rate, as the
+UI's refresh timer does.
+
+Every sample interval the harness records RSS, the process thread and
+file descriptor counts, the Python heap traced by tracemalloc, the engine's
+frame latency and the rate frames reach the consumer.
+analyze() ignores the warm-up, fits a least-squares line through each
+series and compares the slopes and the latency drift with SoakThresholds.
+The report is plain JSON, so runs of different versions can be compared.
+"""
+import json
+import logging
+import operator
+import os
+import platform
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+
+from PySide6.QtCore import QSize, Qt
+
+from .presentation import PacingConfig
+from .stats import fd_count, rss_bytes, thread_count
+
+logger = logging.getLogger("RTSP")
+
+REPORT_VERSION = 2
+
+
+@dataclass(frozen=True)
+class SoakThresholds:
+    """
+    Limits a soak run must stay within; None disables a check.
+
+    Args:
+        rss_mb_per_hour: Growth of the resident set size.
+        heap_mb_per_hour: Growth of the Python heap traced by tracemalloc.
+        thread_growth: Threads the busiest late part of the run may have
+            over the busiest early part (sessions start and end threads).
+        fd_growth: The same for open file descriptors (sources, sockets).
+        latency_drift: Ratio of the late to the early median frame latency.
+        latency_drift_min_ms: Drift smaller than this many ms never fails,
+            so sub-millisecond noise cannot trip the ratio.
+        errors: Engine errors allowed over the run.
+        min_span: Seconds after the warm-up the growth rates need before
+            they are judged; over a shorter span the frame pools' sawtooth
+            outweighs any trend, so the rates are only reported.
+    """
+
+    rss_mb_per_hour: float | None = 50.0
+    heap_mb_per_hour: float | None = 10.0
+    thread_growth: int | None = 2
+    fd_growth: int | None = 4
+    latency_drift: float | None = 1.5
+    latency_drift_min_ms: float = 5.0
+    errors: int | None = 0
+    min_span: float = 600.0
+
+
+@dataclass(frozen=True)
+class SoakConfig:
+    """
+    Args:
+        duration: Seconds to run.
+        sample_interval: Seconds between resource samples.
+        cycle_seconds: Seconds until the engine is restarted on the next
+            source (None keeps the first source playing).
+        resize_seconds: Seconds between display size changes (None keeps
+            the first size).
+        display_sizes: Display boxes alternated every resize_seconds.
+        warmup: Seconds at the start left out of the analysis, while caches,
+            pools and the allocator settle.
+        display_fps: Rate the consumer takes frames from the mailbox.
+        tracemalloc: Trace Python allocations (heap series and top
+            allocators); costs some speed.
+        top_allocators: Source lines reported with the most heap growth.
+        thresholds: What makes the run fail.
+    """
+
+    duration: float = 3600.0
+    sample_interval: float = 1.0
+    cycle_seconds: float | None = 30.0
+    resize_seconds: float | None = 10.0
+    display_sizes: tuple = ((1280, 720), (320, 180))
+    warmup: float = 300.0
+    display_fps: float = 60.0
+    tracemalloc: bool = True
+    top_allocators: int = 10
+    thresholds: SoakThresholds = field(default_factory=SoakThresholds)
+
+    def __post_init__(self):
+        if self.duration <= 0 or self.sample_interval <= 0 or self.display_fps <= 0:
+            raise ValueError("duration, sample_interval and display_fps must be positive")
+        if not self.display_sizes:
+            raise ValueError("display_sizes needs at least one size")
+
+
+@dataclass(frozen=True)
+class SoakSample:
+    """Resource use at ``t`` seconds into the run."""
+
+    t: float
+    rss_mb: float | None
+    threads: int
+    python_threads: int
+    fds: int | None
+    heap_mb: float | None
+    latency_p50_ms: float | None
+    latency_max_ms: float | None
+    fps: float
+    frames: int
+    cycles: int
+    restarts: int
+
+
+def slope_per_hour(samples: list, key: str) -> float | None:
+    """Least-squares slope of a sample series in units per hour (None below 3 points)."""
+    points = [(s.t, getattr(s, key)) for s in samples if getattr(s, key) is not None]
+    if len(points) < 3:
+        return None
+    times = [t for t, _ in points]
+    values = [v for _, v in points]
+    if max(times) - min(times) <= 0:
+        return None
+    return statistics.linear_regression(times, values).slope * 3600.0
+
+
+def _thirds(samples: list, key: str) -> tuple:
+    values = [getattr(s, key) for s in samples if getattr(s, key) is not None]
+    third = len(values) // 3
+    if third < 1:
+        return None, None
+    return values[:third], values[-third:]
+
+
+def _check(value, limit, within) -> dict:
+    ok = None if value is None or limit is None else bool(within(value, limit))
+    return {"value": value, "limit": limit, "ok": ok}
+
+
+def analyze(samples: list, thresholds: SoakThresholds = SoakThresholds(),
+            warmup: float = 0.0) -> dict:
+    """
+    Checks the samples taken after warmup seconds against thresholds.
+
+    Returns a dict of checks, each {"value", "limit", "ok"}; a check without
+    enough samples or without a limit has ok None, and so have the growth
+    rates of a span shorter than thresholds.min_span.
+    """
+    settled = [s for s in samples if s.t >= warmup]
+    checks = {
+        "rss_mb_per_hour": _check(slope_per_hour(settled, "rss_mb"),
+                                  thresholds.rss_mb_per_hour, operator.le),
+        "heap_mb_per_hour": _check(slope_per_hour(settled, "heap_mb"),
+                                   thresholds.heap_mb_per_hour, operator.le),
+    }
+    span = settled[-1].t - settled[0].t if settled else 0.0
+    if span < thresholds.min_span:
+        for name in ("rss_mb_per_hour", "heap_mb_per_hour"):
+            checks[name]["ok"] = None
+
+    for key, name, limit in (("threads", "thread_growth", thresholds.thread_growth),
+                             ("fds", "fd_growth", thresholds.fd_growth)):
+        early, late = _thirds(settled, key)
+        growth = None if early is None else max(late) - max(early)
+        checks[name] = _check(growth, limit, operator.le)
+
+    early, late = _thirds(settled, "latency_p50_ms")
+    drift = None
+    if early is not None:
+        before, after = statistics.median(early), statistics.median(late)
+        if before > 0:
+            drift = after / before
+    checks["latency_drift"] = _check(
+        drift, thresholds.latency_drift,
+        lambda value, limit: value <= limit or after - before < thresholds.latency_drift_min_ms)
+    return checks
+
+
+def passed(checks: dict) -> bool:
+    """True unless a check failed (checks without data do not fail)."""
+    return all(c["ok"] is not False for c in checks.values())
+
+
+def _top_allocators(baseline, count: int) -> list:
+    ignored = (tracemalloc.__file__, "<frozen importlib._bootstrap>",
+               "<frozen importlib._bootstrap_external>", "<unknown>")
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, pattern) for pattern in ignored])
+    baseline = baseline.filter_traces([tracemalloc.Filter(False, pattern) for pattern in ignored])
+    top = []
+    for stat in snapshot.compare_to(baseline, "lineno")[:count]:
+        frame = stat.traceback[0]
+        top.append({
+            "location": f"{frame.filename}:{frame.lineno}",
+            "size_kb": stat.size / 1024.0,
+            "size_diff_kb": stat.size_diff / 1024.0,
+            "count_diff": stat.count_diff,
+        })
+    return top
+
+
+def _environment() -> dict:
+    import av
+    import PySide6
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pyav": av.__version__,
+        "ffmpeg": ".".join(str(part) for part in av.library_versions.get("libavcodec", ())),
+        "pyside6": PySide6.__version__,
+    }
+
+
+class SoakHarness:
+    """
+    Runs one AVEngine over sources for config.duration seconds and reports
+    resource use over time (see the module docstring).
+
+    engine_factory builds the engine; by default a paced AVEngine, so files
+    play at their frame rate like a live camera. Another factory must return
+    an AVEngine too (differently configured), or an object with the same
+    members the harness uses: error_signal, frame_mailbox, is_running,
+    fit_to_display(), start_stream(), stop(), wait(), latency_stats() and
+    stream_switches. on_sample is called with each SoakSample as it is taken
+    (progress output).
+    """
+
+    def __init__(self, sources: list, config: SoakConfig = SoakConfig(),
+                 engine_factory=None, on_sample=None):
+        if not sources:
+            raise ValueError("A soak run needs at least one source")
+        self.sources = [str(source) for source in sources]
+        self.config = config
+        self._engine_factory = engine_factory or self._default_engine
+        self._on_sample = on_sample
+        self._errors = []
+        self._errors_lock = threading.Lock()
+
+    @staticmethod
+    def _default_engine():
+        from .av_engine import AVEngine
+
+        return AVEngine(pacing=PacingConfig())
+
+    def _on_error(self, user_msg: str, technical: str):
+        with self._errors_lock:
+            self._errors.append(f"{user_msg} | {technical}")
+
+    def run(self) -> dict:
+        """Runs the soak test; returns the report (see write_report)."""
+        config = self.config
+        started_tracing = config.tracemalloc and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        engine = self._engine_factory()
+        engine.error_signal.connect(self._on_error, Qt.DirectConnection)
+        started = time.time()
+        try:
+            samples, totals, allocators = self._drive(engine)
+        finally:
+            engine.stop()
+            if not engine.wait(10.0):
+                logger.warning("Soak: engine did not stop within 10 s")
+            if started_tracing:
+                tracemalloc.stop()
+
+        checks = analyze(samples, config.thresholds, config.warmup)
+        with self._errors_lock:
+            errors = list(self._errors)
+        checks["errors"] = _check(len(errors), config.thresholds.errors, operator.le)
+        return {
+            "version": REPORT_VERSION,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(started)),
+            "environment": _environment(),
+            "config": asdict(config),
+            "sources": self.sources,
+            "passed": passed(checks),
+            "checks": checks,
+            "totals": totals,
+            "errors": errors[:20],
+            "top_allocators": allocators,
+            "samples": [asdict(sample) for sample in samples],
+        }
+
+    def _drive(self, engine):
+        config = self.config
+        tick = 1.0 / config.display_fps
+        start = time.monotonic()
+        end = start + config.duration
+        next_sample = start + config.sample_interval
+        next_cycle = start + config.cycle_seconds if config.cycle_seconds else None
+        next_resize = start + config.resize_seconds if config.resize_seconds else None
+        baseline = None
+        source_index = size_index = 0
+        cycles = restarts = frames = 0
+        frames_at_sample, last_sample = 0, start
+        samples = []
+
+        engine.fit_to_display(QSize(*config.display_sizes[0]))
+        engine.start_stream(self.sources[0])
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                break
+            if engine.frame_mailbox.take() is not None:
+                frames += 1
+            if next_cycle is not None and now >= next_cycle:
+                next_cycle += config.cycle_seconds
+                source_index = (source_index + 1) % len(self.sources)
+                cycles += 1
+                engine.stop()
+                engine.wait(10.0)
+                engine.start_stream(self.sources[source_index])
+            elif not engine.is_running:
+                # The file ended (or failed): loop it
+                restarts += 1
+                engine.start_stream(self.sources[source_index])
+            if next_resize is not None and now >= next_resize:
+                next_resize += config.resize_seconds
+                size_index = (size_index + 1) % len(config.display_sizes)
+                engine.fit_to_display(QSize(*config.display_sizes[size_index]))
+            if baseline is None and tracemalloc.is_tracing() and now - start >= config.warmup:
+                baseline = tracemalloc.take_snapshot()
+            if now >= next_sample:
+                next_sample += config.sample_interval
+                sample = self._sample(engine, now - start, (frames - frames_at_sample) / (now - last_sample),
+                                      frames, cycles, restarts)
+                frames_at_sample, last_sample = frames, now
+                samples.append(sample)
+                if self._on_sample is not None:
+                    self._on_sample(sample)
+            time.sleep(tick)
+
+        allocators = []
+        if tracemalloc.is_tracing():
+            allocators = _top_allocators(baseline or tracemalloc.take_snapshot(), config.top_allocators)
+        totals = {"seconds": time.monotonic() - start, "frames": frames, "cycles": cycles,
+                  "restarts": restarts, "stream_switches": engine.stream_switches}
+        return samples, totals, allocators
+
+    @staticmethod
+    def _sample(engine, t: float, fps: float, frames: int, cycles: int, restarts: int) -> SoakSample:
+        rss = rss_bytes()
+        latency = engine.latency_stats()["frame_latency_ms"]
+        return SoakSample(
+            t=t,
+            rss_mb=None if rss is None else rss / 2**20,
+            threads=thread_count(),
+            python_threads=threading.active_count(),
+            fds=fd_count(),
+            heap_mb=tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else None,
+            latency_p50_ms=latency["p50"],
+            latency_max_ms=latency["max"],
+            fps=fps,
+            frames=frames,
+            cycles=cycles,
+            restarts=restarts,
+        )
+
+
+def write_report(path, report: dict):
+    """Writes a run's report as JSON (atomically)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    os.replace(tmp, path)
+
+
+def load_report(path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError(f"{path}: unsupported soak report version {report.get('version')}")
+    return report
+
+
+def compare_reports(baseline: dict, current: dict) -> list:
+    """(check, baseline value, current value) for every check of either report."""
+    names = list(baseline.get("checks", {}))
+    names += [name for name in current.get("checks", {}) if name not in names]
+    return [(name, baseline.get("checks", {}).get(name, {}).get("value"),
+             current.get("checks", {}).get(name, {}).get("value")) for name in names]
@@ -0,0 +1,98 @@
+"""
+Camera sources with a main stream and an optional sub-stream.
+
+Most IP cameras serve a full-resolution main stream and a low-resolution
+sub-stream. A StreamSource holds both URLs; in the UI and on the command
+line they are written as "MAIN|SUB" (a bare "|" never occurs in a URL).
+StreamSelector decides which one to play: the sub-stream for small
+displays and while the machine is overloaded, the main stream otherwise.
+"""
+import time
+from dataclasses import dataclass
+
+# Displays with at most this many device pixels play the sub-stream
+SUB_STREAM_PIXELS = 960 * 540
+# Process CPU (percent of the machine) that counts as overloaded
+OVERLOAD_CPU_PERCENT = 85.0
+# New late frames per stats interval that count as overloaded
+OVERLOAD_LATE_FRAMES = 5
+
+MAIN, SUB = "main", "sub"
+
+
+@dataclass(frozen=True)
+class StreamSource:
+    """A camera's main stream URL and optional sub-stream URL."""
+
+    main: str
+    sub: str | None = None
+
+    @classmethod
+    def parse(cls, text: str) -> "StreamSource":
+        """Parses "MAIN" or "MAIN|SUB"."""
+        main, _, sub = (part.strip() for part in text.partition("|"))
+        return cls(main, sub or None)
+
+    @property
+    def urls(self) -> list:
+        return [self.main] + ([self.sub] if self.sub else [])
+
+    def url(self, variant: str) -> str:
+        """URL of variant ("main" or "sub"); the main stream if there is no sub-stream."""
+        return self.sub if variant == SUB and self.sub else self.main
+
+    def __str__(self):
+        return f"{self.main}|{self.sub}" if self.sub else self.main
+
+
+class StreamSelector:
+    """
+    Chooses between main and sub-stream for a display size and the load
+    reported through report_load(). A stream switch is expensive, so the
+    choice has hysteresis: the main stream returns only once the display
+    is hysteresis times larger than the sub-stream threshold, and only
+    recover_after seconds after the last overload. None for overload_cpu
+    or overload_late_frames ignores that signal.
+    """
+
+    def __init__(self, sub_pixels: int = SUB_STREAM_PIXELS, hysteresis: float = 1.25,
+                 recover_after: float = 10.0,
+                 overload_cpu: float | None = OVERLOAD_CPU_PERCENT,
+                 overload_late_frames: int | None = OVERLOAD_LATE_FRAMES):
+        self.sub_pixels = sub_pixels
+        self.hysteresis = hysteresis
+        self.recover_after = recover_after
+        self.overload_cpu = overload_cpu
+        self.overload_late_frames = overload_late_frames
+        self.variant = MAIN
+        self._overloaded_until = 0.0
+        self._late_frames = None
+
+    def overloaded(self, now: float | None = None) -> bool:
+        return (time.monotonic() if now is None else now) < self._overloaded_until
+
+    def report_load(self, stats: dict, now: float | None = None):
+        """Takes a DecodeEngine.stats() snapshot; CPU or late frames mark overload."""
+        now = time.monotonic() if now is None else now
+        late = stats.get("late_frames", 0)
+        new_late = 0 if self._late_frames is None else late - self._late_frames
+        self._late_frames = late
+        cpu_high = self.overload_cpu is not None and stats.get("cpu_percent", 0.0) >= self.overload_cpu
+        late = self.overload_late_frames is not None and new_late >= self.overload_late_frames
+        if cpu_high or late:
+            self._overloaded_until = now + self.recover_after
+
+    def choose(self, width: int, height: int, now: float | None = None) -> str:
+        """The variant to play on a display of width x height device pixels (0: unknown)."""
+        pixels = max(0, width) * max(0, height)
+        if self.overloaded(now):
+            variant = SUB
+        elif pixels == 0:
+            # Size unknown yet: keep what is playing
+            variant = self.variant
+        elif self.variant == SUB:
+            variant = MAIN if pixels > self.sub_pixels * self.hysteresis else SUB
+        else:
+            variant = SUB if pixels <= self.sub_pixels else MAIN
+        self.variant = variant
+        return variant
@@ -0,0 +1,50 @@
+"""
+Startup instrumentation.
+
+StartupTimer records named milestones (imports done, window shown, engine
+loaded, ...) relative to when it was created, and which of the heavy
+decoding modules had been imported by then. main.py creates it right after
+its few standard-library imports, before Qt and the app's own modules load,
+so a report shows what the window waited for. Only the single-stream player
+defers the decoding modules; grid mode starts its streams at launch and
+imports them before its window is shown. For a per-module breakdown run the
+app under ``python -X importtime`` (benchmarks.bench_startup does both).
+"""
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+logger = logging.getLogger("Startup")
+
+# Loaded on first Start, never before the single-stream window is up
+DEFERRED_MODULES = ("av", "numpy", "core.decode_engine", "core.av_engine")
+
+
+class StartupTimer:
+    """Named startup milestones in seconds since the timer was created."""
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self.marks = {}
+        self.deferred_loaded = {}
+
+    def mark(self, name: str) -> float:
+        """Records milestone name now; returns its time in seconds."""
+        elapsed = time.perf_counter() - self._origin
+        self.marks[name] = elapsed
+        self.deferred_loaded[name] = [m for m in DEFERRED_MODULES if m in sys.modules]
+        logger.debug("%s after %.1f ms", name, elapsed * 1000.0)
+        return elapsed
+
+    def report(self) -> dict:
+        return {
+            "marks_ms": {name: seconds * 1000.0 for name, seconds in self.marks.items()},
+            "deferred_loaded": dict(self.deferred_loaded),
+            "modules": len(sys.modules),
+        }
+
+    def write(self, path):
+        """Writes report() as JSON to path."""
+        Path(path).write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
@@ -0,0 +1,233 @@
+"""
+Lightweight rolling statistics for engine and display instrumentation,
+plus a JSON-lines exporter for long-running production measurements.
+"""
+import collections
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+
+def _nearest_rank(ordered: list, pct: float):
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[min(len(ordered), max(1, rank)) - 1]
+
+
+class RollingStats:
+    """Keeps the last ``window`` samples and summarizes them on demand."""
+
+    def __init__(self, window: int = 300):
+        self._samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, value: float):
+        with self._lock:
+            self._samples.append(value)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, pct: float) -> float | None:
+        """Nearest-rank percentile (0-100) of the window, or None if empty."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return _nearest_rank(ordered, pct)
+
+    def percentiles(self, scale: float = 1.0) -> dict:
+        """p50 / p95 / p99 of the window multiplied by scale (None when empty)."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return {"p50": None, "p95": None, "p99": None}
+        return {
+            f"p{pct}": _nearest_rank(ordered, pct) * scale
+            for pct in (50, 95, 99)
+        }
+
+    def summary(self) -> dict:
+        """mean / p50 / max of the window (values are None when empty)."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return {"mean": None, "p50": None, "max": None}
+        return {
+            "mean": sum(ordered) / len(ordered),
+            "p50": _nearest_rank(ordered, 50),
+            "max": ordered[-1],
+        }
+
+
+class RateMeter:
+    """Events (or bytes, bits, ...) per second over a sliding time window."""
+
+    def __init__(self, window: float = 2.0):
+        self._window = window
+        self._events = collections.deque()
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, amount: float = 1.0, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._events.append((now, amount))
+            self._total += amount
+            self._expire(now)
+
+    def rate(self, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._expire(now)
+            if not self._events:
+                return 0.0
+            # Measure over the span actually covered, until the window fills
+            span = min(self._window, max(now - self._events[0][0], 1e-3))
+            return self._total / span
+
+    def reset(self):
+        with self._lock:
+            self._events.clear()
+            self._total = 0.0
+
+    def _expire(self, now: float):
+        cutoff = now - self._window
+        while self._events and self._events[0][0] < cutoff:
+            self._total -= self._events.popleft()[1]
+
+
+class CpuMeter:
+    """Process CPU use, in percent of the whole machine, between samples."""
+
+    def __init__(self):
+        self._cpu_count = os.cpu_count() or 1
+        self._last = (time.monotonic(), time.process_time())
+        self.percent = 0.0
+
+    def sample(self) -> float:
+        wall, cpu = time.monotonic(), time.process_time()
+        last_wall, last_cpu = self._last
+        if wall > last_wall:
+            self.percent = 100.0 * (cpu - last_cpu) / ((wall - last_wall) * self._cpu_count)
+        self._last = (wall, cpu)
+        return self.percent
+
+
+def _windows_memory_counters():
+    """PROCESS_MEMORY_COUNTERS of this process, or None on failure."""
+    import ctypes
+    from ctypes import wintypes
+
+    class _Counters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = _Counters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process, or None where unsupported."""
+    if sys.platform == "win32":
+        counters = _windows_memory_counters()
+        return None if counters is None else counters.PeakWorkingSetSize
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def rss_bytes() -> int | None:
+    """
+    Current resident set size of this process, or None where unsupported
+    (only Linux and Windows report it without extra packages).
+    """
+    if sys.platform == "win32":
+        counters = _windows_memory_counters()
+        return None if counters is None else counters.WorkingSetSize
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def fd_count() -> int | None:
+    """
+    Open file descriptors of this process (Linux), or kernel handles on
+    Windows; None where unsupported.
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        count = wintypes.DWORD()
+        kernel32 = ctypes.windll.kernel32
+        if not kernel32.GetProcessHandleCount(kernel32.GetCurrentProcess(), ctypes.byref(count)):
+            return None
+        return count.value
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def thread_count() -> int:
+    """
+    Threads of this process, FFmpeg's native threads included where the OS
+    reports them (Linux); elsewhere only the Python threads.
+    """
+    try:
+        with open("/proc/self/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"Threads:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return threading.active_count()
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per line, each stamped with a Unix time."""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps({"ts": time.time(), **record}, default=str)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
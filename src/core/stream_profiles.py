@@ -0,0 +1,82 @@
+"""
+RTSP tuning profiles for AVEngine.
+
+Each profile bundles the FFmpeg demuxer/decoder options that trade startup
+time and glass-to-glass delay against resilience to jitter and packet loss.
+"""
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class StreamProfile:
+    """A named set of FFmpeg options applied when opening an RTSP source."""
+
+    name: str
+    # "tcp" survives lossy links and NAT; "udp" avoids head-of-line blocking
+    transport: str
+    # Decoder threading: "SLICE" adds no delay, "FRAME" adds one frame per thread
+    thread_type: str
+    options: dict = field(default_factory=dict)
+
+    def rtsp_options(self, timeout_us: int = 5_000_000) -> dict:
+        """Options dict for av.open() on an RTSP URL."""
+        options = {
+            "rtsp_transport": self.transport,
+            # Socket I/O timeout in microseconds (replaces the old "stimeout")
+            "timeout": str(timeout_us),
+        }
+        options.update(self.options)
+        return options
+
+
+PROFILES = {
+    "low-latency": StreamProfile(
+        name="low-latency",
+        transport="udp",
+        thread_type="SLICE",
+        options={
+            "fflags": "nobuffer",
+            "flags": "low_delay",
+            "probesize": "65536",
+            "analyzeduration": "200000",
+            "max_delay": "0",
+            "reorder_queue_size": "0",
+            "buffer_size": "1024000",
+        },
+    ),
+    "balanced": StreamProfile(
+        name="balanced",
+        transport="tcp",
+        thread_type="AUTO",
+        options={
+            "probesize": "1000000",
+            "analyzeduration": "1000000",
+            "max_delay": "500000",
+            "buffer_size": "1024000",
+        },
+    ),
+    "robust": StreamProfile(
+        name="robust",
+        transport="tcp",
+        thread_type="FRAME",
+        options={
+            "probesize": "5000000",
+            "analyzeduration": "5000000",
+            "max_delay": "5000000",
+            "reorder_queue_size": "500",
+            "buffer_size": "4096000",
+        },
+    ),
+}
+
+DEFAULT_PROFILE = "balanced"
+
+
+def get_profile(name: str) -> StreamProfile:
+    """Looks up a profile by name, raising ValueError for unknown names."""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown stream profile '{name}'. Choose one of: {', '.join(PROFILES)}"
+        ) from None
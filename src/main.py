@@ -1,10 +1,29 @@
+import argparse
 import logging
+import multiprocessing
 import sys
 import os
+
+# "python -m src.main" runs this file as src.main; ui/ and core/ are
+# top-level packages next to it either way
+if __package__:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.startup import StartupTimer
+
+# Started before the imports below, so reports include Qt's own load time
+STARTUP = StartupTimer()
+
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QApplication
-# Importing our own modules from the src folder
+# Importing our own modules from the src folder. PyAV/FFmpeg (core.av_engine,
+# recorder, snapshots) load on the first Start, after the window is up.
 from ui.main_window import MainWindow
-from core.av_engine import AVEngine
+from core.decode_modes import DECODE_MODES
+from core.pipeline import PipelineConfig
+from core.presentation import PacingConfig
+from core.stats import JsonLinesExporter
+from core.stream_profiles import DEFAULT_PROFILE, PROFILES
 
 # Debug: show RTSP logs in PyCharm Run console
 logging.basicConfig(
@@ -15,35 +34,275 @@ logging.basicConfig(
 logging.getLogger("RTSP").setLevel(logging.DEBUG)
 
 
+def parse_args(argv: list) -> tuple[argparse.Namespace, list]:
+    """Splits our own options from the arguments Qt should see."""
+    parser = argparse.ArgumentParser(description="VisionGrid RTSP Player")
+    parser.add_argument("--opengl", action="store_true",
+                        help="render video through OpenGL")
+    parser.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help="RTSP tuning profile")
+    parser.add_argument("--stats-overlay", action="store_true",
+                        help="show the performance overlay (toggle with F3)")
+    parser.add_argument("--stats-log", metavar="PATH",
+                        help="append performance stats to a JSON-lines file")
+    parser.add_argument("--grid", nargs="+", metavar="URL",
+                        help="show several streams in a grid")
+    parser.add_argument("--max-decode-threads", type=int, default=None,
+                        help="decode thread cap shared by all grid streams")
+    parser.add_argument("--max-cpu", type=float, default=None, metavar="PERCENT",
+                        help="CPU budget shared by all grid streams")
+    parser.add_argument("--processes", action="store_true",
+                        help="decode each --grid stream in its own worker process")
+    parser.add_argument("--probe-cache", metavar="PATH",
+                        help="start --grid cameras that passed validate_inventory.py first")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run demux, decode and conversion on separate threads")
+    parser.add_argument("--convert-workers", type=int, default=2, metavar="N",
+                        help="conversion threads used by --pipeline")
+    parser.add_argument("--jitter-buffer", type=float, default=0.0, metavar="MS",
+                        help="delay live video by MS to smooth out network jitter")
+    parser.add_argument("--no-pacing", action="store_true",
+                        help="show frames as soon as they decode instead of at their timestamps")
+    parser.add_argument("--decode-mode", choices=("auto",) + tuple(DECODE_MODES), default="auto",
+                        help="decode every frame (full), fewer (reduced), keyframes only, "
+                             "or pick by display visibility and size (auto)")
+    parser.add_argument("--favorite", action="append", default=[], metavar="URL",
+                        help="keep this camera connected in the background for instant "
+                             "switching (repeatable)")
+    parser.add_argument("--max-open-connections", type=int, default=4, metavar="N",
+                        help="most --favorite cameras kept connected at once")
+    parser.add_argument("--motion", action="store_true",
+                        help="detect motion in the decoded frames and report it in the status bar")
+    parser.add_argument("--motion-fps", type=float, default=5.0, metavar="FPS",
+                        help="frames analyzed per second for --motion")
+    parser.add_argument("--record", metavar="DIR",
+                        help="record the stream to DIR without re-encoding")
+    parser.add_argument("--record-format", choices=("mp4", "mkv"), default="mp4",
+                        help="container for --record")
+    parser.add_argument("--segment-seconds", type=float, default=300.0, metavar="SECONDS",
+                        help="start a new recording file after this long")
+    parser.add_argument("--snapshot-dir", default="snapshots", metavar="DIR",
+                        help="folder for snapshots (F12)")
+    parser.add_argument("--snapshot-format", choices=("png", "jpg"), default="png",
+                        help="snapshot image format")
+    parser.add_argument("--startup-report", metavar="PATH",
+                        help="write startup milestone timings to PATH as JSON on exit")
+    parser.add_argument("--quit-after-startup", action="store_true",
+                        help="exit as soon as the window is shown (startup benchmarks)")
+    args, qt_args = parser.parse_known_args(argv[1:])
+    return args, argv[:1] + qt_args
+
+
+def pacing_config(args: argparse.Namespace) -> PacingConfig | None:
+    """Presentation pacing from --jitter-buffer / --no-pacing."""
+    if args.no_pacing:
+        return None
+    return PacingConfig(jitter_buffer=args.jitter_buffer / 1000.0)
+
+
+class LazyEngine:
+    """
+    Owns the player's AVEngine, which is created (importing PyAV and the
+    FFmpeg libraries) on the first Start rather than at launch.
+    """
+
+    def __init__(self, app: QApplication, window: MainWindow, args: argparse.Namespace):
+        self._app = app
+        self._window = window
+        self._args = args
+        self._exporter = JsonLinesExporter(args.stats_log) if args.stats_log else None
+        self._connections = None
+        self.engine = None
+
+    def get(self):
+        """The engine, created and wired to the window on first use."""
+        if self.engine is None:
+            self.engine = self._create()
+            STARTUP.mark("engine_loaded")
+        return self.engine
+
+    def _create(self):
+        from core.av_engine import AVEngine
+        from core.connection_cache import ConnectionCache
+        from core.motion import MotionConfig
+        from core.recorder import RecordingConfig
+
+        args, window = self._args, self._window
+        display = window.video_display
+        pipeline = PipelineConfig(convert_workers=args.convert_workers) if args.pipeline else None
+        # Switching back to a camera skips most of the probing
+        self._connections = ConnectionCache(max_open=args.max_open_connections)
+        engine = AVEngine(profile=window.profile_combo.currentText(), pipeline=pipeline,
+                          pacing=pacing_config(args),
+                          auto_decode_mode=args.decode_mode == "auto",
+                          connections=self._connections,
+                          motion=MotionConfig(max_fps=args.motion_fps) if args.motion else None)
+        if args.decode_mode != "auto":
+            engine.set_decode_mode(args.decode_mode)
+
+        # Frame handoff: the engine overwrites the newest frame in its mailbox,
+        # the display pulls it on a refresh timer (latest frame wins)
+        display.set_frame_source(engine.frame_mailbox)
+        # Scale inside swscale to the display size instead of in the UI thread
+        display.resized.connect(engine.fit_to_display)
+        engine.fit_to_display(display.size() * display.devicePixelRatioF())
+        # Digital zoom: the engine converts only the region on screen
+        display.region_changed.connect(engine.set_region)
+        engine.set_region(display.region)
+        # Minimized: keyframes only (with --decode-mode auto)
+        display.on_screen_changed.connect(engine.set_display_visible)
+        engine.set_display_visible(display.is_on_screen)
+
+        # Communication Bridge: Using Qt Signals & Slots
+        # Connect error and status signals from engine to UI
+        engine.error_signal.connect(window._handle_error)
+        engine.status_signal.connect(window._handle_status_change)
+        engine.snapshot_signal.connect(window._handle_snapshot_saved)
+        engine.motion_signal.connect(window._handle_motion)
+
+        # Performance stats: overlay on the video and optional JSON-lines log
+        display.set_stats_provider(engine.stats)
+        if self._exporter is not None:
+            exporter = self._exporter
+            engine.stats_signal.connect(
+                lambda stats: exporter.write({"engine": stats, "display": display.stats()})
+            )
+
+        # Packet-copy recording; starts with the first connection
+        if args.record:
+            engine.start_recording(RecordingConfig(
+                directory=args.record,
+                container=args.record_format,
+                segment_seconds=args.segment_seconds,
+            ))
+        return engine
+
+    def start_stream(self, url: str):
+        self.get().start_stream(url)
+
+    def prewarm_favorites(self):
+        """Connects the --favorite cameras in the background."""
+        if self._args.favorite:
+            self.get().prewarm(self._args.favorite)
+
+    def stop(self):
+        if self.engine is not None:
+            self.engine.stop()
+
+    def set_profile(self, name: str):
+        # A new engine picks the profile up from the combo box
+        if self.engine is not None:
+            self.engine.set_profile(name)
+
+    def take_snapshot(self):
+        """Snapshots are encoded off the UI thread; the status bar reports the file."""
+        if self.engine is None:
+            self._window.status_label.setText("Status: No frame decoded yet")
+            return
+        from core.snapshot import snapshot_path
+        args = self._args
+        try:
+            self.engine.snapshot(snapshot_path(args.snapshot_dir, suffix=f".{args.snapshot_format}"))
+        except RuntimeError as e:
+            self._window.status_label.setText(f"Status: {e}")
+
+    def shutdown(self):
+        if self.engine is not None:
+            self.engine.stop_recording()
+        if self._connections is not None:
+            self._connections.close()
+        if self._exporter is not None:
+            self._exporter.close()
+
+
+def finish_startup(app: QApplication, args: argparse.Namespace):
+    """Marks the window as shown once the event loop runs; handles the startup flags."""
+    def shown():
+        STARTUP.mark("window_shown")
+        if args.quit_after_startup:
+            app.quit()
+
+    if args.startup_report:
+        app.aboutToQuit.connect(lambda: STARTUP.write(args.startup_report))
+    # Runs on the first event loop iteration, once show() has been processed
+    QTimer.singleShot(0, shown)
+
+
+def run_grid(app: QApplication, args: argparse.Namespace) -> int:
+    """
+    Runs the multi-stream grid view. Unlike the single-stream player, it
+    loads PyAV before its window is shown: every cell starts at once.
+    """
+    from core.decode_scheduler import DecodeScheduler
+    from ui.video_grid import GridWindow
+
+    scheduler = DecodeScheduler(
+        max_threads=args.max_decode_threads,
+        max_cpu_percent=args.max_cpu
+    )
+    process_pool = None
+    if args.processes:
+        from core.process_pool import ProcessDecodePool
+        process_pool = ProcessDecodePool(max_workers=len(args.grid))
+    probe_cache = None
+    if args.probe_cache:
+        from core.inventory import ProbeCache
+        probe_cache = ProbeCache(path=args.probe_cache)
+    window = GridWindow(args.grid, scheduler, profile=args.profile, pacing=pacing_config(args),
+                        process_pool=process_pool, probe_cache=probe_cache)
+    window.grid.set_stats_overlay(args.stats_overlay)
+    if args.decode_mode != "auto":
+        for engine in window.grid.engines:
+            engine.set_decode_mode(args.decode_mode)
+    if args.stats_log:
+        exporter = JsonLinesExporter(args.stats_log)
+        window.grid.export_stats(exporter)
+        app.aboutToQuit.connect(exporter.close)
+    window.show()
+    finish_startup(app, args)
+    return app.exec()
+
+
 def main():
     """
     Main entry point of the VisionGrid application.
     Connects the Video Engine (PyAV) to the User Interface (PySide6).
     """
-    app = QApplication(sys.argv)
+    STARTUP.mark("imports")
+    args, qt_argv = parse_args(sys.argv)
+    app = QApplication(qt_argv)
     app.setApplicationName("VisionGrid RTSP Player")
+    STARTUP.mark("qapplication")
 
-    # Initialize components
-    window = MainWindow()
-    engine = AVEngine()
+    if args.grid:
+        sys.exit(run_grid(app, args))
 
-    # Communication Bridge: Using Qt Signals & Slots
-    # This is where PyAV's power shines - it pushes frames to the UI thread
-    engine.new_frame_signal.connect(window.video_display.update_frame)
-    
-    # Connect error and status signals from engine to UI
-    engine.error_signal.connect(window._handle_error)
-    engine.status_signal.connect(window._handle_status_change)
+    # Initialize components
+    # Opt-in GPU rendering; the software renderer is the default
+    window = MainWindow(use_opengl=args.opengl)
+    window.profile_combo.setCurrentText(args.profile)
+    window.video_display.set_stats_overlay(args.stats_overlay)
+    player = LazyEngine(app, window, args)
+    STARTUP.mark("window_created")
 
     # Connecting UI events to Engine actions
-    window.connect_requested.connect(engine.start_stream)
-    window.stop_requested.connect(engine.stop)
+    window.connect_requested.connect(player.start_stream)
+    window.stop_requested.connect(player.stop)
+    window.profile_changed.connect(player.set_profile)
+    window.snapshot_requested.connect(player.take_snapshot)
+    app.aboutToQuit.connect(player.shutdown)
 
     window.show()
+    finish_startup(app, args)
+    # Favorites connect once the window is up (this loads the engine)
+    QTimer.singleShot(0, player.prewarm_favorites)
 
     # Start the event loop
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Frozen builds: a spawned decode worker (--grid --processes) runs its
+    # worker function here instead of starting another GUI
+    multiprocessing.freeze_support()
+    main()
@@ -1,49 +1,30 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QLineEdit, QPushButton, QLabel,
-                               QMessageBox)
-from PySide6.QtCore import Qt, Signal, Slot
-from PySide6.QtGui import QPixmap, QImage
-import sys
-import os
-
-# Add parent directory to path to import from core
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from core.url_validator import URLValidator
-
-
-class VideoDisplay(QLabel):
-    """Custom Label for rendering video frames with scaling."""
+                               QMessageBox, QComboBox)
+from PySide6.QtCore import Signal
+from PySide6.QtGui import QKeySequence, QShortcut
 
-    def __init__(self):
-        super().__init__()
-        self.setAlignment(Qt.AlignCenter)
-        self.setText("No Stream Connected")
-        self.setStyleSheet("background-color: #1a1a1a; color: #444; border: 1px solid #333;")
-        self.setMinimumSize(640, 360)
-
-    @Slot(QImage)
-    def update_frame(self, q_img: QImage):
-        """Updates the label with a new video frame."""
-        # Scale image to fit the label size while maintaining aspect ratio
-        pixmap = QPixmap.fromImage(q_img)
-        scaled_pixmap = pixmap.scaled(
-            self.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation
-        )
-        self.setPixmap(scaled_pixmap)
+from core.sources import StreamSource
+from core.stream_profiles import DEFAULT_PROFILE, PROFILES
+from core.url_validator import URLValidator
+from .video_display import VideoDisplay, create_video_display
 
 
 class MainWindow(QMainWindow):
     # Signals for communicating with the Engine
     connect_requested = Signal(str)
     stop_requested = Signal()
+    profile_changed = Signal(str)
+    snapshot_requested = Signal()
 
-    def __init__(self):
+    def __init__(self, use_opengl: bool = False):
         super().__init__()
+        self._use_opengl = use_opengl
         self.setWindowTitle("VisionGrid | Professional RTSP Suite")
         self.resize(1024, 768)
         self._is_connecting = False
+        # Last connection status reported by the engine
+        self._status = "Idle"
         self._init_ui()
 
     def _init_ui(self):
@@ -54,26 +35,48 @@ class MainWindow(QMainWindow):
         # Control Bar
         controls = QHBoxLayout()
         self.url_input = QLineEdit()
-        self.url_input.setPlaceholderText("Enter RTSP URL...")
+        self.url_input.setPlaceholderText("Enter RTSP URL (MAIN|SUB for a camera with a sub-stream)...")
         # Default test stream (Big Buck Bunny)
         self.url_input.setText("rtsp://wowzaec2demo.streamlock.net/vod/mp4:BigBuckBunny_115k.mov")
 
+        # RTSP tuning profile, applied on the next Start
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItems(list(PROFILES))
+        self.profile_combo.setCurrentText(DEFAULT_PROFILE)
+        self.profile_combo.setToolTip("Latency vs. robustness trade-off for RTSP sources")
+        self.profile_combo.currentTextChanged.connect(self.profile_changed)
+
         self.btn_toggle = QPushButton("Start Stream")
         self.btn_toggle.clicked.connect(self._handle_button_click)
         self.btn_toggle.setFixedWidth(120)
 
+        # Full-resolution still of the current frame (also F12)
+        self.btn_snapshot = QPushButton("Snapshot")
+        self.btn_snapshot.setToolTip("Save the current frame at full resolution (F12)")
+        self.btn_snapshot.clicked.connect(self.snapshot_requested)
+
         controls.addWidget(self.url_input)
+        controls.addWidget(self.profile_combo)
         controls.addWidget(self.btn_toggle)
+        controls.addWidget(self.btn_snapshot)
         layout.addLayout(controls)
 
         # Video Area
-        self.video_display = VideoDisplay()
+        self.video_display = create_video_display(self._use_opengl)
         layout.addWidget(self.video_display, stretch=1)
 
         # Status Bar
         self.status_label = QLabel("Status: Idle")
         layout.addWidget(self.status_label)
 
+        # F3 toggles the performance overlay on the video
+        QShortcut(QKeySequence("F3"), self, activated=self._toggle_stats_overlay)
+        QShortcut(QKeySequence("F12"), self, activated=self.snapshot_requested)
+
+    def _toggle_stats_overlay(self):
+        display = self.video_display
+        display.set_stats_overlay(not display.stats_overlay_enabled)
+
     def _handle_button_click(self):
         if self.btn_toggle.text() == "Start Stream":
             # Prevent double-clicking
@@ -85,21 +88,24 @@ class MainWindow(QMainWindow):
                 self._show_error("Invalid RTSP URL format")
                 return
             
-            # Validate URL format
-            is_valid, error_msg = URLValidator.validate(url)
-            if not is_valid:
-                self._show_error(error_msg)
-                return
+            # Validate URL format (main stream and optional sub-stream)
+            for part in StreamSource.parse(url).urls:
+                is_valid, error_msg = URLValidator.validate(part)
+                if not is_valid:
+                    self._show_error(error_msg)
+                    return
             
             # URL is valid, attempt connection
             self._is_connecting = True
             self.connect_requested.emit(url)
             self.btn_toggle.setText("Stop Stream")
+            self._status = "Connecting..."
             self.status_label.setText("Status: Connecting...")
         else:
             self._is_connecting = False
             self.stop_requested.emit()
             self.btn_toggle.setText("Start Stream")
+            self._status = "Ready"
             self.status_label.setText("Status: Ready")
            # self.video_display.clear()
             #self.video_display.setText("No Stream Connected")
@@ -126,8 +132,26 @@ class MainWindow(QMainWindow):
         # Show error message with optional technical details (for debugging)
         self._show_error(error_message, technical_detail if technical_detail else None)
     
+    def _handle_snapshot_saved(self, path: str):
+        """Handles snapshot_signal from the video engine."""
+        self.status_label.setText(f"Status: Snapshot saved to {path}")
+
+    def _handle_motion(self, event):
+        """
+        Handles motion_signal (a core.motion.MotionEvent) from the video
+        engine. Motion is only shown while streaming, so it never hides a
+        connecting or reconnecting status.
+        """
+        if self._status != "Streaming":
+            return
+        if event.active:
+            self.status_label.setText(f"Status: Streaming - motion in {event.score:.0%} of the frame")
+        else:
+            self.status_label.setText("Status: Streaming")
+
     def _handle_status_change(self, status: str):
         """Handles status change signals from the video engine."""
+        self._status = status
         self.status_label.setText(f"Status: {status}")
         # If status changed to Ready or Streaming, update connection state
         if status == "Ready":
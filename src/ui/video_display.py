@@ -0,0 +1,422 @@
+"""
+Video display widgets that paint the latest QImage directly.
+
+The previous QLabel-based display converted every frame to a QPixmap and ran
+a smooth software rescale on the GUI thread before handing the result to the
+label. These widgets instead keep a reference to the newest QImage and let
+QPainter scale it straight into a cached target rectangle during paintEvent.
+
+Digital zoom (mouse wheel, drag to pan, double-click to reset) only picks a
+region of the frame and reports it through region_changed; the engine then
+converts just that region, so the widget never crops a full-size frame.
+"""
+import time
+
+from PySide6.QtCore import QEvent, QPointF, QRect, QRectF, QSize, Qt, QTimer, Signal, Slot
+from PySide6.QtGui import QColor, QFont, QImage, QPainter, QPen
+from PySide6.QtWidgets import QWidget
+
+from core.stats import RateMeter, RollingStats
+
+try:
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+except ImportError:  # Qt built without OpenGL support
+    QOpenGLWidget = None
+
+
+class _VideoRendererMixin:
+    """Frame bookkeeping and painting shared by the software and GL widgets."""
+
+    # Emitted with the new size in device pixels so engines can decode to fit it
+    resized = Signal(QSize)
+    # Emitted when the widget appears on screen or stops being visible at all
+    # (hidden, minimized, scrolled or covered out of view by its parents)
+    on_screen_changed = Signal(bool)
+    # Emitted with the zoomed region in fractions of the frame (x, y, width,
+    # height in 0..1), so engines convert only that part; (0, 0, 1, 1) is unzoomed
+    region_changed = Signal(QRectF)
+
+    # Pull the newest frame roughly once per display refresh (~60 Hz)
+    REFRESH_INTERVAL_MS = 16
+    # Above this frame rate, downscaling uses nearest-neighbour sampling
+    FAST_SCALING_FPS = 24.0
+    # Digital zoom per mouse-wheel notch, and the largest zoom
+    ZOOM_STEP = 1.25
+    MAX_ZOOM = 16.0
+
+    BACKGROUND_COLOR = QColor("#1a1a1a")
+    BORDER_COLOR = QColor("#333")
+    TEXT_COLOR = QColor("#444")
+    OVERLAY_BACKGROUND = QColor(0, 0, 0, 160)
+    OVERLAY_TEXT_COLOR = QColor("#e0e0e0")
+    # How often the overlay text is rebuilt (sorting samples is not free)
+    OVERLAY_REFRESH_S = 0.5
+
+    def _init_renderer(self):
+        self.setMinimumSize(640, 360)
+        self._text = "No Stream Connected"
+        self._image = None
+        self._image_size = QSize()
+        self._target_rect = QRect()
+        self._layout_size = QSize()
+        self._last_frame_time = None
+        self._frame_interval = None
+
+        self._display_rate = RateMeter()
+        self._paint_times = RollingStats()
+        self._overlay_enabled = False
+        self._stats_provider = None
+        self._overlay_lines = []
+        self._overlay_updated = 0.0
+
+        self._on_screen = False
+        self._watched_window = None
+
+        self._region = QRectF(0.0, 0.0, 1.0, 1.0)
+        # (press position, region at the press) while dragging a zoomed view
+        self._drag_origin = None
+
+        self._frame_source = None
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setTimerType(Qt.PreciseTimer)
+        self._refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self._refresh_timer.timeout.connect(self._pull_frame)
+
+    def set_frame_source(self, mailbox):
+        """
+        Attaches a FrameMailbox to pull frames from. Frames the display could
+        not keep up with are overwritten in the mailbox instead of queueing.
+        """
+        self._frame_source = mailbox
+        if mailbox is None:
+            self._refresh_timer.stop()
+        else:
+            self._refresh_timer.start()
+
+    def _pull_frame(self):
+        q_img = self._frame_source.take()
+        if q_img is not None:
+            self.update_frame(q_img)
+
+    @Slot(QImage)
+    def update_frame(self, q_img: QImage):
+        """
+        Stores the new frame and schedules a repaint. Holding q_img keeps
+        its pooled buffer from being reused until the next frame replaces it.
+        """
+        now = time.perf_counter()
+        if self._last_frame_time is not None:
+            interval = now - self._last_frame_time
+            # Exponential moving average keeps the fps estimate stable
+            if self._frame_interval is None:
+                self._frame_interval = interval
+            else:
+                self._frame_interval += 0.1 * (interval - self._frame_interval)
+        self._last_frame_time = now
+        self._display_rate.add()
+
+        self._image = q_img
+        if q_img.size() != self._image_size:
+            self._image_size = q_img.size()
+            self._layout_size = QSize()
+        self.update()
+
+    def stats(self) -> dict:
+        """Display-side counters: frames shown per second and paint time."""
+        return {
+            "display_fps": self._display_rate.rate(),
+            "paint_ms": self._paint_times.percentiles(scale=1000.0),
+        }
+
+    def set_stats_provider(self, provider):
+        """Callable returning extra stats (e.g. AVEngine.stats) for the overlay."""
+        self._stats_provider = provider
+
+    def set_stats_overlay(self, enabled: bool):
+        """Shows or hides the on-screen performance overlay."""
+        self._overlay_enabled = enabled
+        self._overlay_updated = 0.0
+        self.update()
+
+    @property
+    def stats_overlay_enabled(self) -> bool:
+        return self._overlay_enabled
+
+    def setText(self, text: str):
+        """Shows a placeholder message instead of video."""
+        self._text = text
+        self.update()
+
+    def text(self) -> str:
+        return self._text
+
+    def clear(self):
+        """Drops the current frame and the placeholder text."""
+        self._image = None
+        self._image_size = QSize()
+        self._target_rect = QRect()
+        self._layout_size = QSize()
+        self._last_frame_time = None
+        self._frame_interval = None
+        self._text = ""
+        self.update()
+
+    @property
+    def current_frame(self):
+        """The QImage currently on screen, or None."""
+        return self._image
+
+    @property
+    def target_rect(self) -> QRect:
+        """Where the current frame is painted (aspect-ratio preserving)."""
+        return QRect(self._cached_target_rect())
+
+    @property
+    def region(self) -> QRectF:
+        """The part of the frame on screen, in fractions of the frame."""
+        return QRectF(self._region)
+
+    @property
+    def zoom(self) -> float:
+        return 1.0 / self._region.width()
+
+    def set_region(self, region: QRectF):
+        """Shows region of the frame (clamped to it); emits region_changed if it moved."""
+        width = min(max(region.width(), 1.0 / self.MAX_ZOOM), 1.0)
+        height = min(max(region.height(), 1.0 / self.MAX_ZOOM), 1.0)
+        x = min(max(region.x(), 0.0), 1.0 - width)
+        y = min(max(region.y(), 0.0), 1.0 - height)
+        region = QRectF(x, y, width, height)
+        if region != self._region:
+            self._region = region
+            self.region_changed.emit(QRectF(region))
+
+    def reset_zoom(self):
+        self.set_region(QRectF(0.0, 0.0, 1.0, 1.0))
+
+    def zoom_at(self, factor: float, pos: QPointF):
+        """Zooms in by factor (out if below 1), keeping the frame point under pos in place."""
+        fx, fy = self._fraction_at(pos)
+        region = self._region
+        width = min(max(region.width() / factor, 1.0 / self.MAX_ZOOM), 1.0)
+        height = region.height() * width / region.width()
+        self.set_region(QRectF(region.x() + fx * (region.width() - width),
+                               region.y() + fy * (region.height() - height), width, height))
+
+    def _fraction_at(self, pos: QPointF) -> tuple:
+        """Where pos lies on the painted frame, as fractions of its width and height."""
+        target = self._cached_target_rect()
+        if target.isEmpty():
+            return 0.5, 0.5
+        fx = (pos.x() - target.x()) / target.width()
+        fy = (pos.y() - target.y()) / target.height()
+        return min(max(fx, 0.0), 1.0), min(max(fy, 0.0), 1.0)
+
+    def wheelEvent(self, event):
+        notches = event.angleDelta().y() / 120.0
+        if not notches:
+            super().wheelEvent(event)
+            return
+        self.zoom_at(self.ZOOM_STEP ** notches, event.position())
+        event.accept()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.zoom > 1.0:
+            self._drag_origin = (event.position(), QRectF(self._region))
+            self.setCursor(Qt.ClosedHandCursor)
+            event.accept()
+        else:
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        target = self._cached_target_rect()
+        if self._drag_origin is None or target.isEmpty():
+            super().mouseMoveEvent(event)
+            return
+        start, region = self._drag_origin
+        delta = event.position() - start
+        # The picture follows the cursor, so the region moves the other way
+        self.set_region(region.translated(-delta.x() / target.width() * region.width(),
+                                          -delta.y() / target.height() * region.height()))
+
+    def mouseReleaseEvent(self, event):
+        if self._drag_origin is not None and event.button() == Qt.LeftButton:
+            self._drag_origin = None
+            self.unsetCursor()
+        else:
+            super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.reset_zoom()
+        else:
+            super().mouseDoubleClickEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit(event.size() * self.devicePixelRatioF())
+        self._update_on_screen()
+
+    @property
+    def is_on_screen(self) -> bool:
+        """Visible, in a window that is not minimized, and not clipped away."""
+        return (self.isVisible() and not self.window().isMinimized()
+                and not self.visibleRegion().isEmpty())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        window = self.window()
+        if window is not self and window is not self._watched_window:
+            # Minimizing changes the window's state, not the widget's visibility
+            if self._watched_window is not None:
+                self._watched_window.removeEventFilter(self)
+            window.installEventFilter(self)
+            self._watched_window = window
+        self._update_on_screen()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_on_screen()
+
+    def moveEvent(self, event):
+        super().moveEvent(event)
+        self._update_on_screen()
+
+    def eventFilter(self, watched, event):
+        if watched is self._watched_window and event.type() in (
+                QEvent.WindowStateChange, QEvent.Show, QEvent.Hide):
+            self._update_on_screen()
+        return super().eventFilter(watched, event)
+
+    def _update_on_screen(self):
+        on_screen = self.is_on_screen
+        if on_screen != self._on_screen:
+            self._on_screen = on_screen
+            self.on_screen_changed.emit(on_screen)
+
+    def _cached_target_rect(self) -> QRect:
+        """
+        Returns the letterboxed target rect, recomputing it only when the
+        frame size or the widget size changed.
+        """
+        if self._layout_size != self.size():
+            self._layout_size = self.size()
+            self._update_geometry()
+        return self._target_rect
+
+    def _update_geometry(self):
+        if self._image_size.isEmpty():
+            self._target_rect = QRect()
+            return
+        fitted = self._image_size.scaled(self.size(), Qt.KeepAspectRatio)
+        x = (self.width() - fitted.width()) // 2
+        y = (self.height() - fitted.height()) // 2
+        self._target_rect = QRect(x, y, fitted.width(), fitted.height())
+
+    def _use_smooth_scaling(self) -> bool:
+        """Bilinear when upscaling or at low frame rates, nearest otherwise."""
+        if self._target_rect.width() >= self._image_size.width():
+            return True
+        if self._frame_interval is None or self._frame_interval <= 0:
+            return True
+        return (1.0 / self._frame_interval) < self.FAST_SCALING_FPS
+
+    def _timed_render(self, painter: QPainter):
+        started = time.perf_counter()
+        self._render(painter)
+        self._paint_times.add(time.perf_counter() - started)
+
+    def _overlay_text(self) -> list:
+        now = time.monotonic()
+        if now - self._overlay_updated < self.OVERLAY_REFRESH_S:
+            return self._overlay_lines
+        self._overlay_updated = now
+
+        def ms(value):
+            return "-" if value is None else f"{value:.1f}"
+
+        display = self.stats()
+        lines = [
+            f"display {display['display_fps']:.1f} fps  "
+            f"paint p50/p95 {ms(display['paint_ms']['p50'])}/{ms(display['paint_ms']['p95'])} ms"
+        ]
+        engine = self._stats_provider() if self._stats_provider else None
+        if engine:
+            lines.append(
+                f"decode {engine['decode_fps']:.1f} fps  {engine['bitrate_kbps']:.0f} kbps  "
+                f"cpu {engine['cpu_percent']:.0f}%"
+            )
+            for stage, times in engine["stages_ms"].items():
+                lines.append(f"{stage:8s} p50 {ms(times['p50'])}  p95 {ms(times['p95'])}  p99 {ms(times['p99'])} ms")
+            lines.append(f"dropped {engine['dropped_frames']}  queue {engine['queue_depth']}  "
+                         f"mode {engine.get('decode_mode', 'full')}")
+        self._overlay_lines = lines
+        return lines
+
+    def _render_overlay(self, painter: QPainter):
+        lines = self._overlay_text()
+        painter.setFont(QFont("monospace", 9))
+        metrics = painter.fontMetrics()
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 12
+        height = metrics.height() * len(lines) + 8
+        painter.fillRect(QRect(4, 4, width, height), self.OVERLAY_BACKGROUND)
+        painter.setPen(self.OVERLAY_TEXT_COLOR)
+        for i, line in enumerate(lines):
+            painter.drawText(10, 8 + metrics.ascent() + i * metrics.height(), line)
+
+    def _render(self, painter: QPainter):
+        painter.fillRect(self.rect(), self.BACKGROUND_COLOR)
+        target = self._cached_target_rect()
+        if self._image is not None and not target.isEmpty():
+            painter.setRenderHint(QPainter.SmoothPixmapTransform, self._use_smooth_scaling())
+            painter.drawImage(target, self._image)
+        elif self._text:
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawText(self.rect(), Qt.AlignCenter, self._text)
+        if self._overlay_enabled:
+            self._render_overlay(painter)
+        painter.setPen(QPen(self.BORDER_COLOR, 1))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+
+
+class VideoDisplay(_VideoRendererMixin, QWidget):
+    """Software (raster) video widget for rendering frames with scaling."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Every pixel is painted in paintEvent, skip Qt's background erase
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self._init_renderer()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self._timed_render(painter)
+        painter.end()
+
+
+if QOpenGLWidget is not None:
+
+    class GLVideoDisplay(_VideoRendererMixin, QOpenGLWidget):
+        """OpenGL-backed variant; QPainter scaling runs on the GPU."""
+
+        def __init__(self, parent=None):
+            super().__init__(parent)
+            self._init_renderer()
+
+        def paintGL(self):
+            painter = QPainter(self)
+            self._timed_render(painter)
+            painter.end()
+
+else:
+    GLVideoDisplay = None
+
+
+def create_video_display(use_opengl: bool = False, parent=None):
+    """
+    Returns a GLVideoDisplay when requested and available, otherwise the
+    software VideoDisplay.
+    """
+    if use_opengl and GLVideoDisplay is not None:
+        return GLVideoDisplay(parent)
+    return VideoDisplay(parent)
@@ -0,0 +1,151 @@
+"""
+Multi-stream grid view: N VideoDisplay cells, each fed by its own AVEngine,
+all decoding on one shared DecodeScheduler, or by a ProcessEngine decoding
+in a worker process of a shared ProcessDecodePool.
+"""
+import math
+
+from PySide6.QtCore import QSize
+from PySide6.QtWidgets import QGridLayout, QMainWindow, QWidget
+
+from core.av_engine import AVEngine
+from core.connection_cache import ConnectionCache
+from core.decode_scheduler import DecodeScheduler
+from core.inventory import ProbeCache, order_by_health
+from core.presentation import PacingConfig
+from core.process_engine import ProcessEngine
+from core.process_pool import ProcessDecodePool
+from core.stream_profiles import DEFAULT_PROFILE
+from .video_display import VideoDisplay
+
+
+class VideoGrid(QWidget):
+    """Square-ish grid of video cells (1x1, 2x2, 3x3, ...)."""
+
+    # Cells must stay usable when many streams share the window
+    MIN_CELL_SIZE = QSize(160, 90)
+
+    def __init__(self, scheduler: DecodeScheduler | None = None,
+                 profile: str = DEFAULT_PROFILE, parent=None,
+                 pacing: PacingConfig | None = None,
+                 process_pool: ProcessDecodePool | None = None):
+        super().__init__(parent)
+        self._scheduler = scheduler or DecodeScheduler()
+        self._process_pool = process_pool
+        self._profile = profile
+        self._pacing = pacing
+        # Cells showing the same camera resume with its known parameters
+        self._connections = ConnectionCache(max_open=0)
+        self._stats_overlay = False
+        self._cells = []
+        self._urls = []
+        self._layout = QGridLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._layout.setSpacing(2)
+
+    @property
+    def scheduler(self) -> DecodeScheduler:
+        return self._scheduler
+
+    @property
+    def process_pool(self) -> ProcessDecodePool | None:
+        return self._process_pool
+
+    @property
+    def engines(self) -> list:
+        return [engine for _, engine in self._cells]
+
+    @property
+    def displays(self) -> list:
+        return [display for display, _ in self._cells]
+
+    def add_stream(self, url: str, start: bool = True) -> AVEngine | ProcessEngine:
+        """Adds a cell for url and starts decoding it (later, with start_all(), if not start)."""
+        display = VideoDisplay()
+        display.setMinimumSize(self.MIN_CELL_SIZE)
+        if self._process_pool is not None:
+            engine = ProcessEngine(self._process_pool, profile=self._profile,
+                                   pacing=self._pacing, auto_decode_mode=True)
+        else:
+            engine = AVEngine(scheduler=self._scheduler, profile=self._profile,
+                              pacing=self._pacing, auto_decode_mode=True,
+                              connections=self._connections)
+        display.set_frame_source(engine.frame_mailbox)
+
+        # Decode at the cell's resolution rather than the camera's
+        display.resized.connect(engine.fit_to_display)
+        # A zoomed cell converts only the region it shows
+        display.region_changed.connect(engine.set_region)
+        # Off-screen and thumbnail-sized cells decode fewer frames
+        display.on_screen_changed.connect(engine.set_display_visible)
+        display.set_stats_provider(engine.stats)
+        display.set_stats_overlay(self._stats_overlay)
+        engine.error_signal.connect(lambda message, _detail, d=display: d.setText(message))
+
+        self._cells.append((display, engine))
+        self._urls.append(url)
+        self._relayout()
+        if start:
+            engine.start_stream(url)
+        return engine
+
+    def start_all(self, probe_cache: ProbeCache | None = None):
+        """
+        Starts every cell. With a ProbeCache, sources that last probed fine
+        start first, so they get decode threads before cameras known to be down.
+        """
+        cells = list(zip(self._urls, self.engines))
+        if probe_cache is not None:
+            ranked = order_by_health([url for url, _ in cells], probe_cache)
+            # Sorting is stable: equal URLs keep their relative order
+            cells.sort(key=lambda cell: ranked.index(cell[0]))
+        for url, engine in cells:
+            engine.start_stream(url)
+
+    def set_stats_overlay(self, enabled: bool):
+        self._stats_overlay = enabled
+        for display in self.displays:
+            display.set_stats_overlay(enabled)
+
+    def export_stats(self, exporter):
+        """Writes every engine's periodic stats to a JsonLinesExporter."""
+        for cell, (display, engine) in enumerate(self._cells):
+            engine.stats_signal.connect(
+                lambda stats, c=cell, d=display: exporter.write(
+                    {"cell": c, "engine": stats, "display": d.stats()}
+                )
+            )
+
+    def stop_all(self):
+        for display, engine in self._cells:
+            engine.stop()
+            display.set_frame_source(None)
+
+    def _relayout(self):
+        columns = math.ceil(math.sqrt(len(self._cells)))
+        for index, (display, _) in enumerate(self._cells):
+            self._layout.addWidget(display, index // columns, index % columns)
+
+
+class GridWindow(QMainWindow):
+    """Top-level window hosting a VideoGrid for control-room use."""
+
+    def __init__(self, urls: list, scheduler: DecodeScheduler | None = None,
+                 profile: str = DEFAULT_PROFILE, pacing: PacingConfig | None = None,
+                 process_pool: ProcessDecodePool | None = None,
+                 probe_cache: ProbeCache | None = None):
+        super().__init__()
+        self.setWindowTitle("VisionGrid | Multi-Stream View")
+        self.resize(1280, 720)
+        self.grid = VideoGrid(scheduler, profile, pacing=pacing, process_pool=process_pool)
+        self.setCentralWidget(self.grid)
+        for url in urls:
+            self.grid.add_stream(url, start=False)
+        self.grid.start_all(probe_cache)
+
+    def closeEvent(self, event):
+        self.grid.stop_all()
+        self.grid.scheduler.shutdown()
+        if self.grid.process_pool is not None:
+            self.grid.process_pool.close(timeout=ProcessDecodePool.STOP_TIMEOUT)
+        super().closeEvent(event)
@@ -0,0 +1,81 @@
+"""
+Validates a camera inventory without opening the player:
+
+    python src/validate_inventory.py cameras.csv --workers 8 --timeout 5
+
+Prints one line per stream and exits with status 1 if any stream failed.
+--cache keeps the results in a file that `main.py --grid --probe-cache`
+reads to start known-good cameras first.
+"""
+import argparse
+import json
+import os
+import sys
+
+# "python -m src.validate_inventory" runs this file as a submodule; core/ is
+# a top-level package next to it either way
+if __package__:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.inventory import InventoryValidator, ProbeCache, load_inventory
+from core.stream_profiles import DEFAULT_PROFILE, PROFILES
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Probe every camera of an inventory file")
+    parser.add_argument("inventory", help="CSV (url[,name] columns) or JSON inventory")
+    parser.add_argument("--workers", type=int, default=8, metavar="N",
+                        help="sources probed at the same time")
+    parser.add_argument("--timeout", type=float, default=5.0, metavar="SECONDS",
+                        help="give up on a source after this long")
+    parser.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help="RTSP tuning profile")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="reuse and store results in this JSON file")
+    parser.add_argument("--ttl", type=float, default=300.0, metavar="SECONDS",
+                        help="how long cached results stay valid")
+    parser.add_argument("--refresh", action="store_true",
+                        help="probe every source even if a cached result is fresh")
+    parser.add_argument("--json", metavar="PATH",
+                        help="also write the full report to PATH as JSON")
+    return parser.parse_args(argv)
+
+
+def format_result(name: str, result) -> str:
+    if not result.ok:
+        return f"FAIL {name}: {result.status} {result.url} {result.error}".rstrip()
+    fps = f" {result.fps:g} fps" if result.fps else ""
+    return (f"OK   {name}: {result.codec} {result.width}x{result.height}{fps}, "
+            f"first frame {result.first_frame_ms:.0f} ms {result.url}")
+
+
+def main(argv: list | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        entries = load_inventory(args.inventory)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read inventory: {e}", file=sys.stderr)
+        return 2
+
+    cache = ProbeCache(ttl=args.ttl, path=args.cache)
+    validator = InventoryValidator(max_workers=args.workers, timeout=args.timeout,
+                                   profile=args.profile, cache=cache)
+    report = validator.validate_inventory(entries, refresh=args.refresh)
+    cache.save()
+
+    failed = 0
+    for entry, results in report:
+        for result in results:
+            print(format_result(entry.name, result))
+            failed += not result.ok
+    print(f"{len(report)} cameras, {sum(len(r) for _, r in report)} streams, {failed} failed")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([{"name": entry.name, "streams": [r.to_dict() for r in results]}
+                       for entry, results in report], f, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+Shared fixtures for the test suite.
+"""
+import pytest
+
+from tests.media import make_test_video
+
+
+@pytest.fixture(scope="session")
+def test_video(tmp_path_factory):
+    """Path to a 1 s, 320x240, 30 fps MPEG-4 clip."""
+    return str(make_test_video(tmp_path_factory.mktemp("media") / "clip.mp4"))
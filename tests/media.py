@@ -0,0 +1,52 @@
+"""
+Synthetic media helpers for tests: short clips encoded with PyAV, so engine
+tests run against local files without any network access, and a polling
+helper for conditions that threads fulfil.
+"""
+import time
+
+import av
+import numpy as np
+
+
+def make_test_video(path, frames: int = 30, width: int = 320, height: int = 240,
+                    fps: int = 30, gop: int = 10, codec: str = "mpeg4", start: float = 0.0):
+    """
+    Encodes a short clip whose brightness changes every frame. Its first
+    frame has pts time ``start`` seconds.
+    """
+    container = av.open(str(path), "w")
+
+    def mux(packet):
+        if start and packet.pts is not None:
+            shift = round(start / packet.time_base)
+            packet.pts += shift
+            if packet.dts is not None:
+                packet.dts += shift
+        container.mux(packet)
+
+    stream = container.add_stream(codec, rate=fps)
+    stream.width = width
+    stream.height = height
+    stream.pix_fmt = "yuv420p"
+    stream.codec_context.gop_size = gop
+    # Keyframes only every ``gop`` frames, despite the brightness cuts
+    stream.codec_context.options = {"sc_threshold": "1000000000"}
+    for i in range(frames):
+        arr = np.full((height, width, 3), (i * 8) % 256, dtype=np.uint8)
+        for packet in stream.encode(av.VideoFrame.from_ndarray(arr, format="rgb24")):
+            mux(packet)
+    for packet in stream.encode():
+        mux(packet)
+    container.close()
+    return path
+
+
+def wait_for(condition, timeout: float = 10.0) -> bool:
+    """Polls condition until it is true; False if timeout passes first."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
@@ -26,7 +26,8 @@ def test_import_av_engine():
     engine = AVEngine()
     assert hasattr(engine, "start_stream")
     assert hasattr(engine, "stop")
-    assert hasattr(engine, "new_frame_signal")
+    assert hasattr(engine, "frame_mailbox")
+    assert engine.dropped_frames == 0
     assert hasattr(engine, "error_signal")
     assert hasattr(engine, "status_signal")
 
@@ -0,0 +1,74 @@
+"""
+Tests for the Qt-free DecodeEngine.
+Run from project root: pytest tests/ -v
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.decode_engine import DecodeEngine
+from core.pipeline import PipelineConfig
+from tests.media import make_test_video
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_importing_the_core_does_not_load_qt():
+    code = "import sys, core.decode_engine; assert not any(m.startswith('PySide6') for m in sys.modules)"
+    subprocess.run([sys.executable, "-c", code], cwd=SRC, check=True)
+
+
+def test_frames_iterates_converted_frames_in_order(test_video):
+    engine = DecodeEngine(reconnect_policy=None)
+    results = list(engine.frames(test_video))
+    assert len(results) == 30
+    image, frame = results[0]
+    assert image.pixels().shape == (240, 320, 3)
+    pts = [frame.pts for _, frame in results]
+    assert pts == sorted(pts)
+    assert not engine.is_running
+
+
+def test_frames_in_pipeline_mode_flushes_every_frame(test_video):
+    engine = DecodeEngine(reconnect_policy=None, pipeline=PipelineConfig())
+    assert sum(1 for _ in engine.frames(test_video)) == 30
+
+
+def test_stopping_iteration_early_closes_the_session(test_video):
+    engine = DecodeEngine(reconnect_policy=None)
+    frames = engine.frames(test_video)
+    next(frames)
+    frames.close()
+    assert not engine.is_running
+    assert engine._container is None
+
+
+def test_callbacks_report_status_frames_and_errors(test_video, tmp_path):
+    statuses, errors, sizes = [], [], []
+    engine = DecodeEngine(
+        reconnect_policy=None,
+        on_frame=lambda image, frame: sizes.append((image.width, image.height)),
+        on_status=statuses.append,
+        on_error=lambda msg, detail: errors.append(msg),
+    )
+    engine.set_output_size(160, 120)
+    engine.start_stream(test_video)
+    assert engine.wait(timeout=20.0)
+    assert statuses[:2] == ["Connecting", "Streaming"]
+    assert sizes == [(160, 120)] * 30
+
+    engine.start_stream(str(tmp_path / "missing.mp4"))
+    assert engine.wait(timeout=20.0)
+    assert errors == ["Connection failed. Check source and network"]
+
+
+def test_source_without_frames_ends_the_session(tmp_path):
+    statuses, errors = [], []
+    engine = DecodeEngine(reconnect_policy=None, on_status=statuses.append,
+                          on_error=lambda msg, detail: errors.append(msg))
+    engine.start_stream(str(make_test_video(tmp_path / "empty.mp4", frames=0)))
+    assert engine.wait(timeout=10.0)
+    assert errors == ["No video data received from source"]
+    assert statuses[-1] == "Ready"
+    assert not engine.is_running
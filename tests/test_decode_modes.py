@@ -0,0 +1,91 @@
+"""
+Tests for keyframe-only and reduced-rate decode modes.
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from PySide6.QtCore import QSize
+
+from core.av_engine import AVEngine
+from core.decode_engine import DecodeEngine
+from core.decode_modes import FrameRateCap, choose_decode_mode, get_decode_mode
+from core.pipeline import PipelineConfig
+
+
+def _shown_indexes(engine, url):
+    # test_video is 30 fps, so frame.time * 30 is the frame number
+    return [round(frame.time * 30) for _, frame in engine.frames(url)]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        get_decode_mode("turbo")
+
+
+@pytest.mark.parametrize("visible, size, expected", [
+    (False, (1920, 1080), "keyframes"),
+    (True, (0, 0), "keyframes"),
+    (True, (320, 180), "reduced"),
+    (True, (1280, 720), "full"),
+])
+def test_mode_follows_display(visible, size, expected):
+    assert choose_decode_mode(visible, *size) == expected
+
+
+def test_frame_rate_cap_admits_one_frame_per_interval():
+    cap = FrameRateCap(10.0)
+    admitted = [i for i in range(30) if cap.admit(i / 30)]
+    assert admitted == [0, 3, 6, 9, 12, 15, 18, 21, 24, 27]
+    # A jump back (loop, seek) starts over instead of stalling
+    assert cap.admit(5.0)
+    assert cap.admit(0.0)
+
+
+def test_keyframes_mode_decodes_one_frame_per_gop(test_video):
+    engine = DecodeEngine(reconnect_policy=None)
+    engine.set_decode_mode("keyframes")
+    assert _shown_indexes(engine, test_video) == [0, 10, 20]
+    assert engine.stats()["skipped_packets"] == 27
+
+
+def test_keyframes_mode_in_pipeline(test_video):
+    engine = DecodeEngine(reconnect_policy=None, pipeline=PipelineConfig())
+    engine.set_decode_mode("keyframes")
+    assert _shown_indexes(engine, test_video) == [0, 10, 20]
+
+
+def test_reduced_mode_caps_the_frame_rate(test_video):
+    engine = DecodeEngine(reconnect_policy=None)
+    engine.set_decode_mode("reduced")
+    assert _shown_indexes(engine, test_video) == list(range(0, 30, 3))
+
+
+def test_leaving_keyframes_mode_resumes_at_the_next_keyframe(test_video):
+    engine = DecodeEngine(reconnect_policy=None)
+    engine.set_decode_mode("keyframes")
+    shown = []
+    for _, frame in engine.frames(test_video):
+        shown.append(round(frame.time * 30))
+        engine.set_decode_mode("full")
+    # Frames 1-9 need references that were never decoded
+    assert shown == [0] + list(range(10, 30))
+
+
+def test_av_engine_picks_mode_from_the_display():
+    engine = AVEngine(auto_decode_mode=True)
+    engine.fit_to_display(QSize(320, 180))
+    assert engine.decode_mode == "reduced"
+    engine.set_display_visible(False)
+    assert engine.decode_mode == "keyframes"
+    engine.set_display_visible(True)
+    engine.fit_to_display(QSize(1920, 1080))
+    assert engine.decode_mode == "full"
+    engine.set_decode_mode("keyframes")
+    engine.fit_to_display(QSize(1280, 720))
+    assert engine.decode_mode == "keyframes"
@@ -0,0 +1,147 @@
+"""
+Tests for the shared DecodeScheduler and AVEngine running on it.
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.av_engine import AVEngine
+from core.decode_engine import DecodeEngine
+from core.decode_scheduler import DecodeScheduler
+from core.presentation import PacingConfig
+
+
+def _session(steps, seen_threads):
+    for _ in range(steps):
+        seen_threads.add(threading.current_thread().name)
+        yield
+
+
+def _busy_session(steps, seconds):
+    for _ in range(steps):
+        end = time.process_time() + seconds
+        while time.process_time() < end:
+            pass
+        yield
+
+
+class TestDecodeScheduler:
+
+    def test_rejects_invalid_limits(self):
+        with pytest.raises(ValueError):
+            DecodeScheduler(max_threads=0)
+        with pytest.raises(ValueError):
+            DecodeScheduler(max_cpu_percent=0)
+
+    def test_many_sessions_share_capped_worker_pool(self):
+        scheduler = DecodeScheduler(max_threads=2)
+        seen = set()
+        tasks = [scheduler.submit(_session(20, seen), name=str(i)) for i in range(6)]
+        for task in tasks:
+            assert task.wait(timeout=5.0)
+        assert all(task.steps == 21 for task in tasks)  # 20 yields + StopIteration
+        assert scheduler.thread_count == 2
+        assert len(seen) <= 2
+        assert scheduler.active_tasks == 0
+        scheduler.shutdown()
+
+    def test_crashing_session_finishes_task(self):
+        def broken():
+            yield
+            raise RuntimeError("boom")
+
+        scheduler = DecodeScheduler(max_threads=1)
+        task = scheduler.submit(broken())
+        assert task.wait(timeout=2.0)
+        scheduler.shutdown()
+
+    def test_cpu_budget_throttles_workers(self):
+        # Budget of roughly a fifth of one core, whatever the machine size
+        percent = min(100.0, 20.0 / (os.cpu_count() or 1))
+        scheduler = DecodeScheduler(max_threads=1, max_cpu_percent=percent)
+        task = scheduler.submit(_busy_session(10, 0.005))
+        assert task.wait(timeout=10.0)
+        assert scheduler.throttled_time > 0
+        scheduler.shutdown()
+
+    def test_shutdown_closes_pending_sessions(self):
+        closed = threading.Event()
+
+        def endless():
+            try:
+                while True:
+                    time.sleep(0.001)
+                    yield
+            finally:
+                closed.set()
+
+        scheduler = DecodeScheduler(max_threads=1)
+        task = scheduler.submit(endless())
+        time.sleep(0.05)
+        scheduler.shutdown()
+        assert task.wait(timeout=2.0)
+        assert closed.wait(timeout=2.0)
+
+    def test_parked_session_leaves_the_worker_to_others(self):
+        def paced():
+            # Parks 50 ms per step instead of sleeping on the worker
+            for _ in range(4):
+                yield time.perf_counter() + 0.05
+
+        scheduler = DecodeScheduler(max_threads=1)
+        seen = set()
+        slow = scheduler.submit(paced())
+        started = time.perf_counter()
+        fast = scheduler.submit(_session(200, seen))
+        assert fast.wait(timeout=5.0)
+        assert time.perf_counter() - started < 0.1
+        assert not slow.done
+        assert slow.wait(timeout=5.0)
+        scheduler.shutdown()
+
+    def test_wake_ends_a_park_early(self):
+        def held():
+            yield time.perf_counter() + 60.0
+
+        scheduler = DecodeScheduler(max_threads=1)
+        task = scheduler.submit(held())
+        time.sleep(0.05)
+        task.wake()
+        assert task.wait(timeout=2.0)
+        scheduler.shutdown()
+
+
+def test_engines_decode_on_shared_scheduler(test_video):
+    scheduler = DecodeScheduler(max_threads=2)
+    engines = [AVEngine(scheduler=scheduler) for _ in range(3)]
+    for engine in engines:
+        engine.set_output_size(160, 90)
+        engine.start_stream(test_video)
+    for engine in engines:
+        assert engine.wait(timeout=10.0)
+        frame = engine.frame_mailbox.take()
+        assert frame is not None
+        # 320x240 fitted into 160x90 keeps the 4:3 aspect ratio
+        assert (frame.width(), frame.height()) == (120, 90)
+    assert scheduler.thread_count <= 2
+    scheduler.shutdown()
+
+
+def test_restart_on_shared_scheduler_waits_for_previous_session(test_video):
+    scheduler = DecodeScheduler(max_threads=1)
+    frames = []
+    # Paced, so the first session is still playing when the second starts
+    engine = DecodeEngine(scheduler=scheduler, pacing=PacingConfig(),
+                          on_frame=lambda image, frame: frames.append(frame.pts))
+    engine.start_stream(test_video)
+    time.sleep(0.1)
+    engine.start_stream(test_video)
+    assert engine.wait(timeout=10.0)
+    assert frames and not engine.is_running
+    scheduler.shutdown()
@@ -0,0 +1,139 @@
+"""
+Lifecycle tests: stop() never blocks, sessions never overlap, and rapid
+start/stop cycles leave no threads or memory behind.
+Run from project root: pytest tests/ -v
+"""
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.decode_engine import DecodeEngine
+from core.pipeline import PipelineConfig
+from tests.media import wait_for
+
+
+def _workers():
+    """Threads owned by a DecodeEngine session (scheduler workers are shared)."""
+    return [t for t in threading.enumerate()
+            if t.name in ("Decode", "Demux") or t.name.startswith("Convert-")]
+
+
+class _SilentServer:
+    """Accepts TCP connections and never answers, like a hung camera."""
+
+    def __init__(self):
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen()
+        self._clients = []
+        self.url = f"http://127.0.0.1:{self._sock.getsockname()[1]}/stream.ts"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        try:
+            while True:
+                self._clients.append(self._sock.accept()[0])
+        except OSError:
+            pass
+
+    def close(self):
+        self._sock.close()
+        for client in self._clients:
+            client.close()
+
+
+class _Sessions:
+    """Records session starts and ends; flags a start while one is running."""
+
+    def __init__(self):
+        self.active = 0
+        self.overlapped = False
+        self.ended = threading.Event()
+        self.events = []
+
+    def on_status(self, status):
+        if status == "Connecting":
+            self.active += 1
+            self.overlapped |= self.active > 1
+            self.events.append("start")
+
+    def on_stopped(self):
+        self.active -= 1
+        self.events.append("stop")
+        self.ended.set()
+
+
+def test_stop_returns_immediately_on_a_hung_source():
+    server = _SilentServer()
+    sessions = _Sessions()
+    engine = DecodeEngine(reconnect_policy=None, on_status=sessions.on_status,
+                          on_stopped=sessions.on_stopped)
+    engine.IO_TIMEOUT = (0.5, 0.5)
+    try:
+        engine.start_stream(server.url)
+        time.sleep(0.2)
+        started = time.perf_counter()
+        engine.stop()
+        assert time.perf_counter() - started < 0.05
+        # The stuck open is abandoned once the I/O timeout expires
+        assert sessions.ended.wait(5.0)
+        assert engine.wait(timeout=5.0)
+        assert not engine.is_running
+    finally:
+        server.close()
+
+
+def test_restart_waits_for_the_previous_session():
+    server = _SilentServer()
+    sessions = _Sessions()
+    engine = DecodeEngine(reconnect_policy=None, on_status=sessions.on_status,
+                          on_stopped=sessions.on_stopped)
+    engine.IO_TIMEOUT = (0.5, 0.5)
+    try:
+        engine.start_stream(server.url)
+        time.sleep(0.2)
+        started = time.perf_counter()
+        engine.start_stream(server.url)
+        assert time.perf_counter() - started < 0.05
+        assert engine.is_running
+        engine.stop()
+        assert wait_for(lambda: not _workers())
+        assert not sessions.overlapped
+        assert sessions.events[:2] == ["start", "stop"]
+    finally:
+        server.close()
+
+
+def test_rapid_start_stop_leaks_no_threads_or_memory(test_video):
+    sessions = _Sessions()
+    engines = [
+        DecodeEngine(reconnect_policy=None, on_status=sessions.on_status,
+                     on_stopped=sessions.on_stopped),
+        DecodeEngine(reconnect_policy=None, pipeline=PipelineConfig(convert_workers=2)),
+    ]
+
+    def cycle(rounds):
+        for engine in engines:
+            for i in range(rounds):
+                engine.start_stream(test_video)
+                time.sleep(0.005 * (i % 3))
+                engine.stop()
+            assert engine.wait(timeout=10.0)
+        assert wait_for(lambda: not _workers())
+
+    # The first rounds fill codec and allocator caches
+    cycle(10)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        cycle(30)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    assert growth < 512 * 1024
+    assert not sessions.overlapped
@@ -0,0 +1,151 @@
+"""
+Unit tests for the pooled frame conversion path.
+Run from project root: pytest tests/ -v
+"""
+import sys
+from pathlib import Path
+
+import av
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from PySide6.QtGui import QImage
+
+from core.frame_convert import FrameBufferPool, FrameConverter
+from core.qimage_convert import QImageConverter
+
+
+def _solid_frame(width, height, rgb):
+    arr = np.empty((height, width, 3), dtype=np.uint8)
+    arr[...] = rgb
+    return av.VideoFrame.from_ndarray(arr, format="rgb24").reformat(format="yuv420p")
+
+
+class TestFrameBufferPool:
+
+    def test_rejects_empty_pool(self):
+        with pytest.raises(ValueError):
+            FrameBufferPool(0)
+
+    def test_released_buffers_are_reused_round_robin(self):
+        pool = FrameBufferPool(2)
+        ids = [id(pool.acquire(4, 16)) for _ in range(4)]
+        assert ids[0] != ids[1]
+        assert ids[2:] == ids[:2]
+        assert len(pool) == 2
+
+    def test_held_buffers_are_never_handed_out(self):
+        pool = FrameBufferPool(2)
+        held = [pool.acquire(4, 16) for _ in range(3)]
+        view = held[0][1:]
+        del held[0]
+        # A view keeps its base buffer held too
+        assert all(pool.acquire(4, 16) is not view.base for _ in range(4))
+        # Three buffers held, so one more joined the ring and is reused
+        assert len(pool) == 4
+
+    def test_geometry_change_allocates_new_generation(self):
+        pool = FrameBufferPool(2)
+        old = pool.acquire(4, 16)
+        new = pool.acquire(8, 32)
+        assert new.shape == (8, 32)
+        assert pool.shape == (8, 32)
+        assert new is not old
+
+
+class TestFrameConverter:
+
+    def test_converts_without_qt_and_strips_row_padding(self):
+        converted = FrameConverter().convert(_solid_frame(50, 37, (255, 0, 0)))
+        assert converted.data.shape == (37, converted.bytes_per_line)
+        pixels = converted.pixels()
+        assert pixels.shape == (37, 50, 3)
+        assert pixels[10, 10, 0] > 240 and pixels[10, 10, 1] < 16
+
+    def test_held_frame_survives_more_conversions_than_pool_slots(self):
+        converter = FrameConverter(pool_slots=2)
+        held = converter.convert(_solid_frame(64, 48, (255, 0, 0)))
+        expected = held.pixels().copy()
+        for _ in range(5):
+            converter.convert(_solid_frame(64, 48, (0, 0, 255)))
+        assert np.array_equal(held.pixels(), expected)
+
+    def test_rejects_unpacked_pixel_format(self):
+        with pytest.raises(ValueError):
+            FrameConverter(pix_fmt="yuv420p")
+
+    def test_crop_converts_only_the_region(self):
+        arr = np.zeros((2160, 3840, 3), dtype=np.uint8)
+        arr[1080:, 1920:] = (0, 0, 255)
+        frame = av.VideoFrame.from_ndarray(arr, format="rgb24").reformat(format="yuv420p")
+        converter = FrameConverter()
+        converter.output_size = (960, 540)
+        converter.crop = (0.5, 0.5, 0.5, 0.5)
+        pixels = converter.convert(frame).pixels()
+        # The 1920x1080 region fits the box and the black rest of the frame is gone
+        assert pixels.shape == (540, 960, 3)
+        # (no black from outside it; the edge row is softened by chroma subsampling)
+        assert pixels[:, :, 2].min() > 200
+        assert pixels[1:, :, 2].min() > 240
+
+    def test_crop_box_is_even_and_inside_the_frame(self):
+        converter = FrameConverter()
+        assert converter.crop_box(1920, 1080) is None
+        converter.crop = (0.9, 0.3333, 0.5, 0.25)
+        assert converter.crop_box(1920, 1080) == (1728, 358, 192, 270)
+        converter.crop = (0.0, 0.0, 1.0, 1.0)
+        assert converter.crop_box(1920, 1080) is None
+
+
+class TestQImageConverter:
+
+    def test_converts_to_rgb888_with_source_stride(self):
+        frame = _solid_frame(50, 37, (255, 0, 0))
+        q_img = QImageConverter().to_qimage(frame)
+        assert (q_img.width(), q_img.height()) == (50, 37)
+        assert q_img.bytesPerLine() >= 50 * 3
+        color = q_img.pixelColor(10, 10)
+        assert color.red() > 240 and color.green() < 16 and color.blue() < 16
+
+    def test_consecutive_frames_use_distinct_buffers(self):
+        converter = QImageConverter(pool_slots=2)
+        first = converter.to_qimage(_solid_frame(32, 32, (0, 0, 255)))
+        second = converter.to_qimage(_solid_frame(32, 32, (0, 255, 0)))
+        # The first image must not be overwritten by the second conversion.
+        assert first.pixelColor(1, 1).blue() > 240
+        assert second.pixelColor(1, 1).green() > 240
+
+    def test_held_image_is_not_rewritten_when_the_pool_wraps(self):
+        converter = QImageConverter(pool_slots=2)
+        # A shallow copy, as the mailbox and the display hold it
+        held = QImage(converter.to_qimage(_solid_frame(32, 32, (255, 0, 0))))
+        for _ in range(5):
+            converter.to_qimage(_solid_frame(32, 32, (0, 255, 0)))
+        assert held.pixelColor(1, 1).red() > 240
+        assert held.pixelColor(1, 1).green() < 16
+
+    @pytest.mark.parametrize("q_format", [QImage.Format_RGB32, QImage.Format_ARGB32_Premultiplied])
+    def test_converts_to_qt_32bit_formats(self, q_format):
+        converter = QImageConverter(output_format=q_format)
+        q_img = converter.to_qimage(_solid_frame(64, 48, (0, 255, 0)))
+        assert q_img.format() == q_format
+        assert q_img.bytesPerLine() >= 64 * 4
+        color = q_img.pixelColor(5, 5)
+        assert color.green() > 240 and color.red() < 16 and color.alpha() == 255
+
+    def test_rejects_unsupported_format(self):
+        with pytest.raises(ValueError):
+            QImageConverter(output_format=QImage.Format_Mono)
+
+    def test_output_size_scales_down_keeping_aspect(self):
+        converter = QImageConverter()
+        converter.output_size = (640, 360)
+        q_img = converter.to_qimage(_solid_frame(3840, 2160, (255, 255, 255)))
+        assert (q_img.width(), q_img.height()) == (640, 360)
+
+    def test_output_size_never_upscales(self):
+        converter = QImageConverter()
+        converter.output_size = (1920, 1080)
+        q_img = converter.to_qimage(_solid_frame(320, 240, (255, 255, 255)))
+        assert (q_img.width(), q_img.height()) == (320, 240)
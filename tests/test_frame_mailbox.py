@@ -0,0 +1,93 @@
+"""
+Unit tests for FrameMailbox (latest-frame-wins handoff).
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.frame_mailbox import FrameMailbox
+from tests.media import make_test_video
+
+
+class TestFrameMailbox:
+
+    def test_empty_mailbox_returns_none(self):
+        box = FrameMailbox()
+        assert box.take() is None
+        assert box.pending is False
+
+    def test_take_returns_frame_once(self):
+        box = FrameMailbox()
+        box.put("a")
+        assert box.pending is True
+        assert box.take() == "a"
+        assert box.take() is None
+        assert box.delivered == 1
+
+    def test_newest_frame_wins_and_drops_are_counted(self):
+        box = FrameMailbox()
+        assert box.put("a") is False
+        assert box.put("b") is True
+        assert box.put("c") is True
+        assert box.take() == "c"
+        assert box.dropped == 2
+
+    def test_reset_clears_frame_and_counters(self):
+        box = FrameMailbox()
+        box.put("a")
+        box.put("b")
+        box.take()
+        box.put("c")
+        box.reset()
+        assert box.take() is None
+        assert (box.delivered, box.dropped) == (0, 0)
+
+    def test_every_frame_is_delivered_or_dropped_under_contention(self):
+        box = FrameMailbox()
+        total = 5000
+        taken = []
+
+        def producer():
+            for i in range(total):
+                box.put(i)
+
+        thread = threading.Thread(target=producer)
+        thread.start()
+        while thread.is_alive():
+            frame = box.take()
+            if frame is not None:
+                taken.append(frame)
+        frame = box.take()
+        if frame is not None:
+            taken.append(frame)
+
+        assert taken == sorted(taken)
+        assert taken[-1] == total - 1
+        assert box.delivered + box.dropped == total
+
+
+def test_taken_frames_stay_intact_while_the_consumer_holds_them(tmp_path):
+    from core.av_engine import AVEngine
+
+    clip = make_test_video(tmp_path / "clip.mp4", frames=300, width=640, height=360)
+    # Unpaced, the decoder runs far ahead of a consumer that paints for 16 ms
+    engine = AVEngine(reconnect_policy=None)
+    engine.start_stream(str(clip))
+    shown = rewritten = 0
+    while engine.core.is_running or engine.frame_mailbox.pending:
+        image = engine.frame_mailbox.take()
+        if image is None:
+            time.sleep(0.001)
+            continue
+        before = bytes(image.constBits())
+        time.sleep(0.016)
+        shown += 1
+        rewritten += bytes(image.constBits()) != before
+    assert engine.wait(timeout=10.0)
+    assert shown > 3
+    assert rewritten == 0
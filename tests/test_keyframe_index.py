@@ -0,0 +1,111 @@
+"""
+Tests for the keyframe index and seeking/scrubbing in local files.
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.decode_engine import DecodeEngine
+from core.keyframe_index import KeyframeIndex, index_path
+from core.pipeline import PipelineConfig
+from core.presentation import PacingConfig
+from tests.media import make_test_video, wait_for
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """3 s at 30 fps with a keyframe every 10 frames."""
+    return str(make_test_video(tmp_path / "clip.mp4", frames=90))
+
+
+class TestKeyframeIndex:
+
+    def test_build_finds_every_keyframe(self, clip):
+        index = KeyframeIndex.build(clip)
+        assert len(index) == 9
+        assert index.times[:3] == pytest.approx([0.0, 1 / 3, 2 / 3])
+        assert index.duration == pytest.approx(3.0)
+        assert index.time_base * index.keyframe_before(1.5) == pytest.approx(4 / 3)
+        assert index.keyframe_before(-1.0) == index.keyframes[0]
+
+    def test_positions_count_from_the_stream_start(self, tmp_path):
+        ts_clip = str(make_test_video(tmp_path / "clip.ts", frames=90, start=10.0))
+        index = KeyframeIndex.build(ts_clip)
+        assert index.start_time == pytest.approx(10.0, abs=0.001)
+        assert index.duration == pytest.approx(3.0, abs=0.05)
+        assert index.times[:3] == pytest.approx([0.0, 1 / 3, 2 / 3], abs=0.001)
+        assert index.to_seconds(index.keyframes[3]) == pytest.approx(1.0, abs=0.001)
+        assert index.to_pts(0.0) == index.start
+        # 1.5 s into the clip is the keyframe at pts time 10 + 4/3 s
+        assert index.time_base * index.keyframe_before(1.5) == pytest.approx(10 + 4 / 3, abs=0.001)
+        assert index.keyframe_before(index.duration) == index.keyframes[-1]
+
+    def test_index_is_stored_next_to_the_file(self, clip):
+        built = KeyframeIndex.for_file(clip)
+        assert index_path(clip).exists()
+        loaded = KeyframeIndex.load(clip)
+        assert loaded.keyframes == built.keyframes
+        assert loaded.time_base == built.time_base
+        assert loaded.start == built.start
+
+    def test_stored_index_of_a_changed_file_is_rebuilt(self, clip):
+        KeyframeIndex.for_file(clip)
+        make_test_video(clip, frames=30)
+        os.utime(clip, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert KeyframeIndex.load(clip) is None
+        assert len(KeyframeIndex.for_file(clip)) == 3
+
+
+def _engine(shown):
+    return DecodeEngine(reconnect_policy=None, pacing=PacingConfig(),
+                        on_frame=lambda image, frame: shown.append(round(frame.time, 3)))
+
+
+def test_seek_shows_the_target_frame_next(clip):
+    shown = []
+    engine = _engine(shown)
+    engine.start_stream(clip)
+    assert wait_for(lambda: len(shown) >= 3)
+    engine.seek(2.0)
+    assert wait_for(lambda: 2.0 in shown)
+    engine.stop()
+    assert engine.wait(timeout=10.0)
+    after = shown[shown.index(2.0) - 1]
+    # Nothing between the old position and the target was shown
+    assert after < 1.0
+    assert shown[shown.index(2.0) + 1:] == sorted(shown[shown.index(2.0) + 1:])
+    stats = engine.stats()
+    assert stats["seeks"] == 1
+    assert stats["seek_ms"]["p50"] < 100.0
+
+
+def test_scrub_previews_keyframes_and_holds(clip):
+    shown = []
+    engine = _engine(shown)
+    engine.start_stream(clip)
+    assert wait_for(lambda: shown)
+    engine.scrub(1.5)
+    assert wait_for(lambda: shown[-1] == pytest.approx(4 / 3, abs=0.001))
+    held = len(shown)
+    time.sleep(0.3)
+    assert len(shown) == held
+
+    engine.scrub(0.5)
+    assert wait_for(lambda: shown[-1] == pytest.approx(1 / 3, abs=0.001))
+    # Releasing the scrubber resumes playback at the exact position
+    engine.seek(0.5)
+    assert wait_for(lambda: len(shown) >= held + 4)
+    engine.stop()
+    assert engine.wait(timeout=10.0)
+    assert shown[held + 1] == 0.5
+
+
+def test_seek_needs_the_serial_decode_path():
+    engine = DecodeEngine(reconnect_policy=None, pipeline=PipelineConfig())
+    with pytest.raises(ValueError):
+        engine.seek(1.0)
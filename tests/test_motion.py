@@ -0,0 +1,132 @@
+"""
+Tests for motion detection on decoded frames.
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import av
+import numpy as np
+import pytest
+from PySide6.QtCore import Qt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.av_engine import AVEngine
+from core.motion import MotionAnalyzer, MotionConfig, MotionDetector, luma_plane
+from core.presentation import PacingConfig
+from tests.media import wait_for
+
+
+def _frame(luma: np.ndarray, fmt: str = "yuv420p"):
+    rgb = np.repeat(luma[:, :, None], 3, axis=2)
+    return av.VideoFrame.from_ndarray(rgb, format="rgb24").reformat(format=fmt)
+
+
+class TestLumaPlane:
+
+    def test_is_a_strided_view_of_the_frame(self):
+        rng = np.random.default_rng(0)
+        frame = _frame(rng.integers(0, 256, (240, 320), dtype=np.uint8))
+        luma = luma_plane(frame, 4)
+        assert luma.shape == (60, 80)
+        assert not luma.flags.owndata
+        assert np.array_equal(luma, frame.to_ndarray()[:240:4, ::4])
+
+    def test_other_formats_are_converted(self):
+        frame = _frame(np.full((240, 320), 128, dtype=np.uint8), fmt="rgb24")
+        assert luma_plane(frame, 4).shape == (60, 80)
+
+
+class TestMotionDetector:
+
+    def test_static_scene_has_no_regions(self):
+        detector = MotionDetector(MotionConfig(grid=(4, 3)))
+        scene = np.full((120, 160), 100, dtype=np.uint8)
+        assert detector.process(scene) is None
+        event = detector.process(scene)
+        assert event.score == 0.0
+        assert not event.active
+
+    def test_reports_the_cell_that_changed(self):
+        detector = MotionDetector(MotionConfig(grid=(4, 3)))
+        scene = np.full((120, 160), 100, dtype=np.uint8)
+        detector.process(scene)
+        moved = scene.copy()
+        # An object in the bottom-right cell
+        moved[90:110, 130:150] = 220
+        event = detector.process(moved)
+        assert [(r.x, r.y) for r in event.regions] == [(0.75, 80 / 120)]
+        assert event.regions[0].score == pytest.approx(400 / 1600)
+        assert event.score == pytest.approx(400 / moved.size)
+
+    def test_background_absorbs_a_lasting_change(self):
+        detector = MotionDetector(MotionConfig(learning_rate=0.5))
+        detector.process(np.zeros((60, 80), dtype=np.uint8))
+        lit = np.full((60, 80), 200, dtype=np.uint8)
+        events = [detector.process(lit) for _ in range(6)]
+        assert events[0].active
+        assert not events[-1].active
+
+
+class TestMotionAnalyzer:
+
+    def test_reports_motion_until_it_ends(self):
+        events = []
+        analyzer = MotionAnalyzer(MotionConfig(max_fps=1000.0, downscale=2),
+                                  on_motion=events.append)
+        dark = _frame(np.zeros((120, 160), dtype=np.uint8))
+        bright = _frame(np.full((120, 160), 200, dtype=np.uint8))
+        try:
+            # Seeds the background, moves, returns to the background, stays
+            for count, frame in enumerate((dark, bright, dark, dark), start=1):
+                while not analyzer.submit(frame):
+                    pass
+                assert wait_for(lambda: analyzer.stats()["motion_analyzed"] == count)
+            assert [event.active for event in events] == [True, False]
+        finally:
+            analyzer.close()
+
+    def test_rate_is_capped(self):
+        analyzer = MotionAnalyzer(MotionConfig(max_fps=1.0))
+        frame = _frame(np.zeros((120, 160), dtype=np.uint8))
+        try:
+            assert analyzer.submit(frame)
+            assert not analyzer.submit(frame)
+        finally:
+            analyzer.close()
+
+
+def test_engine_emits_motion_for_a_changing_clip(test_video):
+    # Paced, so the analyzer sees many frames even on a busy machine
+    engine = AVEngine(reconnect_policy=None, pacing=PacingConfig(), motion=MotionConfig(max_fps=1000.0))
+    events = []
+    engine.motion_signal.connect(events.append, Qt.DirectConnection)
+    engine.start_stream(test_video)
+    assert engine.wait(timeout=20.0)
+    # The clip brightens every frame, faster than the background follows
+    assert wait_for(lambda: events)
+    assert events[0].active
+    assert engine.stats()["motion_analyzed"] > 1
+
+
+def test_motion_does_not_hide_the_connection_status():
+    from PySide6.QtWidgets import QApplication
+    from core.motion import MotionEvent
+    from ui.main_window import MainWindow
+
+    _ = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    try:
+        reconnecting = "Stream disconnected. Attempting to reconnect..."
+        window._handle_status_change(reconnecting)
+        window._handle_motion(MotionEvent(score=0.3, regions=((0, 0),)))
+        assert window.status_label.text() == f"Status: {reconnecting}"
+
+        window._handle_status_change("Streaming")
+        window._handle_motion(MotionEvent(score=0.3, regions=((0, 0),)))
+        assert "motion" in window.status_label.text()
+    finally:
+        window.close()
@@ -0,0 +1,127 @@
+"""
+Tests for the staged demux/decode/convert pipeline and its use in AVEngine.
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+import threading
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.av_engine import AVEngine
+from core.decode_engine import DecodeEngine
+from core.pipeline import FrameQueue, PacketQueue, PipelineConfig, ReorderBuffer
+from core.reconnect import BackoffPolicy
+
+
+class _Packet:
+    def __init__(self, name, keyframe=False, disposable=False):
+        self.name = name
+        self.is_keyframe = keyframe
+        self.is_disposable = disposable
+
+
+def _drain(queue):
+    items = []
+    while queue.depth:
+        items.append(queue.get(timeout=0).name)
+    return items
+
+
+class TestPacketQueue:
+
+    def test_drops_oldest_disposable_packet_first(self):
+        queue = PacketQueue(3)
+        queue.put(_Packet("I", keyframe=True))
+        queue.put(_Packet("B1", disposable=True))
+        queue.put(_Packet("P1"))
+        queue.put(_Packet("P2"))
+        assert _drain(queue) == ["I", "P1", "P2"]
+        assert queue.dropped == 1
+
+    def test_skips_to_next_keyframe_when_nothing_is_disposable(self):
+        queue = PacketQueue(2)
+        queue.put(_Packet("I", keyframe=True))
+        queue.put(_Packet("P1"))
+        queue.put(_Packet("P2"))
+        queue.put(_Packet("P3"))
+        queue.put(_Packet("I2", keyframe=True))
+        queue.put(_Packet("P4"))
+        assert _drain(queue) == ["I2", "P4"]
+        assert queue.dropped == 4
+
+    def test_blocks_instead_of_dropping_for_finite_sources(self):
+        queue = PacketQueue(1, drop=False)
+        queue.put(_Packet("a"))
+        producer = threading.Thread(target=queue.put, args=(_Packet("b"),))
+        producer.start()
+        producer.join(timeout=0.1)
+        assert producer.is_alive()
+        assert queue.get(timeout=1).name == "a"
+        producer.join(timeout=1)
+        assert queue.get(timeout=1).name == "b"
+        assert queue.dropped == 0
+
+
+class TestFrameQueue:
+
+    def test_drops_oldest_frame_and_reports_it(self):
+        dropped = []
+        queue = FrameQueue(2, on_drop=dropped.append)
+        for seq in range(4):
+            queue.put(seq, f"frame{seq}")
+        assert [queue.get()[0], queue.get()[0]] == [2, 3]
+        assert dropped == [0, 1]
+        assert queue.dropped == 2
+
+
+class TestReorderBuffer:
+
+    def test_delivers_in_sequence_order(self):
+        delivered = []
+        reorder = ReorderBuffer(lambda image, frame: delivered.append(frame))
+        reorder.complete(2, ("img", 2))
+        reorder.complete(0, ("img", 0))
+        assert delivered == [0]
+        reorder.skip(1)
+        assert delivered == [0, 2]
+        assert reorder.pending == 0
+
+
+class TestPipelineConfig:
+
+    def test_rejects_empty_limits(self):
+        with pytest.raises(ValueError):
+            PipelineConfig(convert_workers=0)
+
+
+class TestEnginePipeline:
+
+    def test_decodes_every_frame_in_order(self, test_video):
+        delivered = []
+        engine = DecodeEngine(reconnect_policy=None, pipeline=PipelineConfig(convert_workers=3),
+                              on_frame=lambda image, frame: delivered.append(frame.pts))
+        engine.start_stream(test_video)
+        engine.wait(timeout=20.0)
+        assert len(delivered) == 30
+        assert delivered == sorted(delivered)
+        stats = engine.stats()
+        assert stats["pipeline_dropped_packets"] == 0
+        assert stats["pipeline_dropped_frames"] == 0
+        assert stats["stages_ms"]["convert"]["p50"] is not None
+
+    def test_cannot_share_a_scheduler(self):
+        with pytest.raises(ValueError):
+            AVEngine(scheduler=object(), pipeline=PipelineConfig())
+
+    def test_stop_joins_pipeline_threads(self, test_video):
+        engine = AVEngine(reconnect_policy=BackoffPolicy(max_attempts=0),
+                          pipeline=PipelineConfig())
+        engine.start_stream(test_video)
+        engine.stop()
+        alive = {t.name for t in threading.enumerate()}
+        assert not alive & {"Demux", "Convert-0", "Convert-1"}
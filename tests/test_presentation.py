@@ -0,0 +1,86 @@
+"""
+Tests for timestamp-driven presentation pacing.
+Run from project root: pytest tests/ -v
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.decode_engine import DecodeEngine
+from core.frame_convert import FrameConverter
+from core.presentation import PacingConfig, PresentationClock
+
+
+class TestPresentationClock:
+
+    def test_rejects_invalid_config(self):
+        with pytest.raises(ValueError):
+            PacingConfig(late_threshold=0)
+        with pytest.raises(ValueError):
+            PacingConfig(jitter_buffer=-1)
+
+    def test_file_frames_are_due_at_their_timestamps(self):
+        clock = PresentationClock(PacingConfig())
+        assert clock.due(5.0, now=100.0) == 100.0
+        assert clock.due(5.5, now=100.1) == pytest.approx(100.5)
+        assert clock.due(6.0, now=100.2) == pytest.approx(101.0)
+
+    def test_late_frames_are_detected(self):
+        clock = PresentationClock(PacingConfig(late_threshold=0.1))
+        clock.due(0.0, now=10.0)
+        deadline = clock.due(0.5, now=10.7)
+        assert clock.is_late(deadline, now=10.7)
+        assert not clock.is_late(deadline, now=10.55)
+
+    def test_timestamp_jump_reanchors(self):
+        clock = PresentationClock(PacingConfig(max_drift=2.0))
+        clock.due(0.0, now=10.0)
+        assert clock.due(3600.0, now=10.1) == pytest.approx(10.1)
+        assert clock.reanchors == 1
+
+    def test_live_frames_are_delayed_by_the_jitter_buffer(self):
+        clock = PresentationClock(PacingConfig(jitter_buffer=0.2), live=True)
+        assert clock.due(1.0, now=50.0) == pytest.approx(50.2)
+        # A burst arriving early is spread back out to its timestamps
+        assert clock.due(1.04, now=50.01) == pytest.approx(50.24)
+
+    def test_live_underrun_refills_the_buffer(self):
+        clock = PresentationClock(PacingConfig(jitter_buffer=0.2, late_threshold=0.1), live=True)
+        clock.due(0.0, now=0.0)
+        # Source stalled: this frame is 0.5 s behind its deadline
+        deadline = clock.due(0.3, now=1.0)
+        assert deadline == pytest.approx(1.2)
+        assert not clock.is_late(deadline, now=1.0)
+        assert clock.reanchors == 1
+
+
+def test_paced_file_plays_in_real_time(test_video):
+    engine = DecodeEngine(reconnect_policy=None, pacing=PacingConfig())
+    started = time.perf_counter()
+    frames = list(engine.frames(test_video))
+    elapsed = time.perf_counter() - started
+    # 30 frames at 30 fps: the last one is due 29/30 s after the first
+    assert len(frames) == 30
+    assert 0.9 < elapsed < 2.0
+    assert engine.stats()["late_frames"] == 0
+
+
+def test_slow_conversion_skips_late_frames(test_video):
+    converter = FrameConverter()
+
+    def slow_convert(frame):
+        time.sleep(0.06)
+        return converter.convert(frame)
+
+    engine = DecodeEngine(reconnect_policy=None, pacing=PacingConfig(late_threshold=0.05),
+                          converter=converter, convert=slow_convert)
+    started = time.perf_counter()
+    shown = sum(1 for _ in engine.frames(test_video))
+    elapsed = time.perf_counter() - started
+    # Keeps to the timeline by dropping frames instead of running long
+    assert engine.stats()["late_frames"] > 0
+    assert shown + engine.stats()["late_frames"] <= 30
+    assert elapsed < 30 * 0.06
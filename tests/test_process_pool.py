@@ -0,0 +1,129 @@
+"""
+Tests for decoding in worker processes with shared-memory frame transport.
+Run from project root: pytest tests/ -v
+"""
+import os
+import signal
+import sys
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.presentation import PacingConfig
+from core.process_pool import FrameRing, ProcessDecodePool, slot_box
+from core.reconnect import BackoffPolicy
+from tests.media import make_test_video, wait_for
+
+
+@pytest.fixture
+def pool():
+    pool = ProcessDecodePool(max_workers=2, ring_slots=2, slot_bytes=320 * 240 * 4,
+                             restart_policy=BackoffPolicy(initial_delay=0.05, jitter=0.0, max_attempts=2))
+    yield pool
+    assert pool.close(timeout=10.0)
+
+
+class TestFrameRing:
+
+    def test_attached_ring_sees_written_frames(self):
+        owner = FrameRing(2, 64)
+        other = FrameRing(2, 64, name=owner.name)
+        data = np.arange(48, dtype=np.uint8).reshape(4, 12)
+        other.write(1, data)
+        assert np.array_equal(owner.view(1, 4, 12), data)
+        with pytest.raises(ValueError):
+            other.write(0, np.zeros(65, dtype=np.uint8))
+        other.close()
+        owner.close()
+        with pytest.raises(FileNotFoundError):
+            FrameRing(2, 64, name=owner.name)
+
+    def test_slot_box_keeps_the_aspect_ratio(self):
+        width, height = slot_box(3840, 2160, 4, 1920 * 1088 * 4)
+        assert width * height * 4 <= 1920 * 1088 * 4
+        assert width / height == pytest.approx(16 / 9, rel=0.01)
+
+
+class TestProcessDecodePool:
+
+    def test_decodes_a_file_in_a_worker(self, pool, test_video):
+        frames, events = [], []
+        source = pool.open(
+            test_video,
+            on_frame=lambda image, info: frames.append((image.pixels().copy(), info.pts)),
+            on_stopped=lambda: events.append("stopped"),
+        )
+        assert source.wait(timeout=30.0)
+        assert source.pid != os.getpid()
+        # Files wait for free slots instead of dropping frames
+        assert len(frames) == 30
+        assert frames[0][0].shape == (240, 320, 4)
+        assert [pts for _, pts in frames] == sorted(pts for _, pts in frames)
+        assert events == ["stopped"]
+        assert source.stats()["process_restarts"] == 0
+
+    def test_large_frames_are_scaled_to_fit_a_slot(self, pool, tmp_path):
+        clip = make_test_video(tmp_path / "large.mp4", frames=10, width=640, height=480)
+        shapes = []
+        source = pool.open(str(clip), on_frame=lambda image, info: shapes.append(image.pixels().shape))
+        assert source.wait(timeout=30.0)
+        assert shapes and all(h * w * 4 <= 320 * 240 * 4 for h, w, _ in shapes)
+
+    def test_crashed_worker_is_restarted(self, pool, tmp_path):
+        clip = make_test_video(tmp_path / "long.mp4", frames=90)
+        frames = []
+        source = pool.open(str(clip), pacing=PacingConfig(),
+                           on_frame=lambda image, info: frames.append(info.pts))
+        assert wait_for(lambda: frames)
+        first_pid = source.pid
+        os.kill(first_pid, signal.SIGKILL)
+        assert wait_for(lambda: source.restarts == 1 and source.pid not in (None, first_pid))
+        count = len(frames)
+        assert wait_for(lambda: len(frames) > count)
+        source.stop()
+        assert source.wait(timeout=10.0)
+
+    def test_worker_count_is_capped(self, pool, test_video):
+        pool.open(test_video, pacing=PacingConfig())
+        pool.open(test_video, pacing=PacingConfig())
+        with pytest.raises(RuntimeError):
+            pool.open(test_video)
+
+    def test_stopping_sources_leave_room_for_a_restart(self, pool, test_video):
+        pool.open(test_video, pacing=PacingConfig())
+        second = pool.open(test_video, pacing=PacingConfig())
+        second.stop()
+        # The old worker may still be exiting while its replacement starts
+        restarted = pool.open(test_video, pacing=PacingConfig())
+        with pytest.raises(RuntimeError):
+            pool.open(test_video)
+        restarted.stop()
+        assert restarted.wait(timeout=30.0)
+
+
+def test_process_engine_restarts_in_a_full_pool(pool, test_video):
+    from core.process_engine import ProcessEngine
+
+    engines = [ProcessEngine(pool, reconnect_policy=None, pacing=PacingConfig()) for _ in range(2)]
+    for engine in engines:
+        engine.start_stream(test_video)
+    engines[0].start_stream(test_video)
+    assert engines[0].wait(timeout=30.0)
+    assert engines[0].stats()["process_frames"] == 30
+
+
+def test_process_engine_fills_the_mailbox(pool, test_video):
+    from PySide6.QtGui import QImage
+    from core.process_engine import ProcessEngine
+
+    engine = ProcessEngine(pool, reconnect_policy=None)
+    engine.start_stream(test_video)
+    assert engine.wait(timeout=30.0)
+    image = engine.frame_mailbox.take()
+    assert isinstance(image, QImage)
+    assert (image.width(), image.height()) == (320, 240)
+    assert engine.stats()["process_frames"] == 30
@@ -0,0 +1,151 @@
+"""
+Tests for AVEngine reconnection, using a local HTTP stand-in server that
+drops the connection halfway through the stream.
+Run from project root: pytest tests/ -v
+"""
+import random
+import socket
+import struct
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from PySide6.QtCore import Qt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.av_engine import AVEngine
+from core.reconnect import BackoffPolicy
+from tests.media import make_test_video
+
+FAST_RETRY = BackoffPolicy(initial_delay=0.01, max_delay=0.05, max_attempts=3)
+
+
+class _FlakyServer:
+    """
+    Serves one MPEG-TS clip. The first ``drops`` requests are cut short, the
+    next ``outages`` requests get a 503, and later requests get the full clip.
+    """
+
+    def __init__(self, payload: bytes, drops: int = 1, outages: int = 0):
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if drops < server.requests <= drops + outages:
+                    self.send_error(503)
+                    return
+                cut = server.requests <= drops
+                self.send_response(200)
+                self.send_header("Content-Type", "video/mp2t")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload[:len(payload) // 2] if cut else payload)
+                self.wfile.flush()
+                if cut:
+                    # Reset instead of a clean FIN, like a dropped network link
+                    self.connection.setsockopt(
+                        socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+                    )
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}/live.ts"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture(scope="module")
+def ts_payload(tmp_path_factory):
+    path = make_test_video(tmp_path_factory.mktemp("media") / "clip.ts", frames=90)
+    return path.read_bytes()
+
+
+def _run(engine, url):
+    statuses, errors = [], []
+    # Direct connections: there is no Qt event loop to deliver queued signals
+    engine.status_signal.connect(statuses.append, Qt.DirectConnection)
+    engine.error_signal.connect(lambda msg, detail: errors.append(msg), Qt.DirectConnection)
+    engine.start_stream(url)
+    engine.wait(timeout=20.0)
+    return statuses, errors
+
+
+class TestBackoffPolicy:
+
+    def test_delay_grows_exponentially_and_is_capped(self):
+        policy = BackoffPolicy(initial_delay=1.0, factor=2.0, max_delay=5.0, jitter=0.0)
+        assert [policy.delay(n) for n in range(5)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+    def test_jitter_stays_within_bounds(self):
+        policy = BackoffPolicy(initial_delay=1.0, jitter=0.25)
+        rng = random.Random(1)
+        delays = [policy.delay(0, rng) for _ in range(200)]
+        assert all(0.75 <= d <= 1.25 for d in delays)
+        assert len(set(delays)) > 1
+
+
+class TestEngineReconnect:
+
+    def test_resumes_after_drop(self, ts_payload):
+        server = _FlakyServer(ts_payload, drops=1)
+        try:
+            engine = AVEngine(reconnect_policy=FAST_RETRY)
+            statuses, errors = _run(engine, server.url)
+        finally:
+            server.close()
+        assert errors == []
+        assert "Stream disconnected. Attempting to reconnect..." in statuses
+        assert statuses.count("Streaming") == 2
+        assert engine.reconnect_count == 1
+        assert server.requests == 2
+        # Resume reuses the parameters captured from the first connection
+        assert engine.core.session_params.codec_name == "mpeg4"
+
+    def test_gives_up_after_max_attempts(self, ts_payload):
+        server = _FlakyServer(ts_payload, drops=1, outages=100)
+        try:
+            engine = AVEngine(reconnect_policy=FAST_RETRY)
+            statuses, errors = _run(engine, server.url)
+        finally:
+            server.close()
+        assert errors == ["Connection failed. Check source and network"]
+        assert engine.reconnect_count == FAST_RETRY.max_attempts
+        assert server.requests == 1 + FAST_RETRY.max_attempts
+        assert statuses[-1] == "Ready"
+
+    def test_flapping_source_keeps_reconnecting(self, ts_payload):
+        # Each connection delivers frames, so the attempt budget starts over
+        server = _FlakyServer(ts_payload, drops=FAST_RETRY.max_attempts + 2)
+        try:
+            engine = AVEngine(reconnect_policy=FAST_RETRY)
+            _, errors = _run(engine, server.url)
+        finally:
+            server.close()
+        assert errors == []
+        assert engine.reconnect_count == FAST_RETRY.max_attempts + 2
+
+    def test_reconnect_can_be_disabled(self, ts_payload):
+        server = _FlakyServer(ts_payload, drops=1)
+        try:
+            engine = AVEngine(reconnect_policy=None)
+            _, errors = _run(engine, server.url)
+        finally:
+            server.close()
+        assert errors == ["Connection failed. Check source and network"]
+        assert server.requests == 1
+
+    def test_initial_connection_failure_is_not_retried(self, tmp_path):
+        engine = AVEngine(reconnect_policy=FAST_RETRY)
+        _, errors = _run(engine, str(tmp_path / "missing.mp4"))
+        assert errors == ["Connection failed. Check source and network"]
+        assert engine.reconnect_count == 0
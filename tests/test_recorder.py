@@ -0,0 +1,134 @@
+"""
+Tests for packet-remux recording and the pre-event buffer.
+Run from project root: pytest tests/ -v
+"""
+import io
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import av
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.av_engine import AVEngine
+from core.recorder import PreEventBuffer, Recorder, RecordingConfig
+
+
+class _Packet:
+    def __init__(self, name, keyframe=False):
+        self.name = name
+        self.is_keyframe = keyframe
+
+
+def _count_frames(path) -> int:
+    with av.open(str(path)) as container:
+        return sum(1 for _ in container.decode(video=0))
+
+
+class TestPreEventBuffer:
+
+    def test_keeps_packets_since_last_keyframe(self):
+        buffer = PreEventBuffer()
+        for name, key in [("I1", True), ("P1", False), ("I2", True), ("P2", False), ("P3", False)]:
+            buffer.add(_Packet(name, key))
+        assert [p.name for p in buffer.packets()] == ["I2", "P2", "P3"]
+
+    def test_is_bounded(self):
+        buffer = PreEventBuffer(max_packets=3)
+        buffer.add(_Packet("I", True))
+        for i in range(10):
+            buffer.add(_Packet(f"P{i}"))
+        assert len(buffer) == 3
+
+
+class TestRecorder:
+
+    def test_rejects_unknown_container(self):
+        with pytest.raises(ValueError):
+            RecordingConfig(container="avi")
+
+    def test_recording_starts_with_the_preceding_gop(self, test_video, tmp_path):
+        # test_video: 30 frames, keyframe every 10
+        buffer = PreEventBuffer()
+        recorder = Recorder(RecordingConfig(directory=tmp_path, segment_seconds=None))
+        recorder.start()
+        with av.open(test_video) as container:
+            stream = container.streams.video[0]
+            packets = [p for p in container.demux(stream) if p.size]
+            for packet in packets[:15]:
+                buffer.add(packet)
+            # "Record" pressed mid-GOP
+            recorder.set_source(stream)
+            for packet in buffer.packets() + packets[15:]:
+                recorder.write(packet)
+            assert recorder.stop()
+        assert recorder.error is None
+        assert len(recorder.segments) == 1
+        assert _count_frames(recorder.segments[0]) == 20
+
+    def test_template_containers_are_closed(self, test_video, tmp_path, monkeypatch):
+        holders = []
+        open_container = av.open
+
+        class _Holder:
+            def __init__(self, container):
+                self.container = container
+                self.closed = False
+
+            def add_stream_from_template(self, stream):
+                return self.container.add_stream_from_template(stream)
+
+            def close(self):
+                self.closed = True
+                self.container.close()
+
+        def tracking_open(file, *args, **kwargs):
+            if not isinstance(file, io.BytesIO):
+                return open_container(file, *args, **kwargs)
+            holders.append(_Holder(open_container(file, *args, **kwargs)))
+            return holders[-1]
+
+        monkeypatch.setattr(av, "open", tracking_open)
+        recorder = Recorder(RecordingConfig(directory=tmp_path, segment_seconds=None))
+        recorder.start()
+        with open_container(test_video) as container:
+            stream = container.streams.video[0]
+            # A reconnect replaces the template
+            for _ in range(2):
+                recorder.set_source(stream)
+                for packet in container.demux(stream):
+                    recorder.write(packet)
+                container.seek(0)
+            assert recorder.stop()
+        assert recorder.error is None
+        assert len(recorder.segments) == 2
+        assert [holder.closed for holder in holders] == [True, True]
+
+
+class TestEngineRecording:
+
+    def _record(self, test_video, config):
+        engine = AVEngine(reconnect_policy=None)
+        engine.start_recording(config)
+        engine.start_stream(test_video)
+        engine.wait(timeout=20.0)
+        assert engine.is_recording
+        segments = engine.stop_recording()
+        assert not engine.is_recording
+        return segments
+
+    def test_records_without_reencoding(self, test_video, tmp_path):
+        segments = self._record(test_video, RecordingConfig(directory=tmp_path, container="mkv"))
+        assert len(segments) == 1
+        assert segments[0].suffix == ".mkv"
+        assert _count_frames(segments[0]) == 30
+        with av.open(str(segments[0])) as recorded, av.open(test_video) as source:
+            assert recorded.streams.video[0].codec_context.name == source.streams.video[0].codec_context.name
+
+    def test_rotates_segments_on_keyframes(self, test_video, tmp_path):
+        segments = self._record(test_video, RecordingConfig(directory=tmp_path, segment_seconds=0.3))
+        assert len(segments) == 3
+        assert [_count_frames(path) for path in segments] == [10, 10, 10]
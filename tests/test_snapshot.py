@@ -0,0 +1,57 @@
+"""
+Tests for full-resolution snapshots taken from the decoded frame.
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.av_engine import AVEngine
+from core.snapshot import snapshot_path
+
+
+@pytest.fixture
+def engine(test_video):
+    engine = AVEngine(reconnect_policy=None)
+    # Display-sized conversion must not affect the snapshot resolution
+    engine.set_output_size(160, 120)
+    engine.start_stream(test_video)
+    engine.wait(timeout=20.0)
+    return engine
+
+
+class TestSnapshot:
+
+    def test_requires_a_decoded_frame(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            AVEngine().snapshot(tmp_path / "still.png")
+
+    def test_rejects_unknown_format(self, engine, tmp_path):
+        with pytest.raises(ValueError):
+            engine.snapshot(tmp_path / "still.gif")
+
+    @pytest.mark.parametrize("suffix", [".png", ".jpg"])
+    def test_writes_full_resolution_image(self, engine, tmp_path, suffix):
+        saved = []
+        engine.snapshot_signal.connect(saved.append, Qt.DirectConnection)
+        path = engine.snapshot(tmp_path / f"still{suffix}").result(timeout=10)
+        image = QImage(str(path))
+        assert (image.width(), image.height()) == (320, 240)
+        assert saved == [str(path)]
+
+    def test_burst_writes_every_capture(self, engine, tmp_path):
+        futures = [engine.snapshot(tmp_path / f"burst{i}.png") for i in range(10)]
+        paths = [future.result(timeout=10) for future in futures]
+        assert all(path.stat().st_size > 0 for path in paths)
+
+    def test_snapshot_paths_are_time_stamped(self, tmp_path):
+        path = snapshot_path(tmp_path, suffix=".jpg")
+        assert path.parent == tmp_path
+        assert path.name.startswith("snapshot_") and path.suffix == ".jpg"
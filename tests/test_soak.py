@@ -0,0 +1,108 @@
+"""
+Tests for the soak harness: leak and drift analysis, and a short run.
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.soak import (
+    SoakConfig, SoakHarness, SoakSample, SoakThresholds, analyze, compare_reports, load_report,
+    passed, slope_per_hour, write_report,
+)
+
+
+def _samples(rss=lambda t: 100.0, threads=lambda t: 12, fds=lambda t: 40, latency=lambda t: 20.0,
+             count=60):
+    """One sample per minute for an hour."""
+    return [
+        SoakSample(t=i * 60.0, rss_mb=rss(i * 60.0), threads=threads(i * 60.0), python_threads=4,
+                   fds=fds(i * 60.0), heap_mb=None, latency_p50_ms=latency(i * 60.0), latency_max_ms=None,
+                   fps=30.0, frames=i * 1800, cycles=i, restarts=0)
+        for i in range(count)
+    ]
+
+
+class TestAnalyze:
+
+    def test_steady_run_passes(self):
+        # Sawtooth RSS (pools filling and emptying) has no trend
+        checks = analyze(_samples(rss=lambda t: 100.0 + (t % 300) / 30.0))
+        assert passed(checks)
+        assert checks["rss_mb_per_hour"]["value"] == pytest.approx(0.0, abs=5.0)
+        # No tracemalloc samples: reported, not failed
+        assert checks["heap_mb_per_hour"]["ok"] is None
+
+    def test_rss_leak_slope_fails(self):
+        samples = _samples(rss=lambda t: 100.0 + t / 36.0)
+        assert slope_per_hour(samples, "rss_mb") == pytest.approx(100.0)
+        checks = analyze(samples, SoakThresholds(rss_mb_per_hour=50.0))
+        assert checks["rss_mb_per_hour"]["ok"] is False
+        assert not passed(checks)
+
+    def test_short_span_reports_growth_without_judging_it(self):
+        samples = _samples(rss=lambda t: 100.0 + t / 36.0, count=5)
+        checks = analyze(samples)
+        assert checks["rss_mb_per_hour"]["value"] == pytest.approx(100.0)
+        assert checks["rss_mb_per_hour"]["ok"] is None
+
+    def test_warmup_is_left_out(self):
+        # Steep growth in the first ten minutes only
+        samples = _samples(rss=lambda t: 100.0 + min(t, 600.0))
+        assert not passed(analyze(samples))
+        assert passed(analyze(samples, warmup=600.0))
+
+    def test_thread_growth_fails(self):
+        checks = analyze(_samples(threads=lambda t: 12 + int(t // 600)))
+        # One more thread every ten minutes: the last third peaks 4 above the first
+        assert checks["thread_growth"]["value"] == 4
+        assert checks["thread_growth"]["ok"] is False
+
+    def test_descriptor_growth_fails(self):
+        # A socket or file left open by every restart
+        checks = analyze(_samples(fds=lambda t: 40 + int(t // 60)))
+        assert checks["fd_growth"]["value"] == 40
+        assert checks["fd_growth"]["ok"] is False
+        assert passed(analyze(_samples(fds=lambda t: None)))
+
+    def test_latency_drift_needs_ratio_and_milliseconds(self):
+        doubling = analyze(_samples(latency=lambda t: 20.0 + t / 90.0))
+        assert doubling["latency_drift"]["ok"] is False
+        # 1 ms -> 2 ms doubles too, but stays under latency_drift_min_ms
+        tiny = analyze(_samples(latency=lambda t: 1.0 + t / 3600.0))
+        assert tiny["latency_drift"]["value"] > 1.5
+        assert tiny["latency_drift"]["ok"] is True
+
+
+def test_short_run_cycles_sources_and_writes_a_report(test_video, tmp_path):
+    from core.av_engine import AVEngine
+    from core.presentation import PacingConfig
+
+    config = SoakConfig(duration=3.0, sample_interval=0.25, cycle_seconds=1.0, resize_seconds=0.5,
+                        warmup=0.0, thresholds=SoakThresholds(rss_mb_per_hour=None, heap_mb_per_hour=None,
+                                                              thread_growth=None, fd_growth=None,
+                                                              latency_drift=None))
+    sources = [test_video, f"{test_video}|{test_video}"]
+    seen = []
+    harness = SoakHarness(sources, config, on_sample=seen.append,
+                          engine_factory=lambda: AVEngine(reconnect_policy=None, pacing=PacingConfig()))
+    report = harness.run()
+
+    assert report["passed"], report["checks"]
+    assert report["errors"] == []
+    totals = report["totals"]
+    assert totals["cycles"] >= 2
+    # The 1 s clip ends inside a 1 s cycle at least once and is looped
+    assert totals["frames"] > 30
+    assert len(report["samples"]) == len(seen) >= 8
+    assert seen[-1].threads >= 1
+    assert report["sources"] == sources
+
+    path = tmp_path / "soak.json"
+    write_report(path, report)
+    loaded = load_report(path)
+    assert [name for name, _, _ in compare_reports(loaded, report)] == list(report["checks"])
@@ -0,0 +1,133 @@
+"""
+Tests for main/sub-stream sources and seamless stream switching.
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PySide6.QtCore import QSize, Qt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.av_engine import AVEngine
+from core.presentation import PacingConfig
+from core.sources import SUB_STREAM_PIXELS, StreamSelector, StreamSource
+from tests.media import make_test_video, wait_for
+
+
+class TestStreamSource:
+
+    def test_parses_main_and_sub(self):
+        source = StreamSource.parse(" rtsp://cam/main | rtsp://cam/sub ")
+        assert source == StreamSource("rtsp://cam/main", "rtsp://cam/sub")
+        assert source.url("sub") == "rtsp://cam/sub"
+        assert str(source) == "rtsp://cam/main|rtsp://cam/sub"
+
+    def test_without_sub_always_plays_main(self):
+        source = StreamSource.parse("rtsp://cam/main")
+        assert source.sub is None
+        assert source.url("sub") == "rtsp://cam/main"
+
+
+class TestStreamSelector:
+
+    def test_small_displays_get_the_sub_stream_with_hysteresis(self):
+        selector = StreamSelector()
+        assert selector.choose(1920, 1080) == "main"
+        assert selector.choose(640, 360) == "sub"
+        # Just above the threshold is not enough to switch back
+        assert selector.choose(1000, 560) == "sub"
+        assert selector.choose(1280, 720) == "main"
+        # An unknown size keeps the current stream
+        assert selector.choose(0, 0) == "main"
+
+    def test_overload_forces_the_sub_stream_for_a_while(self):
+        selector = StreamSelector(recover_after=10.0)
+        selector.report_load({"cpu_percent": 95.0, "late_frames": 0}, now=100.0)
+        assert selector.choose(1920, 1080, now=105.0) == "sub"
+        selector.report_load({"cpu_percent": 20.0, "late_frames": 0}, now=106.0)
+        assert selector.choose(1920, 1080, now=111.0) == "main"
+        # Late frames piling up count as overload too
+        selector.report_load({"cpu_percent": 20.0, "late_frames": 10}, now=112.0)
+        assert selector.overloaded(now=113.0)
+
+
+@pytest.fixture(scope="module")
+def camera(tmp_path_factory):
+    """A "camera" whose main stream is 320x240 and sub-stream 160x120, 3 s each."""
+    media = tmp_path_factory.mktemp("camera")
+    main = make_test_video(media / "main.mp4", frames=90)
+    sub = make_test_video(media / "sub.mp4", frames=90, width=160, height=120)
+    return StreamSource(str(main), str(sub))
+
+
+def _record_widths(engine):
+    """Source width of every frame put into the mailbox, in order."""
+    widths = []
+    put = engine.frame_mailbox.put
+
+    def recording_put(image):
+        widths.append(engine.core.latest_frame.width)
+        return put(image)
+
+    engine.frame_mailbox.put = recording_put
+    return widths
+
+
+def _engine(**kwargs):
+    engine = AVEngine(reconnect_policy=None, **kwargs)
+    # Only the display size decides; a busy test machine must not
+    engine.stream_selector = StreamSelector(overload_cpu=None, overload_late_frames=None)
+    return engine
+
+
+def test_switches_at_the_first_keyframe_without_a_gap(camera):
+    engine = _engine(pacing=PacingConfig())
+    switched = []
+    engine.stream_switched_signal.connect(switched.append, Qt.DirectConnection)
+    widths = _record_widths(engine)
+    engine.fit_to_display(QSize(1280, 720))
+    engine.start_stream(camera)
+    assert wait_for(lambda: len(widths) >= 5)
+    assert engine.stream_variant == "main"
+
+    engine.fit_to_display(QSize(320, 180))
+    assert wait_for(lambda: switched == ["sub"])
+    assert wait_for(lambda: widths[-1] == 160)
+    engine.stop()
+    assert engine.wait(timeout=10.0)
+    # The main stream played until the sub-stream took over; never interleaved
+    first_sub = widths.index(160)
+    assert first_sub > 0
+    assert set(widths[:first_sub]) == {320}
+    assert set(widths[first_sub:]) == {160}
+    assert engine.stats()["stream_switches"] == 1
+
+
+def test_small_display_starts_on_the_sub_stream(camera):
+    engine = _engine()
+    engine.fit_to_display(QSize(SUB_STREAM_PIXELS // 1000, 1000))
+    engine.start_stream(str(camera))
+    assert engine.stream_variant == "sub"
+    assert engine.wait(timeout=10.0)
+    assert engine.core.latest_frame.width == 160
+
+
+def test_failed_sub_stream_keeps_the_main_stream(camera, tmp_path):
+    engine = _engine(pacing=PacingConfig())
+    errors = []
+    engine.error_signal.connect(lambda *args: errors.append(args), Qt.DirectConnection)
+    engine.fit_to_display(QSize(1280, 720))
+    engine.start_stream(StreamSource(camera.main, str(tmp_path / "missing.mp4")))
+    assert wait_for(lambda: engine.core.latest_frame is not None)
+    engine.fit_to_display(QSize(320, 180))
+    time.sleep(0.5)
+    assert engine.stream_variant == "main"
+    assert engine.core.is_running
+    assert errors == []
+    engine.stop()
+    assert engine.wait(timeout=10.0)
@@ -0,0 +1,57 @@
+"""
+Startup tests: the window must appear within budget and before PyAV loads.
+Run from project root: pytest tests/ -v
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+_src = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(_src))
+
+# Seconds from process launch until the window is shown and the app has
+# exited again; generous, so only an eager heavy import (or worse) trips it
+# on a loaded CI machine
+STARTUP_BUDGET_S = 3.0
+
+
+def test_window_appears_within_budget_without_loading_av(tmp_path):
+    report_path = tmp_path / "startup.json"
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(_src / "main.py"), "--quit-after-startup",
+         "--startup-report", str(report_path)],
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+    elapsed = time.perf_counter() - started
+    assert result.returncode == 0, result.stderr
+    assert elapsed < STARTUP_BUDGET_S
+    report = json.loads(report_path.read_text())
+    assert "window_shown" in report["marks_ms"]
+    assert report["deferred_loaded"]["window_shown"] == []
+
+
+def test_engine_loads_on_first_start(test_video):
+    from PySide6.QtWidgets import QApplication
+    import main
+    from ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    args, _ = main.parse_args(["main"])
+    window = MainWindow()
+    player = main.LazyEngine(app, window, args)
+    assert player.engine is None
+    player.take_snapshot()
+    assert "No frame" in window.status_label.text()
+
+    player.start_stream(test_video)
+    assert player.engine is not None
+    assert window.video_display._frame_source is player.engine.frame_mailbox
+    assert "engine_loaded" in main.STARTUP.marks
+    player.stop()
+    assert player.engine.wait(timeout=10.0)
@@ -0,0 +1,108 @@
+"""
+Tests for the stats helpers and the engine/display stats surface.
+Run from project root: pytest tests/ -v
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtWidgets import QApplication
+
+from core.av_engine import AVEngine
+from core.stats import CpuMeter, JsonLinesExporter, RateMeter, RollingStats
+from ui.video_display import VideoDisplay
+
+
+class TestRollingStats:
+
+    def test_percentiles_of_known_distribution(self):
+        stats = RollingStats(window=1000)
+        for value in range(1, 101):
+            stats.add(value)
+        result = stats.percentiles()
+        assert result == {"p50": 50, "p95": 95, "p99": 99}
+
+    def test_window_keeps_latest_samples(self):
+        stats = RollingStats(window=3)
+        for value in (100, 1, 2, 3):
+            stats.add(value)
+        assert stats.summary()["max"] == 3
+        assert len(stats) == 3
+
+    def test_empty_percentiles_are_none(self):
+        assert RollingStats().percentiles() == {"p50": None, "p95": None, "p99": None}
+
+
+class TestRateMeter:
+
+    def test_rate_over_window(self):
+        meter = RateMeter(window=1.0)
+        for i in range(30):
+            meter.add(now=10.0 + i / 30.0)
+        assert meter.rate(now=11.0) == pytest.approx(30.0, rel=0.05)
+
+    def test_old_events_expire(self):
+        meter = RateMeter(window=1.0)
+        meter.add(1000, now=0.0)
+        assert meter.rate(now=5.0) == 0.0
+
+
+def test_cpu_meter_reports_percentage():
+    meter = CpuMeter()
+    sum(i * i for i in range(200000))
+    assert meter.sample() >= 0.0
+
+
+def test_json_lines_exporter(tmp_path):
+    path = tmp_path / "stats.jsonl"
+    exporter = JsonLinesExporter(path)
+    exporter.write({"decode_fps": 30.0})
+    exporter.write({"decode_fps": 29.5})
+    exporter.close()
+    exporter.write({"ignored": True})
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["decode_fps"] for r in records] == [30.0, 29.5]
+    assert all("ts" in r for r in records)
+
+
+def test_engine_stats_after_decoding(test_video):
+    engine = AVEngine()
+    emitted = []
+    engine.stats_signal.connect(emitted.append, Qt.DirectConnection)
+    engine.start_stream(test_video)
+    engine.wait(timeout=10.0)
+
+    stats = engine.stats()
+    assert stats["decode_fps"] > 0
+    assert stats["bitrate_kbps"] > 0
+    assert set(stats["stages_ms"]) == set(AVEngine.STAGES)
+    assert all(times["p50"] is not None for times in stats["stages_ms"].values())
+    assert stats["dropped_frames"] + stats["queue_depth"] == 30
+    assert emitted and "decode_fps" in emitted[0]
+
+
+def test_display_stats_and_overlay():
+    _ = QApplication.instance() or QApplication([])
+    display = VideoDisplay()
+    display.resize(640, 360)
+    display.set_stats_provider(AVEngine().stats)
+    display.set_stats_overlay(True)
+    img = QImage(320, 180, QImage.Format_RGB32)
+    img.fill(QColor("white"))
+    display.update_frame(img)
+    grabbed = display.grab().toImage()
+
+    stats = display.stats()
+    assert stats["display_fps"] > 0
+    assert stats["paint_ms"]["p50"] is not None
+    # The overlay darkens the top-left corner of the white frame
+    assert grabbed.pixelColor(6, 6).lightness() < 200
+    assert any(line.startswith("decode") for line in display._overlay_lines)
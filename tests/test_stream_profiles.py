@@ -0,0 +1,65 @@
+"""
+Unit tests for RTSP tuning profiles and the engine's latency stats.
+Run from project root: pytest tests/ -v
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.av_engine import AVEngine
+from core.stream_profiles import DEFAULT_PROFILE, PROFILES, get_profile
+
+
+class TestStreamProfiles:
+
+    def test_known_profiles(self):
+        assert set(PROFILES) == {"low-latency", "balanced", "robust"}
+        assert DEFAULT_PROFILE in PROFILES
+
+    def test_unknown_profile_raises(self):
+        with pytest.raises(ValueError, match="low-latency"):
+            get_profile("fastest")
+
+    def test_low_latency_disables_buffering(self):
+        options = get_profile("low-latency").rtsp_options()
+        assert options["rtsp_transport"] == "udp"
+        assert options["fflags"] == "nobuffer"
+        assert options["flags"] == "low_delay"
+        assert options["reorder_queue_size"] == "0"
+        assert get_profile("low-latency").thread_type == "SLICE"
+
+    def test_every_profile_sets_socket_timeout(self):
+        for profile in PROFILES.values():
+            options = profile.rtsp_options(timeout_us=3_000_000)
+            assert options["timeout"] == "3000000"
+            assert "stimeout" not in options
+
+    def test_robust_probes_longer_than_balanced(self):
+        robust = get_profile("robust").rtsp_options()
+        balanced = get_profile("balanced").rtsp_options()
+        assert int(robust["probesize"]) > int(balanced["probesize"])
+        assert robust["rtsp_transport"] == "tcp"
+
+
+class TestEngineLatencyStats:
+
+    def test_engine_rejects_unknown_profile(self):
+        with pytest.raises(ValueError):
+            AVEngine(profile="nope")
+
+    def test_stats_before_start_are_empty(self):
+        stats = AVEngine(profile="robust").latency_stats()
+        assert stats["profile"] == "robust"
+        assert stats["time_to_first_frame_ms"] is None
+        assert stats["frames"] == 0
+
+    def test_stats_after_decoding_file(self, test_video):
+        engine = AVEngine(profile="low-latency")
+        engine.start_stream(test_video)
+        engine.wait(timeout=10.0)
+        stats = engine.latency_stats()
+        assert stats["time_to_first_frame_ms"] > 0
+        assert stats["frames"] == 30
+        assert 0 <= stats["frame_latency_ms"]["p50"] <= stats["frame_latency_ms"]["max"]
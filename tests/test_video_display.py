@@ -0,0 +1,150 @@
+"""
+Tests for the paint-based VideoDisplay widget (offscreen Qt platform).
+Run from project root: pytest tests/ -v
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+_src = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(_src))
+
+from PySide6.QtCore import QPoint, QPointF, QRect, QRectF, Qt
+from PySide6.QtGui import QColor, QImage, QWheelEvent
+from PySide6.QtWidgets import QApplication
+
+from core.frame_mailbox import FrameMailbox
+from ui.video_display import VideoDisplay, create_video_display
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _image(width, height, color="red"):
+    img = QImage(width, height, QImage.Format_RGB888)
+    img.fill(QColor(color))
+    return img
+
+
+def test_target_rect_is_letterboxed(app):
+    display = VideoDisplay()
+    display.resize(800, 600)
+    display.update_frame(_image(1920, 1080))
+    assert display.target_rect == QRect(0, 75, 800, 450)
+
+
+def test_target_rect_follows_resize(app):
+    display = VideoDisplay()
+    display.resize(640, 360)
+    display.update_frame(_image(1920, 1080))
+    display.resize(1280, 720)
+    assert display.target_rect == QRect(0, 0, 1280, 720)
+
+
+def test_paints_frame_into_widget(app):
+    display = VideoDisplay()
+    display.resize(640, 360)
+    display.update_frame(_image(320, 180, "blue"))
+    grabbed = display.grab().toImage()
+    assert grabbed.pixelColor(320, 180) == QColor("blue")
+
+
+def test_clear_and_placeholder_text(app):
+    display = VideoDisplay()
+    display.update_frame(_image(32, 32))
+    display.clear()
+    assert display.current_frame is None
+    display.setText("Connection Failed")
+    assert display.text() == "Connection Failed"
+
+
+def test_pulls_newest_frame_from_mailbox(app):
+    display = VideoDisplay()
+    mailbox = FrameMailbox()
+    display.set_frame_source(mailbox)
+    mailbox.put(_image(16, 16, "red"))
+    newest = _image(16, 16, "green")
+    mailbox.put(newest)
+    display._pull_frame()
+    assert display.current_frame is newest
+    assert mailbox.dropped == 1
+    display.set_frame_source(None)
+
+
+def test_factory_falls_back_to_software(app):
+    assert isinstance(create_video_display(use_opengl=False), VideoDisplay)
+
+
+def test_grid_lays_out_streams_square(app, test_video):
+    from core.decode_scheduler import DecodeScheduler
+    from ui.video_grid import VideoGrid
+
+    scheduler = DecodeScheduler(max_threads=2)
+    grid = VideoGrid(scheduler)
+    for _ in range(4):
+        grid.add_stream(test_video)
+    positions = [grid._layout.getItemPosition(grid._layout.indexOf(d))[:2] for d in grid.displays]
+    assert positions == [(0, 0), (0, 1), (1, 0), (1, 1)]
+    grid.stop_all()
+    scheduler.shutdown()
+
+
+def test_reports_when_it_leaves_the_screen(app):
+    display = VideoDisplay()
+    changes = []
+    display.on_screen_changed.connect(changes.append)
+    display.show()
+    app.processEvents()
+    assert display.is_on_screen
+    display.showMinimized()
+    app.processEvents()
+    display.hide()
+    app.processEvents()
+    assert changes[0] is True and changes[-1] is False
+    assert not display.is_on_screen
+
+
+def _wheel(display, pos, notches):
+    event = QWheelEvent(QPointF(pos), QPointF(display.mapToGlobal(pos)), QPoint(),
+                        QPoint(0, 120 * notches), Qt.NoButton, Qt.NoModifier,
+                        Qt.NoScrollPhase, False)
+    QApplication.sendEvent(display, event)
+
+
+def test_wheel_zooms_around_the_cursor(app):
+    display = VideoDisplay()
+    display.resize(640, 360)
+    display.update_frame(_image(640, 360))
+    regions = []
+    display.region_changed.connect(regions.append)
+    # Zooming at the bottom-right corner keeps that corner in view
+    _wheel(display, QPoint(639, 359), 4)
+    region = regions[-1]
+    assert display.zoom == pytest.approx(1.25 ** 4)
+    assert region.right() == pytest.approx(1.0, abs=0.01)
+    assert region.bottom() == pytest.approx(1.0, abs=0.01)
+    _wheel(display, QPoint(320, 180), -10)
+    assert display.region == QRectF(0, 0, 1, 1)
+
+
+def test_drag_pans_a_zoomed_view_within_the_frame(app):
+    from PySide6.QtTest import QTest
+
+    display = VideoDisplay()
+    display.resize(640, 360)
+    display.update_frame(_image(640, 360))
+    display.set_region(QRectF(0.25, 0.25, 0.5, 0.5))
+    QTest.mousePress(display, Qt.LeftButton, pos=QPoint(320, 180))
+    QTest.mouseMove(display, QPoint(160, 180))
+    # Dragging left by a quarter of the widget shows what was to the right
+    assert display.region.x() == pytest.approx(0.375)
+    QTest.mouseMove(display, QPoint(0, 360))
+    QTest.mouseRelease(display, Qt.LeftButton, pos=QPoint(0, 360))
+    assert display.region == QRectF(0.5, 0.0, 0.5, 0.5)
+    QTest.mouseDClick(display, Qt.LeftButton, pos=QPoint(10, 10))
+    assert display.zoom == 1.0